@@ -17,8 +17,9 @@ from app.core.config import settings
 # Configuração do Alembic
 config = context.config
 
-# Definir a URL do banco de dados
-config.set_main_option("sqlalchemy.url", settings.database_url)
+# Definir a URL do banco de dados (a menos que já tenha sido informada)
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", settings.database_url)
 
 # Configurar logs se houver um arquivo de configuração
 if config.config_file_name is not None:
@@ -0,0 +1,71 @@
+"""hot path indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 15:40:00.000000
+
+No PostgreSQL os índices são criados com CREATE INDEX CONCURRENTLY, fora
+da transação da migração, para não bloquear escritas nas tabelas.
+O índice único de users.email falha se já houver e-mails duplicados.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabela, coluna, único)
+INDEXES = [
+    ('lancamentos_residuo', 'ponto_coleta_id', False),
+    ('lancamentos_residuo', 'tipo_residuo_id', False),
+    ('lancamentos_residuo', 'data', False),
+    ('pedidos_doacao', 'turma_id', False),
+    ('pedidos_doacao', 'criado_por_id', False),
+    ('pedidos_doacao', 'criado_em', False),
+    ('pedido_doacao_alunos', 'user_id', False),
+    ('users', 'email', True),
+    ('turmas', 'curso_id', False),
+    ('turmas', 'unidade_id', False),
+    ('turmas', 'universidade_id', False),
+    ('cursos', 'universidade_id', False),
+    ('cursos', 'unidade_id', False),
+    ('pontos_coleta', 'universidade_id', False),
+    ('pontos_coleta', 'unidade_id', False),
+    ('pontos_coleta', 'responsavel_id', False),
+]
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            for table, column, unique in INDEXES:
+                op.create_index(
+                    op.f(f'ix_{table}_{column}'), table, [column],
+                    unique=unique, postgresql_concurrently=True, if_not_exists=True
+                )
+    else:
+        for table, column, unique in INDEXES:
+            op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=unique)
+
+
+def downgrade() -> None:
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            for table, column, _ in reversed(INDEXES):
+                op.drop_index(
+                    op.f(f'ix_{table}_{column}'), table_name=table,
+                    postgresql_concurrently=True, if_exists=True
+                )
+    else:
+        for table, column, _ in reversed(INDEXES):
+            op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
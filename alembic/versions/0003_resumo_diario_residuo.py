@@ -0,0 +1,67 @@
+"""resumo diario residuo
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 18:05:00.000000
+
+Cria a tabela de resumo diário (dia, ponto, tipo, turma) e a preenche a
+partir dos lançamentos existentes. Depois disso ela é mantida pelas escritas
+da API; ``scripts/rebuild_resumo_diario.py`` a recalcula se necessário.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+lancamentos = sa.table(
+    'lancamentos_residuo',
+    sa.column('pedido_id'), sa.column('ponto_coleta_id'), sa.column('tipo_residuo_id'),
+    sa.column('peso_kg'), sa.column('data'),
+)
+pedidos = sa.table('pedidos_doacao', sa.column('id'), sa.column('turma_id'))
+
+
+def upgrade() -> None:
+    resumo = op.create_table('resumo_diario_residuo',
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('ponto_coleta_id', sa.Integer(), nullable=False),
+    sa.Column('tipo_residuo_id', sa.Integer(), nullable=False),
+    sa.Column('turma_id', sa.Integer(), nullable=False),
+    sa.Column('total_kg', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('lancamentos', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ponto_coleta_id'], ['pontos_coleta.id'], ),
+    sa.ForeignKeyConstraint(['tipo_residuo_id'], ['tipos_residuo.id'], ),
+    sa.ForeignKeyConstraint(['turma_id'], ['turmas.id'], ),
+    sa.PrimaryKeyConstraint('dia', 'ponto_coleta_id', 'tipo_residuo_id', 'turma_id')
+    )
+
+    if op.get_bind().dialect.name == 'sqlite':
+        dia = sa.func.date(lancamentos.c.data)
+    else:
+        dia = sa.cast(lancamentos.c.data, sa.Date)
+    op.execute(
+        resumo.insert().from_select(
+            ['dia', 'ponto_coleta_id', 'tipo_residuo_id', 'turma_id', 'total_kg', 'lancamentos'],
+            sa.select(
+                dia,
+                lancamentos.c.ponto_coleta_id,
+                lancamentos.c.tipo_residuo_id,
+                pedidos.c.turma_id,
+                sa.func.sum(lancamentos.c.peso_kg),
+                sa.func.count(),
+            )
+            .select_from(lancamentos.join(pedidos, lancamentos.c.pedido_id == pedidos.c.id))
+            .group_by(dia, lancamentos.c.ponto_coleta_id, lancamentos.c.tipo_residuo_id, pedidos.c.turma_id)
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('resumo_diario_residuo')
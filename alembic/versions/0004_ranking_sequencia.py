@@ -0,0 +1,33 @@
+"""ranking sequencia
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 21:30:00.000000
+
+Cria o contador que numera as transações que mudam o ranking de turmas,
+com sua única linha (id 1).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    sequencia = op.create_table('ranking_sequencia',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('valor', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(sequencia, [{'id': 1, 'valor': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('ranking_sequencia')
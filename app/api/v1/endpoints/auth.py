@@ -1,11 +1,11 @@
-from typing import Annotated
+from typing import Annotated, List
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.services.auth import AuthService, UserService
-from app.schemas.user import User, UserCreate, UserInfo
+from app.schemas.user import User, UserCreate, UserInfo, BulkUserResponse
 from app.deps import get_current_active_user, get_refresh_token_from_cookie, require_perfil
 from app.core.config import settings
 
@@ -16,7 +16,7 @@ router = APIRouter()
 async def login(
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     auth_service = AuthService(db)
     
@@ -50,7 +50,7 @@ async def login(
 async def refresh_token(
     response: Response,
     refresh_token: str = Depends(get_refresh_token_from_cookie),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     auth_service = AuthService(db)
     tokens = await auth_service.refresh_access_token(refresh_token)
@@ -80,7 +80,7 @@ async def logout(response: Response):
 @router.get("/me/", response_model=UserInfo)
 async def get_current_user_info(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     auth_service = AuthService(db)
     user_info = await auth_service.get_user_info(current_user.id)
@@ -98,7 +98,7 @@ async def get_current_user_info(
 async def create_coordenador(
     user_data: UserCreate,
     current_user: Annotated[User, Depends(require_perfil("ADMIN_UNI"))],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     user_service = UserService(db)
     return await user_service.create_user(user_data, "COORD")
@@ -108,7 +108,7 @@ async def create_coordenador(
 async def create_ponto_coleta(
     user_data: UserCreate,
     current_user: Annotated[User, Depends(require_perfil("ADMIN_UNI"))],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     user_service = UserService(db)
     return await user_service.create_user(user_data, "PONTO")
@@ -118,7 +118,7 @@ async def create_ponto_coleta(
 async def create_chefe_turma(
     user_data: UserCreate,
     current_user: Annotated[User, Depends(require_perfil("COORD"))],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     user_service = UserService(db)
     return await user_service.create_user(user_data, "CHEFE")
@@ -128,7 +128,17 @@ async def create_chefe_turma(
 async def create_aluno(
     user_data: UserCreate,
     current_user: Annotated[User, Depends(require_perfil("CHEFE"))],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     user_service = UserService(db)
     return await user_service.create_user(user_data, "ALUNO")
+
+
+@router.post("/signup/aluno/bulk/", response_model=BulkUserResponse)
+async def create_alunos_bulk(
+    users_data: List[UserCreate],
+    current_user: Annotated[User, Depends(require_perfil("CHEFE"))],
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    user_service = UserService(db)
+    return await user_service.create_users_bulk(users_data, "ALUNO")
@@ -1,8 +1,8 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.services.institutional import UniversidadeService, UnidadeService, CursoService, TurmaService
 from app.schemas.institutional import (
     Universidade, UniversidadeCreate,
@@ -10,83 +10,102 @@ from app.schemas.institutional import (
     Curso, CursoCreate,
     Turma, TurmaCreate
 )
+from app.schemas.pagination import Page
+from app.core.config import settings
+from app.core.responses import conditional_response
 from app.deps import get_current_active_user, require_perfil
 from app.db.models.user import User
 
 router = APIRouter()
 
 
-@router.get("/university/", response_model=List[Universidade])
+@router.get("/university/", response_model=Page[Universidade])
 async def get_universidades(
+    request: Request,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = UniversidadeService(db)
-    return await service.get_all_universidades()
+    snapshot = await service.get_universidades_page_snapshot(limit, cursor)
+    return conditional_response(request, snapshot, settings.cache_control_reference)
 
 
 @router.post("/university/", response_model=Universidade)
 async def create_universidade(
     universidade_data: UniversidadeCreate,
     current_user: User = Depends(require_perfil("ADMIN_UNI")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = UniversidadeService(db)
     return await service.create_universidade(universidade_data)
 
 
-@router.get("/unit/", response_model=List[Unidade])
+@router.get("/unit/", response_model=Page[Unidade])
 async def get_unidades(
+    request: Request,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = UnidadeService(db)
-    return await service.get_all_unidades()
+    snapshot = await service.get_unidades_page_snapshot(limit, cursor)
+    return conditional_response(request, snapshot, settings.cache_control_reference)
 
 
 @router.post("/unit/", response_model=Unidade)
 async def create_unidade(
     unidade_data: UnidadeCreate,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = UnidadeService(db)
     return await service.create_unidade(unidade_data)
 
 
-@router.get("/course/", response_model=List[Curso])
+@router.get("/course/", response_model=Page[Curso])
 async def get_cursos(
+    request: Request,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = CursoService(db)
-    return await service.get_all_cursos()
+    snapshot = await service.get_cursos_page_snapshot(limit, cursor)
+    return conditional_response(request, snapshot, settings.cache_control_reference)
 
 
 @router.post("/course/", response_model=Curso)
 async def create_curso(
     curso_data: CursoCreate,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = CursoService(db)
     return await service.create_curso(curso_data)
 
 
-@router.get("/class/", response_model=List[Turma])
+@router.get("/class/", response_model=Page[Turma])
 async def get_turmas(
+    request: Request,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = TurmaService(db)
-    return await service.get_all_turmas()
+    snapshot = await service.get_turmas_page_snapshot(limit, cursor)
+    return conditional_response(request, snapshot, settings.cache_control_reference)
 
 
 @router.post("/class/", response_model=Turma)
 async def create_turma(
     turma_data: TurmaCreate,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = TurmaService(db)
     return await service.create_turma(turma_data)
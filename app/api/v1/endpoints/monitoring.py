@@ -1,4 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
+from fastapi.responses import JSONResponse
+
+from app.core.hashing import password_hasher
+from app.core import health
+from app.core.cache import detail_cache, principal_cache, reference_cache, token_cache
+from app.core.leaderboard import leaderboard
+from app.core.metrics import render_metrics
+from app.db.session import pool_stats, engine, read_engine
 
 router = APIRouter()
 
@@ -9,3 +17,37 @@ async def healthcheck():
         "status": "healthy",
         "message": "Service is running"
     }
+
+
+@router.get("/live/")
+async def live():
+    # Liveness: o processo responde; não depende do banco
+    return {"status": "alive"}
+
+
+@router.get("/ready/")
+async def ready():
+    result = await health.readiness_checker.check()
+    if result["status"] != "ready":
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=result)
+    return result
+
+
+@router.get("/stats/")
+async def stats():
+    return {
+        "password_hashing": password_hasher.stats(),
+        "principal_cache": principal_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "reference_cache": reference_cache.stats(),
+        "detail_cache": detail_cache.stats(),
+        "leaderboard": leaderboard.stats(),
+        "db_pool": pool_stats(engine),
+        "db_read_pool": pool_stats(read_engine) if read_engine is not engine else None
+    }
+
+
+@router.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
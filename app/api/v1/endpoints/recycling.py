@@ -1,8 +1,10 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date, datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.services.recycling import (
     TipoResiduoService, PontoColetaService,
     PedidoDoacaoService, LancamentoResiduoService
@@ -13,6 +15,13 @@ from app.schemas.recycling import (
     PedidoDoacao, PedidoDoacaoCreate, PedidoDoacaoUpdate,
     LancamentoResiduo, LancamentoResiduoCreate, LancamentoResiduoUpdate
 )
+from app.schemas.pagination import Page
+from app.schemas.statistics import Estatisticas, Ranking, RankingTurma, ResumoEstatisticas, SerieTemporal
+from app.services.leaderboard import RankingService
+from app.services.statistics import EstatisticasService
+from app.core.config import settings
+from app.core.responses import conditional_response, model_response
+from app.services.export import CONTENT_TYPES
 from app.deps import get_current_active_user, require_perfil
 from app.db.models.user import User
 
@@ -20,40 +29,47 @@ router = APIRouter()
 
 
 # Tipo Resíduo endpoints
-@router.get("/tipo-residuo/", response_model=List[TipoResiduo])
+@router.get("/tipo-residuo/", response_model=Page[TipoResiduo])
 async def get_tipos_residuo(
+    request: Request,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = TipoResiduoService(db)
-    return await service.get_all_tipos_residuo()
+    snapshot = await service.get_tipos_residuo_page_snapshot(limit, cursor)
+    return conditional_response(request, snapshot, settings.cache_control_reference)
 
 
 @router.post("/tipo-residuo/", response_model=TipoResiduo)
 async def create_tipo_residuo(
     tipo_data: TipoResiduoCreate,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = TipoResiduoService(db)
     return await service.create_tipo_residuo(tipo_data)
 
 
 # Ponto Coleta endpoints
-@router.get("/pontos-coleta/", response_model=List[PontoColeta])
+@router.get("/pontos-coleta/", response_model=Page[PontoColeta])
 async def get_pontos_coleta(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
     current_user: User = Depends(require_perfil("ADMIN_UNI")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = PontoColetaService(db)
-    return await service.get_all_pontos_coleta()
+    return model_response(await service.get_pontos_coleta_page(limit, cursor, include))
 
 
 @router.post("/pontos-coleta/", response_model=PontoColeta)
 async def create_ponto_coleta(
     ponto_data: PontoColetaCreate,
     current_user: User = Depends(require_perfil("ADMIN_UNI")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = PontoColetaService(db)
     return await service.create_ponto_coleta(ponto_data)
@@ -61,20 +77,15 @@ async def create_ponto_coleta(
 
 @router.get("/ponto-coleta/{ponto_id}/", response_model=PontoColeta)
 async def get_ponto_coleta(
+    request: Request,
     ponto_id: int,
+    include: Optional[str] = None,
     current_user: User = Depends(require_perfil("ADMIN_UNI")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = PontoColetaService(db)
-    ponto = await service.get_ponto_coleta_by_id(ponto_id)
-    
-    if not ponto:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ponto não encontrado"
-        )
-    
-    return ponto
+    snapshot = await service.get_ponto_coleta_snapshot(ponto_id, include)
+    return conditional_response(request, snapshot, settings.cache_control_detail)
 
 
 @router.put("/ponto-coleta/{ponto_id}/", response_model=PontoColeta)
@@ -82,7 +93,7 @@ async def update_ponto_coleta(
     ponto_id: int,
     ponto_data: PontoColetaUpdate,
     current_user: User = Depends(require_perfil("ADMIN_UNI")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = PontoColetaService(db)
     ponto = await service.update_ponto_coleta(ponto_id, ponto_data)
@@ -100,7 +111,7 @@ async def update_ponto_coleta(
 async def delete_ponto_coleta(
     ponto_id: int,
     current_user: User = Depends(require_perfil("ADMIN_UNI")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = PontoColetaService(db)
     deleted = await service.delete_ponto_coleta(ponto_id)
@@ -115,20 +126,23 @@ async def delete_ponto_coleta(
 
 
 # Pedido Doação endpoints
-@router.get("/pedido-doacao/", response_model=List[PedidoDoacao])
+@router.get("/pedido-doacao/", response_model=Page[PedidoDoacao])
 async def get_pedidos_doacao(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
     current_user: User = Depends(require_perfil("CHEFE")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = PedidoDoacaoService(db)
-    return await service.get_all_pedidos_doacao()
+    return model_response(await service.get_pedidos_doacao_page(limit, cursor, include))
 
 
 @router.post("/pedido-doacao/", response_model=PedidoDoacao)
 async def create_pedido_doacao(
     pedido_data: PedidoDoacaoCreate,
     current_user: User = Depends(require_perfil("CHEFE")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = PedidoDoacaoService(db)
     return await service.create_pedido_doacao(pedido_data, current_user.id)
@@ -136,20 +150,15 @@ async def create_pedido_doacao(
 
 @router.get("/pedido-doacao/{pedido_id}/", response_model=PedidoDoacao)
 async def get_pedido_doacao(
+    request: Request,
     pedido_id: int,
+    include: Optional[str] = None,
     current_user: User = Depends(require_perfil("CHEFE")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = PedidoDoacaoService(db)
-    pedido = await service.get_pedido_doacao_by_id(pedido_id)
-    
-    if not pedido:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Pedido não encontrado"
-        )
-    
-    return pedido
+    snapshot = await service.get_pedido_doacao_snapshot(pedido_id, include)
+    return conditional_response(request, snapshot, settings.cache_control_detail)
 
 
 @router.put("/pedido-doacao/{pedido_id}/", response_model=PedidoDoacao)
@@ -157,7 +166,7 @@ async def update_pedido_doacao(
     pedido_id: int,
     pedido_data: PedidoDoacaoUpdate,
     current_user: User = Depends(require_perfil("CHEFE")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = PedidoDoacaoService(db)
     pedido = await service.update_pedido_doacao(pedido_id, pedido_data)
@@ -175,7 +184,7 @@ async def update_pedido_doacao(
 async def delete_pedido_doacao(
     pedido_id: int,
     current_user: User = Depends(require_perfil("CHEFE")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = PedidoDoacaoService(db)
     deleted = await service.delete_pedido_doacao(pedido_id)
@@ -190,20 +199,45 @@ async def delete_pedido_doacao(
 
 
 # Lançamento Resíduo endpoints
-@router.get("/lancamento-residuo/", response_model=List[LancamentoResiduo])
+@router.get("/lancamento-residuo/", response_model=Page[LancamentoResiduo])
 async def get_lancamentos_residuo(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
+    current_user: User = Depends(require_perfil("PONTO")),
+    db: AsyncSession = Depends(get_read_db)
+):
+    service = LancamentoResiduoService(db)
+    return model_response(await service.get_lancamentos_residuo_page(limit, cursor, include))
+
+
+@router.get("/lancamento-residuo/export/")
+async def export_lancamentos_residuo(
+    format: Literal["csv", "ndjson"] = "csv",
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    ponto_coleta_id: Optional[int] = None,
+    tipo_residuo_id: Optional[int] = None,
+    universidade_id: Optional[int] = None,
     current_user: User = Depends(require_perfil("PONTO")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
+    # A sessão (escopo da requisição) fica aberta até o fim do streaming
     service = LancamentoResiduoService(db)
-    return await service.get_all_lancamentos_residuo()
+    return StreamingResponse(
+        service.export_lancamentos_residuo(
+            format, data_inicio, data_fim, ponto_coleta_id, tipo_residuo_id, universidade_id
+        ),
+        media_type=CONTENT_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="lancamentos.{format}"'}
+    )
 
 
 @router.post("/lancamento-residuo/", response_model=LancamentoResiduo)
 async def create_lancamento_residuo(
     lancamento_data: LancamentoResiduoCreate,
     current_user: User = Depends(require_perfil("PONTO")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = LancamentoResiduoService(db)
     return await service.create_lancamento_residuo(lancamento_data)
@@ -211,20 +245,15 @@ async def create_lancamento_residuo(
 
 @router.get("/lancamento-residuo/{lancamento_id}/", response_model=LancamentoResiduo)
 async def get_lancamento_residuo(
+    request: Request,
     lancamento_id: int,
+    include: Optional[str] = None,
     current_user: User = Depends(require_perfil("PONTO")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = LancamentoResiduoService(db)
-    lancamento = await service.get_lancamento_residuo_by_id(lancamento_id)
-    
-    if not lancamento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Lançamento não encontrado"
-        )
-    
-    return lancamento
+    snapshot = await service.get_lancamento_residuo_snapshot(lancamento_id, include)
+    return conditional_response(request, snapshot, settings.cache_control_detail)
 
 
 @router.put("/lancamento-residuo/{lancamento_id}/", response_model=LancamentoResiduo)
@@ -232,7 +261,7 @@ async def update_lancamento_residuo(
     lancamento_id: int,
     lancamento_data: LancamentoResiduoUpdate,
     current_user: User = Depends(require_perfil("PONTO")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = LancamentoResiduoService(db)
     lancamento = await service.update_lancamento_residuo(lancamento_id, lancamento_data)
@@ -250,7 +279,7 @@ async def update_lancamento_residuo(
 async def delete_lancamento_residuo(
     lancamento_id: int,
     current_user: User = Depends(require_perfil("PONTO")),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     service = LancamentoResiduoService(db)
     deleted = await service.delete_lancamento_residuo(lancamento_id)
@@ -262,3 +291,91 @@ async def delete_lancamento_residuo(
         )
     
     return {"detail": "Lançamento deletado com sucesso"}
+
+
+# Estatísticas
+@router.get("/estatisticas/", response_model=Estatisticas)
+async def get_estatisticas(
+    group_by: Optional[str] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    universidade_id: Optional[int] = None,
+    unidade_id: Optional[int] = None,
+    curso_id: Optional[int] = None,
+    turma_id: Optional[int] = None,
+    ponto_coleta_id: Optional[int] = None,
+    tipo_residuo_id: Optional[int] = None,
+    current_user: User = Depends(require_perfil("ADMIN_UNI")),
+    db: AsyncSession = Depends(get_read_db)
+):
+    service = EstatisticasService(db)
+    return model_response(await service.get_estatisticas(
+        group_by, data_inicio, data_fim,
+        universidade_id, unidade_id, curso_id, turma_id, ponto_coleta_id, tipo_residuo_id
+    ))
+
+
+@router.get("/estatisticas/resumo/", response_model=ResumoEstatisticas)
+async def get_estatisticas_resumo(
+    group_by: Optional[str] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    universidade_id: Optional[int] = None,
+    unidade_id: Optional[int] = None,
+    curso_id: Optional[int] = None,
+    turma_id: Optional[int] = None,
+    ponto_coleta_id: Optional[int] = None,
+    tipo_residuo_id: Optional[int] = None,
+    current_user: User = Depends(require_perfil("ADMIN_UNI")),
+    db: AsyncSession = Depends(get_read_db)
+):
+    service = EstatisticasService(db)
+    return model_response(await service.get_resumo(
+        group_by, data_inicio, data_fim,
+        universidade_id, unidade_id, curso_id, turma_id, ponto_coleta_id, tipo_residuo_id
+    ))
+
+
+@router.get("/estatisticas/serie/", response_model=SerieTemporal)
+async def get_estatisticas_serie(
+    intervalo: Literal["dia", "semana", "mes"] = "dia",
+    group_by: Optional[str] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    max_pontos: Optional[int] = Query(None, ge=1),
+    universidade_id: Optional[int] = None,
+    unidade_id: Optional[int] = None,
+    curso_id: Optional[int] = None,
+    turma_id: Optional[int] = None,
+    ponto_coleta_id: Optional[int] = None,
+    tipo_residuo_id: Optional[int] = None,
+    current_user: User = Depends(require_perfil("ADMIN_UNI")),
+    db: AsyncSession = Depends(get_read_db)
+):
+    service = EstatisticasService(db)
+    return model_response(await service.get_serie(
+        intervalo, group_by, data_inicio, data_fim, max_pontos,
+        universidade_id, unidade_id, curso_id, turma_id, ponto_coleta_id, tipo_residuo_id
+    ))
+
+
+# Ranking de turmas (em memória, sem consulta ao banco)
+@router.get("/ranking/", response_model=Ranking)
+async def get_ranking(
+    escopo: Literal["geral", "universidade", "unidade"] = "geral",
+    escopo_id: Optional[int] = None,
+    periodo: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    limit: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    return model_response(RankingService().get_ranking(escopo, escopo_id, periodo, limit))
+
+
+@router.get("/ranking/turma/{turma_id}/", response_model=RankingTurma)
+async def get_ranking_turma(
+    turma_id: int,
+    escopo: Literal["geral", "universidade", "unidade"] = "geral",
+    periodo: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    current_user: User = Depends(get_current_active_user)
+):
+    return model_response(RankingService().get_ranking_turma(turma_id, escopo, periodo))
@@ -0,0 +1,235 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, Union
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.config import settings
+from app.core.responses import Snapshot
+
+
+class TTLCache:
+    """Cache em memória com expiração por entrada e despejo LRU.
+
+    É local a cada worker e não é thread-safe: deve ser usado apenas a partir
+    do event loop, sem ``await`` entre leitura e escrita.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class VersionedTTLCache(TTLCache):
+    """``TTLCache`` com um contador de invalidações por chave.
+
+    Quem lê o valor do banco guarda a versão antes da consulta e grava com
+    ``set_if_version``: se a chave foi invalidada no meio, o valor lido pode
+    ser anterior à escrita e é descartado.
+
+    As versões vêm de um contador único e ficam num LRU do tamanho do cache.
+    Uma chave despejada dele passa a ter a versão mínima (``_floor``), que é
+    a maior já despejada: continua diferente da que uma consulta em andamento
+    guardou antes da invalidação. Voltar a zero faria o valor antigo valer.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._versions: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+
+    def version(self, key: Hashable) -> int:
+        return self._versions.get(key, self._floor)
+
+    def set_if_version(self, key: Hashable, value: Any, version: int) -> None:
+        if self.version(key) == version:
+            self.set(key, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._counter += 1
+        self._versions[key] = self._counter
+        self._versions.move_to_end(key)
+        while len(self._versions) > max(self.maxsize, 1):
+            # Despejadas em ordem de invalidação: a versão mínima só cresce
+            self._floor = self._versions.popitem(last=False)[1]
+        super().invalidate(key)
+
+    def clear(self) -> None:
+        super().clear()
+        self._versions.clear()
+        self._floor = self._counter
+
+
+class ReferenceCache:
+    """Snapshots versionados de respostas já serializadas (com ETag), por tabela.
+
+    Cada tabela tem um contador de versão, incrementado quando uma sessão
+    escreve nela e de novo no commit (ver ``_track_writes``). Um snapshot só
+    é gravado se a versão não mudou durante a consulta que o produziu, e só é
+    servido enquanto a versão for a mesma. Os contadores são locais ao worker:
+    em outros workers o TTL limita por quanto tempo uma versão antiga é servida.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[str, int] = {}
+
+    def version(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def invalidate(self, table: str) -> None:
+        self._versions[table] = self.version(table) + 1
+
+    async def get_or_load(
+        self,
+        table: Union[str, Tuple[str, ...]],
+        key: Hashable,
+        load: Callable[[], Awaitable[bytes]]
+    ) -> Snapshot:
+        """Snapshot de ``key``; com várias tabelas (consultas com joins ou
+        relacionamentos carregados), uma escrita em qualquer uma o invalida"""
+        tables = (table,) if isinstance(table, str) else table
+        version = tuple(self.version(name) for name in tables)
+        entry = self._entries.get((tables, key))
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        snapshot = Snapshot.of(await load())
+        # Uma escrita durante a consulta torna o resultado suspeito: não guarda
+        if tuple(self.version(name) for name in tables) == version:
+            self._entries.set((tables, key), (version, snapshot))
+        return snapshot
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {**self._entries.stats(), "versions": dict(self._versions)}
+
+
+# Principais autenticados por user_id, usados por get_current_user
+principal_cache = VersionedTTLCache(
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl_seconds
+)
+
+# Payloads de JWT já verificados, por digest do token; expiram no "exp"
+token_cache = TTLCache(
+    maxsize=settings.token_cache_size,
+    ttl=0
+)
+
+# Listas de dados de referência serializadas, invalidadas por escrita nas tabelas
+reference_cache = ReferenceCache(
+    maxsize=settings.reference_cache_size,
+    ttl=settings.reference_cache_ttl_seconds
+)
+
+# Respostas de detalhe (/{id}/) serializadas: um If-None-Match que bate com o
+# snapshot vira 304 sem consulta. Separado para não despejar as listas acima
+detail_cache = ReferenceCache(
+    maxsize=settings.detail_cache_size,
+    ttl=settings.detail_cache_ttl_seconds
+)
+
+_TABLE_CACHES = (reference_cache, detail_cache)
+
+_WRITTEN_TABLES = "written_tables"
+
+
+def _mark_written(session: Session, table: str) -> None:
+    # Invalida já, para a própria transação não ler um snapshot antigo, e de
+    # novo no commit, descartando snapshots lidos antes dele
+    session.info.setdefault(_WRITTEN_TABLES, set()).add(table)
+    for cache in _TABLE_CACHES:
+        cache.invalidate(table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_writes(state: ORMExecuteState) -> None:
+    # INSERT/UPDATE/DELETE em massa (update_returning, delete_returning, ...)
+    if state.is_insert or state.is_update or state.is_delete:
+        _mark_written(state.session, state.statement.table.name)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush_writes(session: Session, flush_context: Any) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        _mark_written(session, inspect(obj).mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    for table in session.info.pop(_WRITTEN_TABLES, ()):
+        for cache in _TABLE_CACHES:
+            cache.invalidate(table)
+
+
+_STALE_PRINCIPALS = "stale_principals"
+
+
+def invalidate_principal(session: Any, user_id: int) -> None:
+    """Invalida o principal de ``user_id`` já e de novo no commit de ``session``:
+    uma leitura concorrente feita antes do commit ainda vê a linha antiga"""
+    session.info.setdefault(_STALE_PRINCIPALS, set()).add(user_id)
+    principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_principals_on_commit(session: Session) -> None:
+    for user_id in session.info.pop(_STALE_PRINCIPALS, ()):
+        principal_cache.invalidate(user_id)
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
-from typing import List, Union, Any
+from typing import List, Optional, Union, Any
 
 
 class Settings(BaseSettings):
@@ -21,12 +21,66 @@ class Settings(BaseSettings):
     debug: bool = Field(default=False, alias="DEBUG")
     
     database_url: str = Field(default="sqlite:///./test.db", alias="DATABASE_URL")
+    read_database_url: Optional[str] = Field(default=None, alias="READ_DATABASE_URL")
+    db_pool_size: int = Field(default=10, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=10.0, alias="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(default=1800, alias="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")
+    db_pool_warm: bool = Field(default=True, alias="DB_POOL_WARM")
+    db_statement_cache_size: int = Field(default=100, alias="DB_STATEMENT_CACHE_SIZE")
+    
+    # Perfil SQLite (WAL, pragmas e escritor único) para bancos em arquivo
+    sqlite_profile: bool = Field(default=True, alias="SQLITE_PROFILE")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_mmap_size: int = Field(default=268435456, alias="SQLITE_MMAP_SIZE")
+    sqlite_cache_size: int = Field(default=-65536, alias="SQLITE_CACHE_SIZE")
+    sqlite_write_timeout: float = Field(default=30.0, alias="SQLITE_WRITE_TIMEOUT")
     
     jwt_secret_key: str = Field(default="your_jwt_secret_key", alias="JWT_SECRET_KEY")
     jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGORITHM")
     access_token_expire_minutes: int = Field(default=15, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
     refresh_token_expire_days: int = Field(default=15, alias="REFRESH_TOKEN_EXPIRE_DAYS")
     
+    # Autorização sem consulta ao banco: perfil e vínculos assinados no access token
+    stateless_auth: bool = Field(default=False, alias="STATELESS_AUTH")
+    stateless_access_token_expire_minutes: int = Field(default=5, alias="STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES")
+    token_cache_size: int = Field(default=4096, alias="TOKEN_CACHE_SIZE")
+    
+    password_hash_pool_size: int = Field(default=4, alias="PASSWORD_HASH_POOL_SIZE")
+    password_hash_queue_limit: int = Field(default=64, alias="PASSWORD_HASH_QUEUE_LIMIT")
+    bulk_signup_max_size: int = Field(default=500, alias="BULK_SIGNUP_MAX_SIZE")
+    
+    principal_cache_size: int = Field(default=1024, alias="PRINCIPAL_CACHE_SIZE")
+    principal_cache_ttl_seconds: float = Field(default=30.0, alias="PRINCIPAL_CACHE_TTL_SECONDS")
+    reference_cache_size: int = Field(default=256, alias="REFERENCE_CACHE_SIZE")
+    reference_cache_ttl_seconds: float = Field(default=60.0, alias="REFERENCE_CACHE_TTL_SECONDS")
+    detail_cache_size: int = Field(default=1024, alias="DETAIL_CACHE_SIZE")
+    detail_cache_ttl_seconds: float = Field(default=10.0, alias="DETAIL_CACHE_TTL_SECONDS")
+    
+    # Cache-Control por tipo de rota; respostas autenticadas, logo "private"
+    cache_control_reference: str = Field(default="private, max-age=60", alias="CACHE_CONTROL_REFERENCE")
+    cache_control_detail: str = Field(default="private, no-cache", alias="CACHE_CONTROL_DETAIL")
+    
+    # Recarga do ranking de turmas a partir do banco (0 desativa)
+    leaderboard_refresh_seconds: float = Field(default=60.0, alias="LEADERBOARD_REFRESH_SECONDS")
+    
+    page_default_limit: int = Field(default=50, alias="PAGE_DEFAULT_LIMIT")
+    page_max_limit: int = Field(default=500, alias="PAGE_MAX_LIMIT")
+    export_batch_size: int = Field(default=1000, alias="EXPORT_BATCH_SIZE")
+    timeseries_max_points: int = Field(default=500, alias="TIMESERIES_MAX_POINTS")
+    
+    query_stats_enabled: bool = Field(default=True, alias="QUERY_STATS_ENABLED")
+    n_plus_one_threshold: int = Field(default=5, alias="N_PLUS_ONE_THRESHOLD")
+    
+    metrics_enabled: bool = Field(default=True, alias="METRICS_ENABLED")
+    prometheus_multiproc_dir: Optional[str] = Field(default=None, alias="PROMETHEUS_MULTIPROC_DIR")
+    
+    readiness_cache_seconds: float = Field(default=2.0, alias="READINESS_CACHE_SECONDS")
+    readiness_db_timeout: float = Field(default=2.0, alias="READINESS_DB_TIMEOUT")
+    readiness_db_latency_ms: float = Field(default=500.0, alias="READINESS_DB_LATENCY_MS")
+    readiness_loop_lag_ms: float = Field(default=200.0, alias="READINESS_LOOP_LAG_MS")
+    
     cors_origins: Union[str, List[str]] = Field(
         default="http://localhost:3000",
         alias="CORS_ORIGINS"
@@ -0,0 +1,100 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.security import verify_password, get_password_hash
+
+
+class PasswordHasher:
+    """Executa bcrypt em um pool de threads limitado, fora do event loop.
+
+    O bcrypt libera o GIL durante o cálculo, então threads já usam vários
+    núcleos. Quando há mais de ``max_workers + queue_limit`` operações
+    pendentes, novas chamadas são rejeitadas com 503.
+    """
+
+    def __init__(self, max_workers: int, queue_limit: int):
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hasher"
+            )
+        return self._executor
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_workers + self.queue_limit:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password hashing queue is full"
+            )
+
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(func, *args)
+        self._pending += 1
+        self._peak_pending = max(self._peak_pending, self._pending)
+        # A contagem acompanha a thread, não quem espera: cancelar a requisição
+        # não interrompe um bcrypt já em execução
+        future.add_done_callback(lambda done: self._finish_threadsafe(loop, done))
+        return await asyncio.wrap_future(future)
+
+    def _finish_threadsafe(self, loop: asyncio.AbstractEventLoop, future: Future) -> None:
+        try:
+            loop.call_soon_threadsafe(self._finish, future)
+        except RuntimeError:
+            # Loop já encerrado (shutdown): não há mais quem leia as contagens
+            pass
+
+    def _finish(self, future: Future) -> None:
+        self._pending -= 1
+        if not future.cancelled() and future.exception() is None:
+            self._completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        # Em ondas do tamanho do pool, para não ocupar a fila do login
+        hashes: List[str] = []
+        for start in range(0, len(passwords), self.max_workers):
+            chunk = passwords[start:start + self.max_workers]
+            hashes.extend(await asyncio.gather(*(self.hash(p) for p in chunk)))
+        return hashes
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        active = min(self._pending, self.max_workers)
+        return {
+            "pool_size": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "active": active,
+            "queued": self._pending - active,
+            "peak_pending": self._peak_pending,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "saturation": round(self._pending / (self.max_workers + self.queue_limit), 4),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_pool_size,
+    queue_limit=settings.password_hash_queue_limit
+)
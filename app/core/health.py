@@ -0,0 +1,130 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db.session import engine, read_engine, pool_stats, sqlite_profile_enabled
+
+
+class ReadinessChecker:
+    """Verificação de prontidão do worker para receber tráfego.
+
+    Executa um ``SELECT 1`` cronometrado em cada engine, verifica se o pool de
+    conexões está esgotado e mede o atraso do event loop. O resultado fica em
+    cache por ``READINESS_CACHE_SECONDS`` e probes simultâneos compartilham a
+    mesma verificação, para que rajadas de probes não cheguem ao banco.
+
+    Engines em ``single_writer`` (perfil SQLite: pool de uma conexão, sem
+    overflow) ficam ocupados durante qualquer escrita: o pool cheio não conta
+    como esgotado e o ``SELECT 1`` roda no engine de leitura, sem esperar na
+    fila do escritor.
+    """
+
+    def __init__(self, engines: Dict[str, AsyncEngine], single_writer: Sequence[str] = ()):
+        self.engines = engines
+        self.single_writer = set(single_writer)
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> dict:
+        if self._fresh():
+            return {**self._result, "cached": True}
+        async with self._lock:
+            # Outro probe pode ter atualizado o resultado enquanto esperávamos
+            if self._fresh():
+                return {**self._result, "cached": True}
+            self._result = await self._run_checks()
+            self._checked_at = time.monotonic()
+        return {**self._result, "cached": False}
+
+    def _fresh(self) -> bool:
+        return (
+            self._result is not None
+            and time.monotonic() - self._checked_at < settings.readiness_cache_seconds
+        )
+
+    async def _run_checks(self) -> dict:
+        reasons: List[str] = []
+        checks = {"event_loop": await self._check_loop_lag(reasons)}
+        for name, target in self.engines.items():
+            single_writer = name in self.single_writer
+            checks[f"{name}_pool"] = self._check_pool(name, target, reasons, single_writer)
+            if single_writer:
+                probe = self.engines.get("read", target)
+                checks[f"{name}_database"] = await self._check_database(name, probe, reasons, nonblocking=True)
+            else:
+                checks[f"{name}_database"] = await self._check_database(name, target, reasons)
+        return {
+            "status": "not_ready" if reasons else "ready",
+            "reasons": reasons,
+            "checks": checks,
+        }
+
+    @staticmethod
+    async def _check_loop_lag(reasons: List[str]) -> dict:
+        # Tempo até o loop voltar a esta tarefa: cresce com callbacks enfileirados
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        lag_ms = (time.perf_counter() - start) * 1000
+        if lag_ms > settings.readiness_loop_lag_ms:
+            reasons.append(f"event loop lag {lag_ms:.1f}ms")
+        return {"lag_ms": round(lag_ms, 3)}
+
+    @staticmethod
+    def _check_pool(name: str, target: AsyncEngine, reasons: List[str], single_writer: bool = False) -> dict:
+        stats = pool_stats(target)
+        if single_writer:
+            # A conexão única ocupada é uma escrita em andamento, não esgotamento
+            stats["single_writer"] = True
+            stats["exhausted"] = False
+        elif "size" in stats and stats["max_overflow"] >= 0:
+            capacity = stats["size"] + stats["max_overflow"]
+            stats["exhausted"] = stats["checked_out"] >= capacity
+            if stats["exhausted"]:
+                reasons.append(f"{name} db pool exhausted ({stats['checked_out']}/{capacity})")
+        return stats
+
+    @staticmethod
+    def _has_free_connection(target: AsyncEngine) -> bool:
+        stats = pool_stats(target)
+        if "size" not in stats or stats["max_overflow"] < 0:
+            return True
+        return stats["checked_out"] < stats["size"] + stats["max_overflow"]
+
+    @classmethod
+    async def _check_database(
+        cls,
+        name: str,
+        target: AsyncEngine,
+        reasons: List[str],
+        nonblocking: bool = False
+    ) -> dict:
+        # Sem conexão livre não espera na fila; o pool cheio já é reportado à parte
+        if nonblocking and not cls._has_free_connection(target):
+            return {"ok": True, "skipped": "no idle connection"}
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(settings.readiness_db_timeout):
+                async with target.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except TimeoutError:
+            reasons.append(f"{name} database timed out after {settings.readiness_db_timeout}s")
+            return {"ok": False, "error": "timeout"}
+        except Exception as exc:
+            reasons.append(f"{name} database unreachable: {type(exc).__name__}")
+            return {"ok": False, "error": type(exc).__name__}
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        if latency_ms > settings.readiness_db_latency_ms:
+            reasons.append(f"{name} database latency {latency_ms:.1f}ms")
+        return {"ok": True, "latency_ms": round(latency_ms, 3)}
+
+
+readiness_checker = ReadinessChecker(
+    {"primary": engine, "read": read_engine} if read_engine is not engine else {"primary": engine},
+    single_writer=("primary",) if sqlite_profile_enabled else ()
+)
@@ -0,0 +1,275 @@
+import time
+from bisect import bisect_left, insort
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.db.models.recycling import SequenciaRanking
+
+ESCOPOS = ("geral", "universidade", "unidade")
+
+# (período "AAAA-MM" ou None para o acumulado, escopo, id do escopo)
+ChaveRanking = Tuple[Optional[str], str, Optional[int]]
+
+
+class TurmaInfo(NamedTuple):
+    nome: str
+    universidade_id: int
+    unidade_id: int
+
+
+class DeltaRanking(NamedTuple):
+    turma_id: int
+    turma: TurmaInfo
+    periodo: str
+    kg: Decimal
+
+
+class TurmaRanking(NamedTuple):
+    """Turma renomeada ou movida (``turma``) ou removida (``None``)"""
+    turma_id: int
+    turma: Optional[TurmaInfo]
+
+
+EventoRanking = Union[DeltaRanking, TurmaRanking]
+
+
+def periodo_of(dia: date) -> str:
+    return dia.strftime("%Y-%m")
+
+
+class RankedBoard:
+    """kg por turma em ordem decrescente, mantida com bisect: top-N e posição
+    de uma turma sem percorrer o ranking inteiro."""
+
+    def __init__(self):
+        self._kg: Dict[int, Decimal] = {}
+        self._order: List[Tuple[Decimal, int]] = []  # (-kg, turma_id)
+
+    def __len__(self) -> int:
+        return len(self._kg)
+
+    def add(self, turma_id: int, kg: Decimal) -> None:
+        atual = self._kg.pop(turma_id, None)
+        if atual is not None:
+            del self._order[bisect_left(self._order, (-atual, turma_id))]
+            kg += atual
+        if kg > 0:
+            self._kg[turma_id] = kg
+            insort(self._order, (-kg, turma_id))
+
+    def top(self, n: int) -> List[Tuple[int, int, Decimal]]:
+        """``(posição, turma_id, kg)``; empates dividem a posição (1, 2, 2, 4)"""
+        items: List[Tuple[int, int, Decimal]] = []
+        for i, (negativo, turma_id) in enumerate(self._order[:n]):
+            kg = -negativo
+            posicao = items[-1][0] if items and items[-1][2] == kg else i + 1
+            items.append((posicao, turma_id, kg))
+        return items
+
+    def rank(self, turma_id: int) -> Optional[Tuple[int, Decimal]]:
+        kg = self._kg.get(turma_id)
+        if kg is None:
+            return None
+        # (-kg,) ordena antes de qualquer (-kg, id): conta só quem tem mais kg
+        return bisect_left(self._order, (-kg,)) + 1, kg
+
+
+class Leaderboard:
+    """Ranking de turmas por kg, em memória, por escopo (geral, universidade,
+    unidade) e período (acumulado e por mês).
+
+    É carregado do resumo diário com ``load`` e atualizado com os eventos das
+    escritas de lançamentos e turmas, aplicados no commit da sessão que os
+    registrou (``record``). É local ao worker e, como o ``ReferenceCache``, só
+    deve ser usado a partir do event loop; a recarga periódica traz as escritas
+    feitas por outros workers.
+
+    Cada commit com eventos incrementa ``ranking_sequencia`` na própria
+    transação, e a recarga lê esse contador no mesmo comando dos totais. Uma
+    recarga começa com ``begin_refresh``, antes da consulta: os eventos
+    aplicados enquanto ela roda ficam num diário com seu número, e ``load``
+    reaplica sobre os totais só os posteriores ao snapshot, de modo que um
+    commit não se perde nem conta duas vezes.
+    """
+
+    def __init__(self):
+        self._boards: Dict[ChaveRanking, RankedBoard] = {}
+        self._turmas: Dict[int, TurmaInfo] = {}
+        self._periodos: Dict[int, Dict[str, Decimal]] = {}
+        self.loaded_at: Optional[float] = None
+        self.deltas_applied = 0
+        self._journal: List[Tuple[Optional[int], EventoRanking]] = []
+        self._refreshes = 0
+
+    @staticmethod
+    def _scopes(info: TurmaInfo) -> Tuple[Tuple[str, Optional[int]], ...]:
+        return (("geral", None), ("universidade", info.universidade_id), ("unidade", info.unidade_id))
+
+    def _add(self, turma_id: int, info: TurmaInfo, periodo: str, kg: Decimal) -> None:
+        for chave_periodo in (None, periodo):
+            for escopo, escopo_id in self._scopes(info):
+                self._boards.setdefault((chave_periodo, escopo, escopo_id), RankedBoard()).add(turma_id, kg)
+
+    def _place(self, turma_id: int, info: TurmaInfo) -> None:
+        # Turma que mudou de universidade/unidade leva seus totais para os novos escopos
+        anterior = self._turmas.get(turma_id)
+        self._turmas[turma_id] = info
+        if anterior is None or self._scopes(anterior) == self._scopes(info):
+            return
+        for periodo, kg in self._periodos.get(turma_id, {}).items():
+            self._add(turma_id, anterior, periodo, -kg)
+            self._add(turma_id, info, periodo, kg)
+
+    def _apply(self, delta: DeltaRanking) -> None:
+        self._place(delta.turma_id, delta.turma)
+        self._add(delta.turma_id, delta.turma, delta.periodo, delta.kg)
+        por_periodo = self._periodos.setdefault(delta.turma_id, {})
+        por_periodo[delta.periodo] = por_periodo.get(delta.periodo, 0) + delta.kg
+
+    def _apply_turma(self, evento: TurmaRanking) -> None:
+        # Turma fora do ranking não tem totais; entra com o primeiro delta
+        anterior = self._turmas.get(evento.turma_id)
+        if anterior is None:
+            return
+        if evento.turma is not None:
+            self._place(evento.turma_id, evento.turma)
+            return
+        for periodo, kg in self._periodos.pop(evento.turma_id, {}).items():
+            self._add(evento.turma_id, anterior, periodo, -kg)
+        del self._turmas[evento.turma_id]
+
+    def _apply_event(self, evento: EventoRanking) -> None:
+        if isinstance(evento, DeltaRanking):
+            self._apply(evento)
+        else:
+            self._apply_turma(evento)
+
+    def apply(self, eventos: Iterable[EventoRanking], sequencia: Optional[int] = None) -> None:
+        """Aplica os eventos de um commit; ``sequencia`` é o número que ele
+        gravou em ``ranking_sequencia``"""
+        for evento in eventos:
+            self._apply_event(evento)
+            if isinstance(evento, DeltaRanking):
+                self.deltas_applied += 1
+            if self._refreshes:
+                self._journal.append((sequencia, evento))
+
+    def begin_refresh(self) -> int:
+        """Marca o início de uma recarga; devolve a posição a passar a ``load``"""
+        self._refreshes += 1
+        return len(self._journal)
+
+    def end_refresh(self) -> None:
+        self._refreshes -= 1
+        if not self._refreshes:
+            self._journal = []
+
+    def load(
+        self,
+        rows: Iterable[Any],
+        sequencia: Optional[int] = None,
+        desde: Optional[int] = None
+    ) -> None:
+        """Substitui o ranking pelos totais ``(turma_id, nome, universidade_id,
+        unidade_id, periodo, total_kg)`` lidos do banco com ``ranking_sequencia``
+        igual a ``sequencia`` e, com ``desde``, pelos eventos aplicados desde o
+        ``begin_refresh`` correspondente que o snapshot ainda não continha"""
+        novo = Leaderboard()
+        for row in rows:
+            novo._apply(DeltaRanking(
+                row.turma_id,
+                TurmaInfo(row.nome, row.universidade_id, row.unidade_id),
+                row.periodo,
+                row.total_kg
+            ))
+        if desde is not None:
+            for numero, evento in self._journal[desde:]:
+                if numero is None or sequencia is None or numero > sequencia:
+                    novo._apply_event(evento)
+        self._boards, self._turmas, self._periodos = novo._boards, novo._turmas, novo._periodos
+        self.loaded_at = time.time()
+
+    def clear(self) -> None:
+        self._boards, self._turmas, self._periodos = {}, {}, {}
+        self.loaded_at = None
+
+    def turma(self, turma_id: int) -> Optional[TurmaInfo]:
+        return self._turmas.get(turma_id)
+
+    def top(
+        self,
+        escopo: str = "geral",
+        escopo_id: Optional[int] = None,
+        periodo: Optional[str] = None,
+        n: int = 10
+    ) -> List[Tuple[int, int, Decimal]]:
+        board = self._boards.get((periodo, escopo, escopo_id))
+        return board.top(n) if board else []
+
+    def rank(
+        self,
+        turma_id: int,
+        escopo: str = "geral",
+        periodo: Optional[str] = None
+    ) -> Optional[Tuple[int, Decimal, int]]:
+        """``(posição, kg, turmas no ranking)`` da turma no escopo a que pertence"""
+        info = self._turmas.get(turma_id)
+        if info is None:
+            return None
+        escopo_id = dict(self._scopes(info))[escopo]
+        board = self._boards.get((periodo, escopo, escopo_id))
+        ranked = board.rank(turma_id) if board else None
+        return (*ranked, len(board)) if ranked else None
+
+    def stats(self) -> dict:
+        return {
+            "boards": len(self._boards),
+            "turmas": len(self._turmas),
+            "deltas_applied": self.deltas_applied,
+            "loaded_at": self.loaded_at,
+        }
+
+
+leaderboard = Leaderboard()
+
+_PENDING_EVENTS = "leaderboard_events"
+_SEQUENCE = "leaderboard_sequence"
+
+
+def record(session: Any, evento: EventoRanking) -> None:
+    """Registra ``evento`` na sessão; vale para o ranking só após o commit"""
+    session.info.setdefault(_PENDING_EVENTS, []).append(evento)
+
+
+def _next_sequence(session: Session) -> int:
+    # O UPDATE trava a linha até o commit: os números seguem a ordem dos commits
+    tabela = SequenciaRanking.__table__
+    stmt = tabela.update().where(tabela.c.id == 1).values(valor=tabela.c.valor + 1)
+    if session.get_bind().dialect.update_returning:
+        return session.execute(stmt.returning(tabela.c.valor)).scalar_one()
+    session.execute(stmt)
+    return session.execute(select(tabela.c.valor).where(tabela.c.id == 1)).scalar_one()
+
+
+@event.listens_for(Session, "before_commit")
+def _number_before_commit(session: Session) -> None:
+    if session.info.get(_PENDING_EVENTS):
+        session.info[_SEQUENCE] = _next_sequence(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_on_commit(session: Session) -> None:
+    sequencia = session.info.pop(_SEQUENCE, None)
+    leaderboard.apply(session.info.pop(_PENDING_EVENTS, ()), sequencia)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_on_rollback(session: Session, transaction: SessionTransaction) -> None:
+    # Após um commit a lista já foi consumida; sobra apenas em rollback
+    if transaction.parent is None:
+        session.info.pop(_PENDING_EVENTS, None)
+        session.info.pop(_SEQUENCE, None)
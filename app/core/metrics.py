@@ -0,0 +1,103 @@
+import os
+from typing import Tuple
+
+from app.core.config import settings
+
+# O modo multiprocesso do prometheus_client é decidido na importação
+if settings.prometheus_multiproc_dir:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.prometheus_multiproc_dir)
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess,
+)
+
+from app.core.hashing import password_hasher  # noqa: E402
+from app.db.session import engine, read_engine, pool_stats  # noqa: E402
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "Requisições HTTP por rota e status",
+    ["method", "route", "status"]
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requisições HTTP em andamento",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Conexões permanentes do pool",
+    ["pool"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Conexões do pool em uso",
+    ["pool"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Conexões abertas além de pool_size",
+    ["pool"],
+    multiprocess_mode="livesum"
+)
+PASSWORD_HASH_PENDING = Gauge(
+    "password_hash_pending",
+    "Operações bcrypt em execução ou na fila",
+    multiprocess_mode="livesum"
+)
+PASSWORD_HASH_SATURATION = Gauge(
+    "password_hash_saturation",
+    "Ocupação do pool bcrypt (pendentes / capacidade), maior entre os workers",
+    multiprocess_mode="livemax"
+)
+
+
+def update_resource_gauges() -> None:
+    """Atualiza os gauges de pool de conexões e de bcrypt deste worker"""
+    pools = {"primary": engine}
+    if read_engine is not engine:
+        pools["read"] = read_engine
+    for name, target in pools.items():
+        stats = pool_stats(target)
+        if "size" in stats:
+            DB_POOL_SIZE.labels(name).set(stats["size"])
+            DB_POOL_CHECKED_OUT.labels(name).set(stats["checked_out"])
+            DB_POOL_OVERFLOW.labels(name).set(max(stats["overflow"], 0))
+
+    hashing = password_hasher.stats()
+    PASSWORD_HASH_PENDING.set(hashing["active"] + hashing["queued"])
+    PASSWORD_HASH_SATURATION.set(hashing["saturation"])
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposição no formato texto do Prometheus.
+
+    Com ``PROMETHEUS_MULTIPROC_DIR`` cada worker grava seus valores em arquivos
+    mapeados em memória nesse diretório, e a coleta soma todos eles: qualquer
+    worker responde com o total do nó.
+    """
+    update_resource_gauges()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Remove os gauges "live" deste worker ao encerrar"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,99 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.querystats import collect_queries
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """Anexa à resposta o número de consultas SQL e o tempo gasto no banco.
+
+    Envia ``X-DB-Queries`` e ``Server-Timing: db;dur=...`` e registra um aviso
+    quando a mesma consulta se repete ``N_PLUS_ONE_THRESHOLD`` vezes.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with collect_queries() as stats:
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-DB-Queries", str(stats.count))
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.total_time * 1000:.2f};desc="{stats.count} queries"'
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+        for shape, count in stats.repeated(settings.n_plus_one_threshold).items():
+            logger.warning(
+                "Possible N+1 on %s %s: %d x %s",
+                scope["method"], scope["path"], count, shape
+            )
+
+
+def _route_template(scope: Scope) -> str:
+    # Conforme a versão do FastAPI, route.path pode não incluir o prefixo do
+    # include_router; o prefixo é recuperado do path efetivo da requisição
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    try:
+        rendered = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError):
+        return path_format
+    path = scope["path"]
+    return path[:-len(rendered)] + path_format if path.endswith(rendered) else path_format
+
+
+class MetricsMiddleware:
+    """Registra contagem, status e latência das requisições por rota.
+
+    A rota é o template do path (``/ponto-coleta/{ponto_id}/``), resolvido
+    pelo roteador durante a chamada, para manter baixa a cardinalidade.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = metrics.IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            route = _route_template(scope)
+            metrics.REQUESTS.labels(method, route, str(status_code)).inc()
+            metrics.LATENCY.labels(method, route).observe(elapsed)
+            metrics.update_resource_gauges()
@@ -0,0 +1,65 @@
+import hashlib
+from decimal import Decimal
+from typing import Any, NamedTuple, Optional
+
+import orjson
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def orjson_default(value: Any) -> Any:
+    # Decimal sai como string, igual ao JSON do Pydantic ("1.50")
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse serializada com orjson (datetime nativo, Decimal como string)"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=orjson_default)
+
+
+def dump_json(model: BaseModel) -> bytes:
+    return orjson.dumps(model.model_dump(), default=orjson_default)
+
+
+class Snapshot(NamedTuple):
+    """Corpo JSON já serializado e seu ETag forte (hash do conteúdo)"""
+    body: bytes
+    etag: str
+
+    @classmethod
+    def of(cls, body: bytes) -> "Snapshot":
+        # Hash do conteúdo: o mesmo em todos os workers e após reinícios
+        return cls(body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca do If-None-Match (RFC 9110): ``*`` ou lista de ETags"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def conditional_response(request: Request, snapshot: Snapshot, cache_control: str) -> Response:
+    """200 com o corpo, ou 304 vazio se o cliente já tem este ETag"""
+    headers = {"ETag": snapshot.etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+def model_response(model: BaseModel) -> ORJSONResponse:
+    """Resposta de um schema já validado pelo serviço.
+
+    Devolver uma ``Response`` faz o FastAPI pular a revalidação contra o
+    ``response_model`` e o ``jsonable_encoder``; o ``response_model`` da rota
+    continua valendo para a documentação OpenAPI.
+    """
+    return ORJSONResponse(model.model_dump())
@@ -1,3 +1,5 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -5,6 +7,7 @@ from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
 from app.core.config import settings
+from app.core.cache import token_cache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -41,9 +44,24 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _decode_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+    
+    payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+    
+    # Mantém o payload em cache apenas até o "exp" do token
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(key, payload, ttl=exp - time.time())
+    return payload
+
+
 def verify_token(token: str, token_type: str = "access") -> dict:
     try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+        payload = dict(_decode_token(token))
         
         if payload.get("type") != token_type:
             raise HTTPException(
@@ -1,7 +1,7 @@
 # Import all models to ensure they are registered with SQLAlchemy
 from app.db.models.institutional import Universidade, Unidade, Curso, Turma
 from app.db.models.user import User
-from app.db.models.recycling import TipoResiduo, PontoColeta, PedidoDoacao, LancamentoResiduo
+from app.db.models.recycling import TipoResiduo, PontoColeta, PedidoDoacao, LancamentoResiduo, ResumoDiarioResiduo, SequenciaRanking
 
 __all__ = [
     "Universidade",
@@ -12,5 +12,7 @@ __all__ = [
     "TipoResiduo",
     "PontoColeta", 
     "PedidoDoacao",
-    "LancamentoResiduo"
+    "LancamentoResiduo",
+    "ResumoDiarioResiduo",
+    "SequenciaRanking"
 ]
@@ -11,11 +11,11 @@ class Universidade(Base):
     nome = Column(String(255), nullable=False)
     
     # Relacionamentos
-    unidades = relationship("Unidade", back_populates="universidade", cascade="all, delete-orphan")
-    cursos = relationship("Curso", back_populates="universidade")
-    turmas = relationship("Turma", back_populates="universidade")
-    users = relationship("User", back_populates="universidade")
-    pontos_coleta = relationship("PontoColeta", back_populates="universidade")
+    unidades = relationship("Unidade", back_populates="universidade", cascade="all, delete-orphan", lazy="raise")
+    cursos = relationship("Curso", back_populates="universidade", lazy="raise")
+    turmas = relationship("Turma", back_populates="universidade", lazy="raise")
+    users = relationship("User", back_populates="universidade", lazy="raise")
+    pontos_coleta = relationship("PontoColeta", back_populates="universidade", lazy="raise")
 
 
 class Unidade(Base):
@@ -26,11 +26,11 @@ class Unidade(Base):
     universidade_id = Column(Integer, ForeignKey("universidades.id"), nullable=False)
     
     # Relacionamentos
-    universidade = relationship("Universidade", back_populates="unidades")
-    cursos = relationship("Curso", back_populates="unidade")
-    turmas = relationship("Turma", back_populates="unidade")
-    users = relationship("User", back_populates="unidade")
-    pontos_coleta = relationship("PontoColeta", back_populates="unidade")
+    universidade = relationship("Universidade", back_populates="unidades", lazy="raise")
+    cursos = relationship("Curso", back_populates="unidade", lazy="raise")
+    turmas = relationship("Turma", back_populates="unidade", lazy="raise")
+    users = relationship("User", back_populates="unidade", lazy="raise")
+    pontos_coleta = relationship("PontoColeta", back_populates="unidade", lazy="raise")
 
 
 class Curso(Base):
@@ -38,13 +38,13 @@ class Curso(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(255), nullable=False)
-    universidade_id = Column(Integer, ForeignKey("universidades.id"), nullable=False)
-    unidade_id = Column(Integer, ForeignKey("unidades.id"), nullable=False)
+    universidade_id = Column(Integer, ForeignKey("universidades.id"), nullable=False, index=True)
+    unidade_id = Column(Integer, ForeignKey("unidades.id"), nullable=False, index=True)
     
     # Relacionamentos
-    universidade = relationship("Universidade", back_populates="cursos")
-    unidade = relationship("Unidade", back_populates="cursos")
-    turmas = relationship("Turma", back_populates="curso")
+    universidade = relationship("Universidade", back_populates="cursos", lazy="raise")
+    unidade = relationship("Unidade", back_populates="cursos", lazy="raise")
+    turmas = relationship("Turma", back_populates="curso", lazy="raise")
 
 
 class Turma(Base):
@@ -52,13 +52,13 @@ class Turma(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(100), nullable=False)
-    curso_id = Column(Integer, ForeignKey("cursos.id"), nullable=False)
-    unidade_id = Column(Integer, ForeignKey("unidades.id"), nullable=False)
-    universidade_id = Column(Integer, ForeignKey("universidades.id"), nullable=False)
+    curso_id = Column(Integer, ForeignKey("cursos.id"), nullable=False, index=True)
+    unidade_id = Column(Integer, ForeignKey("unidades.id"), nullable=False, index=True)
+    universidade_id = Column(Integer, ForeignKey("universidades.id"), nullable=False, index=True)
     
     # Relacionamentos
-    curso = relationship("Curso", back_populates="turmas")
-    unidade = relationship("Unidade", back_populates="turmas")
-    universidade = relationship("Universidade", back_populates="turmas")
-    users = relationship("User", back_populates="turma")
-    pedidos_doacao = relationship("PedidoDoacao", back_populates="turma")
+    curso = relationship("Curso", back_populates="turmas", lazy="raise")
+    unidade = relationship("Unidade", back_populates="turmas", lazy="raise")
+    universidade = relationship("Universidade", back_populates="turmas", lazy="raise")
+    users = relationship("User", back_populates="turma", lazy="raise")
+    pedidos_doacao = relationship("PedidoDoacao", back_populates="turma", lazy="raise")
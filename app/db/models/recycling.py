@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Numeric, Table
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Boolean, Date, DateTime, Numeric, Table, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -9,7 +9,7 @@ pedido_doacao_alunos = Table(
     'pedido_doacao_alunos',
     Base.metadata,
     Column('pedido_doacao_id', Integer, ForeignKey('pedidos_doacao.id'), primary_key=True),
-    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True)
+    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True, index=True)
 )
 
 
@@ -20,7 +20,7 @@ class TipoResiduo(Base):
     nome = Column(String(100), nullable=False)
     
     # Relacionamentos
-    lancamentos = relationship("LancamentoResiduo", back_populates="tipo_residuo")
+    lancamentos = relationship("LancamentoResiduo", back_populates="tipo_residuo", lazy="raise")
 
 
 class PontoColeta(Base):
@@ -28,15 +28,15 @@ class PontoColeta(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(100), nullable=False)
-    universidade_id = Column(Integer, ForeignKey("universidades.id"), nullable=False)
-    unidade_id = Column(Integer, ForeignKey("unidades.id"), nullable=False)
-    responsavel_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    universidade_id = Column(Integer, ForeignKey("universidades.id"), nullable=False, index=True)
+    unidade_id = Column(Integer, ForeignKey("unidades.id"), nullable=False, index=True)
+    responsavel_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     
     # Relacionamentos
-    universidade = relationship("Universidade", back_populates="pontos_coleta")
-    unidade = relationship("Unidade", back_populates="pontos_coleta")
-    responsavel = relationship("User", back_populates="pontos_coleta_responsavel")
-    lancamentos = relationship("LancamentoResiduo", back_populates="ponto_coleta")
+    universidade = relationship("Universidade", back_populates="pontos_coleta", lazy="raise")
+    unidade = relationship("Unidade", back_populates="pontos_coleta", lazy="raise")
+    responsavel = relationship("User", back_populates="pontos_coleta_responsavel", lazy="raise")
+    lancamentos = relationship("LancamentoResiduo", back_populates="ponto_coleta", lazy="raise")
 
 
 class PedidoDoacao(Base):
@@ -44,20 +44,21 @@ class PedidoDoacao(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     codigo = Column(String(10), unique=True, nullable=False)
-    criado_por_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    turma_id = Column(Integer, ForeignKey("turmas.id"), nullable=False)
-    criado_em = Column(DateTime, server_default=func.now())
+    criado_por_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    turma_id = Column(Integer, ForeignKey("turmas.id"), nullable=False, index=True)
+    criado_em = Column(DateTime, server_default=func.now(), index=True)
     confirmado = Column(Boolean, default=False)
     
     # Relacionamentos
-    criado_por = relationship("User", back_populates="pedidos_doacao_criados")
-    turma = relationship("Turma", back_populates="pedidos_doacao")
+    criado_por = relationship("User", back_populates="pedidos_doacao_criados", lazy="raise")
+    turma = relationship("Turma", back_populates="pedidos_doacao", lazy="raise")
     alunos = relationship(
         "User", 
         secondary=pedido_doacao_alunos,
-        back_populates="doacoes_aluno"
+        back_populates="doacoes_aluno",
+        lazy="raise"
     )
-    lancamento = relationship("LancamentoResiduo", back_populates="pedido", uselist=False)
+    lancamento = relationship("LancamentoResiduo", back_populates="pedido", uselist=False, lazy="raise")
 
 
 class LancamentoResiduo(Base):
@@ -65,12 +66,44 @@ class LancamentoResiduo(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     pedido_id = Column(Integer, ForeignKey("pedidos_doacao.id"), nullable=False, unique=True)
-    ponto_coleta_id = Column(Integer, ForeignKey("pontos_coleta.id"), nullable=False)
-    tipo_residuo_id = Column(Integer, ForeignKey("tipos_residuo.id"), nullable=False)
+    ponto_coleta_id = Column(Integer, ForeignKey("pontos_coleta.id"), nullable=False, index=True)
+    tipo_residuo_id = Column(Integer, ForeignKey("tipos_residuo.id"), nullable=False, index=True)
     peso_kg = Column(Numeric(6, 2), nullable=False)
-    data = Column(DateTime, server_default=func.now())
+    data = Column(DateTime, server_default=func.now(), index=True)
     
     # Relacionamentos
-    pedido = relationship("PedidoDoacao", back_populates="lancamento")
-    ponto_coleta = relationship("PontoColeta", back_populates="lancamentos")
-    tipo_residuo = relationship("TipoResiduo", back_populates="lancamentos")
+    pedido = relationship("PedidoDoacao", back_populates="lancamento", lazy="raise")
+    ponto_coleta = relationship("PontoColeta", back_populates="lancamentos", lazy="raise")
+    tipo_residuo = relationship("TipoResiduo", back_populates="lancamentos", lazy="raise")
+
+
+class ResumoDiarioResiduo(Base):
+    """Peso e número de lançamentos por dia, ponto, tipo e turma.
+
+    Mantido por deltas na mesma transação das escritas de lançamentos
+    (``ResumoDiarioRepository``); linhas com zero lançamentos são removidas.
+    """
+    __tablename__ = "resumo_diario_residuo"
+    
+    dia = Column(Date, primary_key=True)
+    ponto_coleta_id = Column(Integer, ForeignKey("pontos_coleta.id"), primary_key=True)
+    tipo_residuo_id = Column(Integer, ForeignKey("tipos_residuo.id"), primary_key=True)
+    turma_id = Column(Integer, ForeignKey("turmas.id"), primary_key=True)
+    total_kg = Column(Numeric(12, 2), nullable=False, default=0)
+    lancamentos = Column(Integer, nullable=False, default=0)
+
+
+class SequenciaRanking(Base):
+    """Contador de uma linha, incrementado no commit de cada transação que muda
+    o ranking de turmas; a recarga o lê junto com os totais para saber quais
+    deltas em memória o snapshot já contém (``app.core.leaderboard``).
+    """
+    __tablename__ = "ranking_sequencia"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    valor = Column(BigInteger, nullable=False, default=0)
+
+
+@event.listens_for(SequenciaRanking.__table__, "after_create")
+def _seed_sequencia_ranking(target, connection, **kw):
+    connection.execute(target.insert().values(id=1, valor=0))
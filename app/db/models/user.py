@@ -19,7 +19,7 @@ class User(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(150), unique=True, nullable=False, index=True)
-    email = Column(String(254), nullable=False)
+    email = Column(String(254), unique=True, nullable=False, index=True)
     first_name = Column(String(150), nullable=True)
     last_name = Column(String(150), nullable=True)
     hashed_password = Column(String(128), nullable=False)
@@ -35,15 +35,16 @@ class User(Base):
     turma_id = Column(Integer, ForeignKey("turmas.id"), nullable=True)
     
     # Relacionamentos
-    universidade = relationship("Universidade", back_populates="users")
-    unidade = relationship("Unidade", back_populates="users")
-    turma = relationship("Turma", back_populates="users")
+    universidade = relationship("Universidade", back_populates="users", lazy="raise")
+    unidade = relationship("Unidade", back_populates="users", lazy="raise")
+    turma = relationship("Turma", back_populates="users", lazy="raise")
     
     # Relacionamentos de reciclagem
-    pontos_coleta_responsavel = relationship("PontoColeta", back_populates="responsavel")
-    pedidos_doacao_criados = relationship("PedidoDoacao", back_populates="criado_por")
+    pontos_coleta_responsavel = relationship("PontoColeta", back_populates="responsavel", lazy="raise")
+    pedidos_doacao_criados = relationship("PedidoDoacao", back_populates="criado_por", lazy="raise")
     doacoes_aluno = relationship(
         "PedidoDoacao", 
         secondary="pedido_doacao_alunos",
-        back_populates="alunos"
+        back_populates="alunos",
+        lazy="raise"
     )
@@ -0,0 +1,70 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryStats:
+    """Contagem e tempo das consultas SQL executadas em um escopo."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.shapes[" ".join(statement.split())] += 1
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Consultas idênticas executadas ``threshold`` vezes ou mais (provável N+1)"""
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+# Coletores ativos no contexto atual (requisição, teste); cada consulta conta em todos
+_collectors: ContextVar[Tuple[QueryStats, ...]] = ContextVar("query_collectors", default=())
+
+
+@contextmanager
+def collect_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """Falha se o bloco executar mais de ``max_queries`` consultas.
+
+    Uso nos testes::
+
+        with query_budget(2):
+            await async_client.get("/api/v1/recycling/tipo-residuo/", headers=headers)
+    """
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        statements: List[str] = [f"{n}x {shape}" for shape, n in stats.shapes.most_common()]
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, got {stats.count}:\n" + "\n".join(statements)
+        )
+
+
+def instrument_engine(target: AsyncEngine) -> None:
+    @event.listens_for(target.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(target.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        for stats in _collectors.get():
+            stats.record(statement, elapsed)
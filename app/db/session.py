@@ -1,17 +1,110 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from typing import AsyncGenerator
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import AsyncGenerator, AsyncIterator
 from app.core.config import settings
+from app.db.querystats import instrument_engine
 
-# Converter URL de conexão para async se necessário
-database_url = settings.database_url
-if database_url.startswith("postgresql://"):
-    database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
-elif database_url.startswith("mysql://"):
-    database_url = database_url.replace("mysql://", "mysql+aiomysql://", 1)
-elif database_url.startswith("sqlite:///"):
-    database_url = database_url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
 
-engine = create_async_engine(database_url, echo=settings.debug)
+def _async_url(url: str) -> str:
+    # Converter URL de conexão para async se necessário
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    elif url.startswith("mysql://"):
+        return url.replace("mysql://", "mysql+aiomysql://", 1)
+    elif url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    return url
+
+
+database_url = _async_url(settings.database_url)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """QueuePool que mede o tempo gasto para obter uma conexão do pool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.total_wait = self.total_wait
+        pool.max_wait = self.max_wait
+        return pool
+
+
+def _is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite") and ":memory:" not in url
+
+
+def _engine_options(url: str, writer: bool = False) -> dict:
+    options = {
+        "echo": settings.debug,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+    # SQLite em memória usa StaticPool, sem dimensionamento
+    if ":memory:" not in url:
+        options.update({
+            "poolclass": InstrumentedAsyncQueuePool,
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+        })
+
+    # Perfil SQLite: uma única conexão de escrita; a fila do pool serializa os escritores
+    if writer and settings.sqlite_profile and _is_sqlite_file(url):
+        options.update({
+            "pool_size": 1,
+            "max_overflow": 0,
+            "pool_timeout": settings.sqlite_write_timeout,
+        })
+
+    if url.startswith("postgresql+asyncpg://"):
+        options["connect_args"] = {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+
+    return options
+
+
+def _apply_sqlite_pragmas(target: AsyncEngine, query_only: bool = False) -> None:
+    @event.listens_for(target.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+        if query_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+engine = create_async_engine(database_url, **_engine_options(database_url, writer=True))
+sqlite_profile_enabled = settings.sqlite_profile and _is_sqlite_file(database_url)
+if sqlite_profile_enabled:
+    _apply_sqlite_pragmas(engine)
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -19,10 +112,114 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+# Réplica de leitura opcional; sem READ_DATABASE_URL as leituras usam o primário
+if settings.read_database_url:
+    read_database_url = _async_url(settings.read_database_url)
+    read_engine = create_async_engine(read_database_url, **_engine_options(read_database_url))
+elif sqlite_profile_enabled:
+    # Com WAL, leitores concorrentes usam um pool próprio sobre o mesmo arquivo
+    read_engine = create_async_engine(database_url, **_engine_options(database_url))
+    _apply_sqlite_pragmas(read_engine, query_only=True)
+else:
+    read_engine = engine
+
+if settings.query_stats_enabled:
+    instrument_engine(engine)
+    if read_engine is not engine:
+        instrument_engine(read_engine)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+# Leituras que precisam do estado atual do primário (autenticação, recarga do
+# ranking) nunca vão à réplica: com atraso, um usuário recém desativado voltaria
+# ao cache. Sem réplica, no perfil SQLite, usam o leitor WAL do mesmo arquivo,
+# sem ocupar a única conexão de escrita.
+AsyncPrimaryReadSessionLocal = (
+    AsyncReadSessionLocal
+    if sqlite_profile_enabled and not settings.read_database_url
+    else AsyncSessionLocal
+)
+
+
+async def warm_pool() -> None:
+    await _warm_engine(engine)
+    if read_engine is not engine:
+        await _warm_engine(read_engine)
+
+
+async def _warm_engine(target) -> None:
+    # Abre pool_size conexões em paralelo e as devolve ao pool
+    if not isinstance(target.pool, InstrumentedAsyncQueuePool):
+        return
+
+    connections = await asyncio.gather(
+        *(target.connect() for _ in range(target.pool.size())),
+        return_exceptions=True
+    )
+    errors = [c for c in connections if isinstance(c, BaseException)]
+    for connection in connections:
+        if not isinstance(connection, BaseException):
+            await connection.close()
+    if errors:
+        raise errors[0]
+
+
+def pool_stats(target=engine) -> dict:
+    pool = target.pool
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checkouts": pool.checkouts,
+            "avg_wait_ms": round(pool.total_wait / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            "max_wait_ms": round(pool.max_wait * 1000, 3),
+        })
+    return stats
+
+
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """Uma transação para todo o bloco: commit ao final, rollback em erro.
+
+    Os repositórios apenas fazem ``flush``; o commit acontece uma única vez.
+    """
+    try:
+        yield session
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """Sessão de escrita da requisição, dentro de uma unit of work.
+
+    Declare com ``Depends(get_db, scope="function")`` para que o commit ocorra
+    quando o endpoint retorna, antes do envio da resposta: uma falha no commit
+    vira erro 500 em vez de uma resposta de sucesso.
+    """
     async with AsyncSessionLocal() as session:
+        async with unit_of_work(session):
+            yield session
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncReadSessionLocal() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+async def get_auth_db() -> AsyncGenerator[AsyncSession, None]:
+    """Sessão somente leitura, sempre atualizada, para consultas de autenticação"""
+    async with AsyncPrimaryReadSessionLocal() as session:
+        yield session
@@ -4,18 +4,20 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.db.session import get_db
+from app.db.session import get_auth_db
 from app.db.models.user import User
 from app.core.security import verify_token
-from app.schemas.user import TokenData
+from app.core.cache import principal_cache
+from app.core.config import settings
+from app.schemas.user import TokenData, Principal
 
 security = HTTPBearer()
 
 
 async def get_current_user(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_auth_db, scope="function")],
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]
-) -> User:
+) -> Principal:
     try:
         payload = verify_token(credentials.credentials, "access")
         user_id: int = payload.get("user_id")
@@ -26,16 +28,41 @@ async def get_current_user(
                 detail="Could not validate credentials"
             )
         
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        # Modo stateless: autoriza direto pelos claims assinados
+        if settings.stateless_auth and "perfil" in payload:
+            return Principal(
+                id=user_id,
+                username=payload.get("sub"),
+                perfil=payload["perfil"],
+                is_active=payload.get("is_active", False),
+                universidade_id=payload.get("universidade_id"),
+                unidade_id=payload.get("unidade_id"),
+                turma_id=payload.get("turma_id")
+            )
+        
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+        
+        version = principal_cache.version(user_id)
+        result = await db.execute(
+            select(
+                User.id, User.username, User.perfil, User.is_active,
+                User.universidade_id, User.unidade_id, User.turma_id
+            ).where(User.id == user_id)
+        )
+        row = result.one_or_none()
         
-        if user is None:
+        if row is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
         
-        return user
+        principal = Principal.model_validate(row)
+        # Uma atualização do usuário durante a consulta descarta o valor lido
+        principal_cache.set_if_version(user_id, principal, version)
+        return principal
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -44,8 +71,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_user)]
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
@@ -56,7 +83,7 @@ async def get_current_active_user(
 
 def require_perfil(perfil: str):
     def perfil_dependency(
-        current_user: Annotated[User, Depends(get_current_active_user)]
+        current_user: Annotated[Principal, Depends(get_current_active_user)]
     ):
         if current_user.perfil != perfil:
             raise HTTPException(
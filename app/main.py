@@ -1,11 +1,21 @@
+import asyncio
+import contextlib
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.db.session import engine
+from app.core.hashing import password_hasher
+from app.core.metrics import mark_process_dead
+from app.core.middleware import MetricsMiddleware, QueryStatsMiddleware
+from app.db.session import engine, read_engine, warm_pool
 from app.db.base import Base
 from app.api.v1.api import api_router
+from app.services.leaderboard import refresh_leaderboard, refresh_leaderboard_periodically
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
@@ -14,7 +24,28 @@ async def lifespan(app: FastAPI):
     if settings.environment == "development":
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+    if settings.db_pool_warm:
+        await warm_pool()
+    # Ranking de turmas em memória; se o banco falhar, a recarga periódica tenta de novo
+    try:
+        await refresh_leaderboard()
+    except Exception:
+        logger.exception("Leaderboard load failed at startup")
+    refresh_task = None
+    if settings.leaderboard_refresh_seconds > 0:
+        refresh_task = asyncio.create_task(
+            refresh_leaderboard_periodically(settings.leaderboard_refresh_seconds)
+        )
     yield
+    if refresh_task is not None:
+        refresh_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await refresh_task
+    mark_process_dead()
+    password_hasher.shutdown()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 
 app = FastAPI(
@@ -35,6 +66,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.query_stats_enabled:
+    app.add_middleware(QueryStatsMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix="/api/v1")
 
 
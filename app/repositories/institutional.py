@@ -1,8 +1,14 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core import leaderboard
+from app.core.leaderboard import TurmaInfo, TurmaRanking
 from app.db.models.institutional import Universidade, Unidade, Curso, Turma
+from app.repositories.loading import list_statement
+from app.repositories.pagination import paginate
+from app.repositories.writes import add_and_flush, delete_returning, update_returning
+from app.schemas import institutional as schemas
 from app.schemas.institutional import (
     UniversidadeCreate, UniversidadeUpdate,
     UnidadeCreate, UnidadeUpdate,
@@ -12,6 +18,8 @@ from app.schemas.institutional import (
 
 
 class UniversidadeRepository:
+    table = Universidade.__tablename__
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -19,41 +27,29 @@ class UniversidadeRepository:
         result = await self.db.execute(select(Universidade))
         return result.scalars().all()
     
+    async def get_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Universidade], Optional[str]]:
+        stmt, rows = list_statement(Universidade, schemas.Universidade)
+        return await paginate(self.db, stmt, [Universidade.id], limit, cursor, rows=rows)
+    
     async def get_by_id(self, universidade_id: int) -> Optional[Universidade]:
         result = await self.db.execute(select(Universidade).where(Universidade.id == universidade_id))
         return result.scalar_one_or_none()
     
     async def create(self, universidade_data: UniversidadeCreate) -> Universidade:
-        universidade = Universidade(**universidade_data.dict())
-        self.db.add(universidade)
-        await self.db.commit()
-        await self.db.refresh(universidade)
-        return universidade
+        universidade = Universidade(**universidade_data.model_dump())
+        return await add_and_flush(self.db, universidade)
     
     async def update(self, universidade_id: int, universidade_data: UniversidadeUpdate) -> Optional[Universidade]:
-        universidade = await self.get_by_id(universidade_id)
-        if not universidade:
-            return None
-        
-        update_data = universidade_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(universidade, field, value)
-        
-        await self.db.commit()
-        await self.db.refresh(universidade)
-        return universidade
+        update_data = universidade_data.model_dump(exclude_unset=True)
+        return await update_returning(self.db, Universidade, universidade_id, update_data)
     
     async def delete(self, universidade_id: int) -> bool:
-        universidade = await self.get_by_id(universidade_id)
-        if not universidade:
-            return False
-        
-        await self.db.delete(universidade)
-        await self.db.commit()
-        return True
+        return await delete_returning(self.db, Universidade, universidade_id)
 
 
 class UnidadeRepository:
+    table = Unidade.__tablename__
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -61,41 +57,29 @@ class UnidadeRepository:
         result = await self.db.execute(select(Unidade))
         return result.scalars().all()
     
+    async def get_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Unidade], Optional[str]]:
+        stmt, rows = list_statement(Unidade, schemas.Unidade)
+        return await paginate(self.db, stmt, [Unidade.id], limit, cursor, rows=rows)
+    
     async def get_by_id(self, unidade_id: int) -> Optional[Unidade]:
         result = await self.db.execute(select(Unidade).where(Unidade.id == unidade_id))
         return result.scalar_one_or_none()
     
     async def create(self, unidade_data: UnidadeCreate) -> Unidade:
-        unidade = Unidade(**unidade_data.dict())
-        self.db.add(unidade)
-        await self.db.commit()
-        await self.db.refresh(unidade)
-        return unidade
+        unidade = Unidade(**unidade_data.model_dump())
+        return await add_and_flush(self.db, unidade)
     
     async def update(self, unidade_id: int, unidade_data: UnidadeUpdate) -> Optional[Unidade]:
-        unidade = await self.get_by_id(unidade_id)
-        if not unidade:
-            return None
-        
-        update_data = unidade_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(unidade, field, value)
-        
-        await self.db.commit()
-        await self.db.refresh(unidade)
-        return unidade
+        update_data = unidade_data.model_dump(exclude_unset=True)
+        return await update_returning(self.db, Unidade, unidade_id, update_data)
     
     async def delete(self, unidade_id: int) -> bool:
-        unidade = await self.get_by_id(unidade_id)
-        if not unidade:
-            return False
-        
-        await self.db.delete(unidade)
-        await self.db.commit()
-        return True
+        return await delete_returning(self.db, Unidade, unidade_id)
 
 
 class CursoRepository:
+    table = Curso.__tablename__
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -103,41 +87,29 @@ class CursoRepository:
         result = await self.db.execute(select(Curso))
         return result.scalars().all()
     
+    async def get_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Curso], Optional[str]]:
+        stmt, rows = list_statement(Curso, schemas.Curso)
+        return await paginate(self.db, stmt, [Curso.id], limit, cursor, rows=rows)
+    
     async def get_by_id(self, curso_id: int) -> Optional[Curso]:
         result = await self.db.execute(select(Curso).where(Curso.id == curso_id))
         return result.scalar_one_or_none()
     
     async def create(self, curso_data: CursoCreate) -> Curso:
-        curso = Curso(**curso_data.dict())
-        self.db.add(curso)
-        await self.db.commit()
-        await self.db.refresh(curso)
-        return curso
+        curso = Curso(**curso_data.model_dump())
+        return await add_and_flush(self.db, curso)
     
     async def update(self, curso_id: int, curso_data: CursoUpdate) -> Optional[Curso]:
-        curso = await self.get_by_id(curso_id)
-        if not curso:
-            return None
-        
-        update_data = curso_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(curso, field, value)
-        
-        await self.db.commit()
-        await self.db.refresh(curso)
-        return curso
+        update_data = curso_data.model_dump(exclude_unset=True)
+        return await update_returning(self.db, Curso, curso_id, update_data)
     
     async def delete(self, curso_id: int) -> bool:
-        curso = await self.get_by_id(curso_id)
-        if not curso:
-            return False
-        
-        await self.db.delete(curso)
-        await self.db.commit()
-        return True
+        return await delete_returning(self.db, Curso, curso_id)
 
 
 class TurmaRepository:
+    table = Turma.__tablename__
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -145,35 +117,30 @@ class TurmaRepository:
         result = await self.db.execute(select(Turma))
         return result.scalars().all()
     
+    async def get_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Turma], Optional[str]]:
+        stmt, rows = list_statement(Turma, schemas.Turma)
+        return await paginate(self.db, stmt, [Turma.id], limit, cursor, rows=rows)
+    
     async def get_by_id(self, turma_id: int) -> Optional[Turma]:
         result = await self.db.execute(select(Turma).where(Turma.id == turma_id))
         return result.scalar_one_or_none()
     
     async def create(self, turma_data: TurmaCreate) -> Turma:
-        turma = Turma(**turma_data.dict())
-        self.db.add(turma)
-        await self.db.commit()
-        await self.db.refresh(turma)
-        return turma
+        turma = Turma(**turma_data.model_dump())
+        return await add_and_flush(self.db, turma)
     
     async def update(self, turma_id: int, turma_data: TurmaUpdate) -> Optional[Turma]:
-        turma = await self.get_by_id(turma_id)
-        if not turma:
-            return None
-        
-        update_data = turma_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(turma, field, value)
-        
-        await self.db.commit()
-        await self.db.refresh(turma)
+        update_data = turma_data.model_dump(exclude_unset=True)
+        turma = await update_returning(self.db, Turma, turma_id, update_data)
+        if turma is not None:
+            # Nome e escopos da turma no ranking mudam com o commit
+            leaderboard.record(self.db, TurmaRanking(
+                turma.id, TurmaInfo(turma.nome, turma.universidade_id, turma.unidade_id)
+            ))
         return turma
     
     async def delete(self, turma_id: int) -> bool:
-        turma = await self.get_by_id(turma_id)
-        if not turma:
-            return False
-        
-        await self.db.delete(turma)
-        await self.db.commit()
-        return True
+        deleted = await delete_returning(self.db, Turma, turma_id)
+        if deleted:
+            leaderboard.record(self.db, TurmaRanking(turma_id, None))
+        return deleted
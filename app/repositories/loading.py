@@ -0,0 +1,97 @@
+from typing import Any, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import Select, inspect, select
+from sqlalchemy.orm import selectinload
+
+from app.schemas.base import expansion_fields, nested_schema
+
+
+def parse_include(include: Optional[str]) -> List[str]:
+    """Converte ``include=a,b`` em ``["a", "b"]``"""
+    if not include:
+        return []
+    return [name.strip() for name in include.split(",") if name.strip()]
+
+
+def _required(model: Any, schema: Type[BaseModel]) -> List[Any]:
+    # Relacionamentos que o schema sempre expõe (ex.: ids de alunos)
+    relationships = inspect(model).relationships
+    return [
+        selectinload(getattr(model, name))
+        for name in schema.model_fields
+        if name in relationships and name not in expansion_fields(schema)
+    ]
+
+
+def load_options(
+    model: Any,
+    schema: Optional[Type[BaseModel]] = None,
+    include: Sequence[str] = ()
+) -> List[Any]:
+    """Opções de carregamento derivadas do schema de resposta.
+
+    Carrega apenas os relacionamentos que o schema sempre expõe e os pedidos
+    em ``include``; o resto fica com ``lazy="raise"``. Sem schema, ``include``
+    aceita qualquer relacionamento do modelo.
+    """
+    relationships = inspect(model).relationships
+    allowed = expansion_fields(schema) if schema is not None else set(relationships.keys())
+    invalid = [name for name in include if name not in allowed]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid include: {', '.join(invalid)}"
+        )
+
+    options = _required(model, schema) if schema is not None else []
+    for name in dict.fromkeys(include):
+        option = selectinload(getattr(model, name))
+        target = nested_schema(schema.model_fields[name].annotation) if schema is not None else None
+        if target is not None:
+            option = option.options(*_required(relationships[name].mapper.class_, target))
+        options.append(option)
+    return options
+
+
+def loaded_tables(
+    model: Any,
+    schema: Type[BaseModel],
+    include: Sequence[str] = ()
+) -> Tuple[str, ...]:
+    """Tabelas lidas pelo SELECT com ``load_options(model, schema, include)``:
+    a do modelo, as dos relacionamentos carregados e as de associação"""
+    relationships = inspect(model).relationships
+    tables = dict.fromkeys([inspect(model).local_table.name])
+    names = [name for name in schema.model_fields if name in relationships and name not in expansion_fields(schema)]
+    names += [name for name in include if name in relationships and name in expansion_fields(schema)]
+    for name in names:
+        relationship = relationships[name]
+        if relationship.secondary is not None:
+            tables[relationship.secondary.name] = None
+        target = nested_schema(schema.model_fields[name].annotation)
+        if target is None:
+            tables[relationship.mapper.local_table.name] = None
+        else:
+            tables.update(dict.fromkeys(loaded_tables(relationship.mapper.class_, target)))
+    return tuple(tables)
+
+
+def list_statement(
+    model: Any,
+    schema: Type[BaseModel],
+    include: Sequence[str] = ()
+) -> Tuple[Select, bool]:
+    """SELECT de listagem e se ele devolve linhas simples em vez de entidades.
+
+    Sem ``include`` e com todos os campos do schema mapeados para colunas,
+    seleciona só essas colunas: sem objetos ORM nem identity map. Caso
+    contrário, seleciona a entidade com as opções de ``load_options``.
+    """
+    if not include:
+        columns = inspect(model).column_attrs
+        fields = [name for name in schema.model_fields if name not in expansion_fields(schema)]
+        if all(name in columns for name in fields):
+            return select(*(getattr(model, name) for name in fields)), True
+    return select(model).options(*load_options(model, schema, include)), False
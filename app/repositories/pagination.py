@@ -0,0 +1,77 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return settings.page_default_limit
+    return min(limit, settings.page_max_limit)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[Any]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(v) if isinstance(key.type, DateTime) and v is not None else v
+            for key, v in zip(keys, values)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _after(keys: Sequence[Any], values: Sequence[Any], descending: bool):
+    # (k1, k2) > (v1, v2) expandido, portável entre dialetos e amigável a índices
+    clauses = []
+    for i, key in enumerate(keys):
+        equal = [keys[j] == values[j] for j in range(i)]
+        step = key < values[i] if descending else key > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence[Any],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    rows: bool = False
+) -> Tuple[List[Any], Optional[str]]:
+    """Paginação keyset: ordena por ``keys`` e busca uma linha a mais para
+    saber se existe próxima página. O cursor codifica as chaves da última linha.
+    Com ``rows`` devolve as linhas do SELECT de colunas como dicts, em vez
+    de entidades.
+    """
+    limit = clamp_limit(limit)
+    if cursor:
+        stmt = stmt.where(_after(keys, decode_cursor(cursor, keys), descending))
+
+    order_by = [key.desc() if descending else key.asc() for key in keys]
+    result = await db.execute(stmt.order_by(*order_by).limit(limit + 1))
+    items = [row._asdict() for row in result] if rows else list(result.scalars().all())
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([last[key.key] if rows else getattr(last, key.key) for key in keys])
+    return items, next_cursor
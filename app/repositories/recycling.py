@@ -1,10 +1,21 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Select, delete, insert, literal, select
 
-from app.db.models.recycling import TipoResiduo, PontoColeta, PedidoDoacao, LancamentoResiduo
+from app.core.config import settings
+
+from app.db.models.recycling import (
+    TipoResiduo, PontoColeta, PedidoDoacao, LancamentoResiduo, pedido_doacao_alunos
+)
+from app.db.models.institutional import Universidade
 from app.db.models.user import User
+from app.repositories.loading import list_statement, load_options, loaded_tables
+from app.repositories.pagination import paginate
+from app.repositories.rollup import EntradaResumo, ResumoDiarioRepository
+from app.repositories.writes import add_and_flush, delete_returning, update_returning
+from app.schemas import recycling as schemas
 from app.schemas.recycling import (
     TipoResiduoCreate, TipoResiduoUpdate,
     PontoColetaCreate, PontoColetaUpdate,
@@ -14,6 +25,8 @@ from app.schemas.recycling import (
 
 
 class TipoResiduoRepository:
+    table = TipoResiduo.__tablename__
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -21,115 +34,111 @@ class TipoResiduoRepository:
         result = await self.db.execute(select(TipoResiduo))
         return result.scalars().all()
     
+    async def get_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[TipoResiduo], Optional[str]]:
+        stmt, rows = list_statement(TipoResiduo, schemas.TipoResiduo)
+        return await paginate(self.db, stmt, [TipoResiduo.id], limit, cursor, rows=rows)
+    
     async def get_by_id(self, tipo_id: int) -> Optional[TipoResiduo]:
         result = await self.db.execute(select(TipoResiduo).where(TipoResiduo.id == tipo_id))
         return result.scalar_one_or_none()
     
     async def create(self, tipo_data: TipoResiduoCreate) -> TipoResiduo:
-        tipo = TipoResiduo(**tipo_data.dict())
-        self.db.add(tipo)
-        await self.db.commit()
-        await self.db.refresh(tipo)
-        return tipo
+        tipo = TipoResiduo(**tipo_data.model_dump())
+        return await add_and_flush(self.db, tipo)
     
     async def update(self, tipo_id: int, tipo_data: TipoResiduoUpdate) -> Optional[TipoResiduo]:
-        tipo = await self.get_by_id(tipo_id)
-        if not tipo:
-            return None
-        
-        update_data = tipo_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(tipo, field, value)
-        
-        await self.db.commit()
-        await self.db.refresh(tipo)
-        return tipo
+        update_data = tipo_data.model_dump(exclude_unset=True)
+        return await update_returning(self.db, TipoResiduo, tipo_id, update_data)
     
     async def delete(self, tipo_id: int) -> bool:
-        tipo = await self.get_by_id(tipo_id)
-        if not tipo:
-            return False
-        
-        await self.db.delete(tipo)
-        await self.db.commit()
-        return True
+        return await delete_returning(self.db, TipoResiduo, tipo_id)
 
 
 class PontoColetaRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def get_all(self) -> List[PontoColeta]:
+    async def get_all(self, include: Sequence[str] = ()) -> List[PontoColeta]:
         result = await self.db.execute(
-            select(PontoColeta).options(
-                selectinload(PontoColeta.universidade),
-                selectinload(PontoColeta.unidade),
-                selectinload(PontoColeta.responsavel)
-            )
+            select(PontoColeta).options(*load_options(PontoColeta, schemas.PontoColeta, include))
         )
         return result.scalars().all()
     
-    async def get_by_id(self, ponto_id: int) -> Optional[PontoColeta]:
+    async def get_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include: Sequence[str] = ()
+    ) -> Tuple[List[PontoColeta], Optional[str]]:
+        stmt, rows = list_statement(PontoColeta, schemas.PontoColeta, include)
+        return await paginate(
+            self.db,
+            stmt,
+            [PontoColeta.id],
+            limit,
+            cursor,
+            rows=rows
+        )
+    
+    def tables(self, include: Sequence[str] = ()) -> Tuple[str, ...]:
+        """Tabelas lidas por ``get_by_id`` com ``include``, para versionar a resposta"""
+        return loaded_tables(PontoColeta, schemas.PontoColeta, include)
+    
+    async def get_by_id(self, ponto_id: int, include: Sequence[str] = ()) -> Optional[PontoColeta]:
         result = await self.db.execute(
-            select(PontoColeta).options(
-                selectinload(PontoColeta.universidade),
-                selectinload(PontoColeta.unidade),
-                selectinload(PontoColeta.responsavel)
-            ).where(PontoColeta.id == ponto_id)
+            select(PontoColeta)
+            .options(*load_options(PontoColeta, schemas.PontoColeta, include))
+            .where(PontoColeta.id == ponto_id)
         )
         return result.scalar_one_or_none()
     
     async def create(self, ponto_data: PontoColetaCreate) -> PontoColeta:
-        ponto = PontoColeta(**ponto_data.dict())
-        self.db.add(ponto)
-        await self.db.commit()
-        await self.db.refresh(ponto)
-        return ponto
+        ponto = PontoColeta(**ponto_data.model_dump())
+        return await add_and_flush(self.db, ponto)
     
     async def update(self, ponto_id: int, ponto_data: PontoColetaUpdate) -> Optional[PontoColeta]:
-        ponto = await self.get_by_id(ponto_id)
-        if not ponto:
-            return None
-        
-        update_data = ponto_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(ponto, field, value)
-        
-        await self.db.commit()
-        await self.db.refresh(ponto)
-        return ponto
+        update_data = ponto_data.model_dump(exclude_unset=True)
+        return await update_returning(self.db, PontoColeta, ponto_id, update_data)
     
     async def delete(self, ponto_id: int) -> bool:
-        ponto = await self.get_by_id(ponto_id)
-        if not ponto:
-            return False
-        
-        await self.db.delete(ponto)
-        await self.db.commit()
-        return True
+        return await delete_returning(self.db, PontoColeta, ponto_id)
 
 
 class PedidoDoacaoRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def get_all(self) -> List[PedidoDoacao]:
+    async def get_all(self, include: Sequence[str] = ()) -> List[PedidoDoacao]:
         result = await self.db.execute(
-            select(PedidoDoacao).options(
-                selectinload(PedidoDoacao.criado_por),
-                selectinload(PedidoDoacao.turma),
-                selectinload(PedidoDoacao.alunos)
-            )
+            select(PedidoDoacao).options(*load_options(PedidoDoacao, schemas.PedidoDoacao, include))
         )
         return result.scalars().all()
     
-    async def get_by_id(self, pedido_id: int) -> Optional[PedidoDoacao]:
+    async def get_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include: Sequence[str] = ()
+    ) -> Tuple[List[PedidoDoacao], Optional[str]]:
+        stmt, rows = list_statement(PedidoDoacao, schemas.PedidoDoacao, include)
+        return await paginate(
+            self.db,
+            stmt,
+            [PedidoDoacao.id],
+            limit,
+            cursor,
+            rows=rows
+        )
+    
+    def tables(self, include: Sequence[str] = ()) -> Tuple[str, ...]:
+        """Tabelas lidas por ``get_by_id`` com ``include``, para versionar a resposta"""
+        return loaded_tables(PedidoDoacao, schemas.PedidoDoacao, include)
+    
+    async def get_by_id(self, pedido_id: int, include: Sequence[str] = ()) -> Optional[PedidoDoacao]:
         result = await self.db.execute(
-            select(PedidoDoacao).options(
-                selectinload(PedidoDoacao.criado_por),
-                selectinload(PedidoDoacao.turma),
-                selectinload(PedidoDoacao.alunos)
-            ).where(PedidoDoacao.id == pedido_id)
+            select(PedidoDoacao)
+            .options(*load_options(PedidoDoacao, schemas.PedidoDoacao, include))
+            .where(PedidoDoacao.id == pedido_id)
         )
         return result.scalar_one_or_none()
     
@@ -142,96 +151,165 @@ class PedidoDoacaoRepository:
             )
             alunos = result.scalars().all()
         
-        pedido_dict = pedido_data.dict(exclude={"alunos"})
+        pedido_dict = pedido_data.model_dump(exclude={"alunos"})
         pedido_dict["criado_por_id"] = criado_por_id
         
         pedido = PedidoDoacao(**pedido_dict)
         pedido.alunos = alunos
-        
-        self.db.add(pedido)
-        await self.db.commit()
-        await self.db.refresh(pedido)
-        return pedido
+        return await add_and_flush(self.db, pedido)
     
     async def update(self, pedido_id: int, pedido_data: PedidoDoacaoUpdate) -> Optional[PedidoDoacao]:
-        pedido = await self.get_by_id(pedido_id)
+        update_data = pedido_data.model_dump(exclude_unset=True, exclude={"alunos"})
+        # Trocar a turma move o lançamento do pedido para outra linha do resumo diário
+        resumo = ResumoDiarioRepository(self.db)
+        anterior = (
+            await resumo.entry(LancamentoResiduo.pedido_id == pedido_id, lock=True)
+            if "turma_id" in update_data else None
+        )
+        pedido = await update_returning(self.db, PedidoDoacao, pedido_id, update_data)
         if not pedido:
             return None
+        if anterior is not None:
+            await resumo.move(anterior, await resumo.entry(LancamentoResiduo.pedido_id == pedido_id))
         
-        update_data = pedido_data.dict(exclude_unset=True, exclude={"alunos"})
-        for field, value in update_data.items():
-            setattr(pedido, field, value)
-        
-        # Atualizar alunos se fornecido
+        # Substituir alunos se fornecido, sem carregar os objetos User
         if pedido_data.alunos is not None:
-            result = await self.db.execute(
-                select(User).where(User.id.in_(pedido_data.alunos))
+            await self.db.execute(
+                delete(pedido_doacao_alunos).where(pedido_doacao_alunos.c.pedido_doacao_id == pedido_id)
+            )
+            await self.db.execute(
+                insert(pedido_doacao_alunos).from_select(
+                    ["pedido_doacao_id", "user_id"],
+                    select(literal(pedido_id), User.id).where(User.id.in_(pedido_data.alunos))
+                )
             )
-            pedido.alunos = result.scalars().all()
         
-        await self.db.commit()
-        await self.db.refresh(pedido)
+        # alunos é lazy="raise" e faz parte da resposta
+        await self.db.refresh(pedido, ["alunos"])
         return pedido
     
+    async def has_lancamento(self, pedido_id: int) -> bool:
+        return await self.db.scalar(
+            select(select(LancamentoResiduo.id).where(LancamentoResiduo.pedido_id == pedido_id).exists())
+        )
+    
     async def delete(self, pedido_id: int) -> bool:
-        pedido = await self.get_by_id(pedido_id)
-        if not pedido:
-            return False
-        
-        await self.db.delete(pedido)
-        await self.db.commit()
-        return True
+        return await delete_returning(self.db, PedidoDoacao, pedido_id)
 
 
 class LancamentoResiduoRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.resumo = ResumoDiarioRepository(db)
     
-    async def get_all(self) -> List[LancamentoResiduo]:
+    async def get_all(self, include: Sequence[str] = ()) -> List[LancamentoResiduo]:
         result = await self.db.execute(
-            select(LancamentoResiduo).options(
-                selectinload(LancamentoResiduo.pedido),
-                selectinload(LancamentoResiduo.ponto_coleta),
-                selectinload(LancamentoResiduo.tipo_residuo)
-            )
+            select(LancamentoResiduo).options(*load_options(LancamentoResiduo, schemas.LancamentoResiduo, include))
         )
         return result.scalars().all()
     
-    async def get_by_id(self, lancamento_id: int) -> Optional[LancamentoResiduo]:
+    async def get_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include: Sequence[str] = ()
+    ) -> Tuple[List[LancamentoResiduo], Optional[str]]:
+        stmt, rows = list_statement(LancamentoResiduo, schemas.LancamentoResiduo, include)
+        return await paginate(
+            self.db,
+            stmt,
+            [LancamentoResiduo.data, LancamentoResiduo.id],
+            limit,
+            cursor,
+            descending=True,
+            rows=rows
+        )
+    
+    def tables(self, include: Sequence[str] = ()) -> Tuple[str, ...]:
+        """Tabelas lidas por ``get_by_id`` com ``include``, para versionar a resposta"""
+        return loaded_tables(LancamentoResiduo, schemas.LancamentoResiduo, include)
+    
+    async def get_by_id(self, lancamento_id: int, include: Sequence[str] = ()) -> Optional[LancamentoResiduo]:
         result = await self.db.execute(
-            select(LancamentoResiduo).options(
-                selectinload(LancamentoResiduo.pedido),
-                selectinload(LancamentoResiduo.ponto_coleta),
-                selectinload(LancamentoResiduo.tipo_residuo)
-            ).where(LancamentoResiduo.id == lancamento_id)
+            select(LancamentoResiduo)
+            .options(*load_options(LancamentoResiduo, schemas.LancamentoResiduo, include))
+            .where(LancamentoResiduo.id == lancamento_id)
         )
         return result.scalar_one_or_none()
     
     async def create(self, lancamento_data: LancamentoResiduoCreate) -> LancamentoResiduo:
-        lancamento = LancamentoResiduo(**lancamento_data.dict())
-        self.db.add(lancamento)
-        await self.db.commit()
-        await self.db.refresh(lancamento)
+        lancamento = LancamentoResiduo(**lancamento_data.model_dump())
+        await add_and_flush(self.db, lancamento)
+        await self.resumo.move(None, await self.resumo.entry(LancamentoResiduo.id == lancamento.id))
         return lancamento
     
     async def update(self, lancamento_id: int, lancamento_data: LancamentoResiduoUpdate) -> Optional[LancamentoResiduo]:
-        lancamento = await self.get_by_id(lancamento_id)
-        if not lancamento:
-            return None
-        
-        update_data = lancamento_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(lancamento, field, value)
+        update_data = lancamento_data.model_dump(exclude_unset=True)
+        if not update_data:
+            return await update_returning(self.db, LancamentoResiduo, lancamento_id, update_data)
         
-        await self.db.commit()
-        await self.db.refresh(lancamento)
+        anterior = await self.resumo.entry(LancamentoResiduo.id == lancamento_id, lock=True)
+        if anterior is None:
+            return None
+        lancamento = await update_returning(self.db, LancamentoResiduo, lancamento_id, update_data)
+        if "pedido_id" in update_data:
+            atual = await self.resumo.entry(LancamentoResiduo.id == lancamento_id)
+        else:
+            atual = EntradaResumo.of(lancamento, anterior.chave.turma_id, anterior.turma)
+        await self.resumo.move(anterior, atual)
         return lancamento
     
     async def delete(self, lancamento_id: int) -> bool:
-        lancamento = await self.get_by_id(lancamento_id)
-        if not lancamento:
+        anterior = await self.resumo.entry(LancamentoResiduo.id == lancamento_id, lock=True)
+        if anterior is None or not await delete_returning(self.db, LancamentoResiduo, lancamento_id):
             return False
-        
-        await self.db.delete(lancamento)
-        await self.db.commit()
+        await self.resumo.move(anterior, None)
         return True
+    
+    def export_statement(
+        self,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        ponto_coleta_id: Optional[int] = None,
+        tipo_residuo_id: Optional[int] = None,
+        universidade_id: Optional[int] = None
+    ) -> Select:
+        """Colunas da exportação (sem entidades ORM), filtradas e em ordem de data"""
+        stmt = (
+            select(
+                LancamentoResiduo.id,
+                LancamentoResiduo.data,
+                LancamentoResiduo.peso_kg,
+                PedidoDoacao.codigo.label("pedido_codigo"),
+                PedidoDoacao.turma_id,
+                PontoColeta.id.label("ponto_coleta_id"),
+                PontoColeta.nome.label("ponto_coleta"),
+                TipoResiduo.id.label("tipo_residuo_id"),
+                TipoResiduo.nome.label("tipo_residuo"),
+                Universidade.id.label("universidade_id"),
+                Universidade.nome.label("universidade"),
+            )
+            .join(PedidoDoacao, LancamentoResiduo.pedido_id == PedidoDoacao.id)
+            .join(PontoColeta, LancamentoResiduo.ponto_coleta_id == PontoColeta.id)
+            .join(TipoResiduo, LancamentoResiduo.tipo_residuo_id == TipoResiduo.id)
+            .join(Universidade, PontoColeta.universidade_id == Universidade.id)
+            .order_by(LancamentoResiduo.data, LancamentoResiduo.id)
+        )
+        if data_inicio is not None:
+            stmt = stmt.where(LancamentoResiduo.data >= data_inicio)
+        if data_fim is not None:
+            stmt = stmt.where(LancamentoResiduo.data < data_fim)
+        if ponto_coleta_id is not None:
+            stmt = stmt.where(LancamentoResiduo.ponto_coleta_id == ponto_coleta_id)
+        if tipo_residuo_id is not None:
+            stmt = stmt.where(LancamentoResiduo.tipo_residuo_id == tipo_residuo_id)
+        if universidade_id is not None:
+            stmt = stmt.where(PontoColeta.universidade_id == universidade_id)
+        return stmt
+    
+    async def stream(self, stmt: Select) -> AsyncIterator[Sequence[Row]]:
+        """Executa ``stmt`` por um cursor do lado do servidor, em lotes de
+        ``EXPORT_BATCH_SIZE`` linhas: a memória não depende do total lido."""
+        result = await self.db.stream(stmt.execution_options(yield_per=settings.export_batch_size))
+        async for partition in result.partitions():
+            yield partition
@@ -0,0 +1,236 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Date, and_, cast, delete, func, insert, literal_column, select, true, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import leaderboard
+from app.core.leaderboard import DeltaRanking, TurmaInfo, periodo_of
+from app.db.models.institutional import Turma
+from app.db.models.recycling import PedidoDoacao, LancamentoResiduo, ResumoDiarioResiduo, SequenciaRanking
+
+
+class ChaveResumo(NamedTuple):
+    dia: date
+    ponto_coleta_id: int
+    tipo_residuo_id: int
+    turma_id: int
+
+
+class EntradaResumo(NamedTuple):
+    """Contribuição de um lançamento para o resumo diário"""
+    chave: ChaveResumo
+    peso_kg: Decimal
+    turma: TurmaInfo
+
+    @classmethod
+    def of(cls, lancamento: Any, turma_id: int, turma: TurmaInfo) -> "EntradaResumo":
+        return cls(
+            ChaveResumo(lancamento.data.date(), lancamento.ponto_coleta_id, lancamento.tipo_residuo_id, turma_id),
+            lancamento.peso_kg,
+            turma
+        )
+
+
+def day_expression(column: Any, dialect_name: str) -> Any:
+    """Dia (sem hora) de uma coluna DateTime.
+
+    No SQLite ``CAST(... AS DATE)`` devolve apenas o ano; ``date()`` devolve
+    ``AAAA-MM-DD``, o mesmo formato em que o tipo ``Date`` é gravado.
+    """
+    if dialect_name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
+
+def _constant(value: str) -> Any:
+    # Literal no SQL, não parâmetro: a expressão do SELECT e a do GROUP BY
+    # precisam ser idênticas (o PostgreSQL não compara parâmetros distintos)
+    return literal_column(f"'{value}'")
+
+
+def month_expression(column: Any, dialect_name: str) -> Any:
+    """Mês ``AAAA-MM`` de uma coluna de data, como texto"""
+    if dialect_name == "sqlite":
+        return func.strftime(_constant("%Y-%m"), column)
+    if dialect_name in ("mysql", "mariadb"):
+        return func.date_format(column, _constant("%Y-%m"))
+    return func.to_char(column, _constant("YYYY-MM"))
+
+
+def bucket_expression(column: Any, intervalo: str, dialect_name: str) -> Any:
+    """Início do dia, da semana (segunda-feira) ou do mês de uma coluna Date,
+    calculado no banco com a função de truncamento de cada dialeto"""
+    if intervalo == "dia":
+        return column
+    if dialect_name == "sqlite":
+        if intervalo == "semana":
+            # Próximo domingo (ou o próprio dia) menos 6 dias
+            return func.date(column, _constant("weekday 0"), _constant("-6 days"), type_=Date)
+        return func.strftime(_constant("%Y-%m-01"), column, type_=Date)
+    if dialect_name in ("mysql", "mariadb"):
+        if intervalo == "semana":
+            return func.subdate(column, func.weekday(column), type_=Date)
+        return cast(func.date_format(column, _constant("%Y-%m-01")), Date)
+    return cast(func.date_trunc(_constant("week" if intervalo == "semana" else "month"), column), Date)
+
+
+class ResumoDiarioRepository:
+    """Manutenção da tabela ``resumo_diario_residuo``.
+
+    As escritas de lançamentos aplicam deltas (peso e contagem) com upsert na
+    mesma transação; ``rebuild`` recalcula o resumo a partir dos lançamentos.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def entry(self, *criteria: Any, lock: bool = False) -> Optional[EntradaResumo]:
+        """Contribuição atual do lançamento que atende ``criteria``.
+
+        Com ``lock`` a linha do lançamento fica bloqueada (``FOR UPDATE``) até o
+        fim da transação, para que escritas concorrentes não calculem o delta
+        a partir do mesmo valor anterior.
+        """
+        stmt = (
+            select(
+                LancamentoResiduo.data,
+                LancamentoResiduo.ponto_coleta_id,
+                LancamentoResiduo.tipo_residuo_id,
+                LancamentoResiduo.peso_kg,
+                PedidoDoacao.turma_id,
+                Turma.nome,
+                Turma.universidade_id,
+                Turma.unidade_id,
+            )
+            .join(PedidoDoacao, LancamentoResiduo.pedido_id == PedidoDoacao.id)
+            .join(Turma, PedidoDoacao.turma_id == Turma.id)
+            .where(*criteria)
+        )
+        if lock:
+            stmt = stmt.with_for_update(of=LancamentoResiduo)
+        row = (await self.db.execute(stmt)).first()
+        if row is None:
+            return None
+        return EntradaResumo.of(row, row.turma_id, TurmaInfo(row.nome, row.universidade_id, row.unidade_id))
+
+    async def move(self, anterior: Optional[EntradaResumo], atual: Optional[EntradaResumo]) -> None:
+        """Troca a contribuição ``anterior`` pela ``atual`` (``None`` em criação/remoção)
+        no resumo e, após o commit, no ranking de turmas"""
+        if anterior is not None and atual is not None and anterior.chave == atual.chave:
+            if atual.peso_kg != anterior.peso_kg:
+                await self.apply(atual.chave, atual.peso_kg - anterior.peso_kg, 0)
+                self._record(atual, atual.peso_kg - anterior.peso_kg)
+            return
+        if anterior is not None:
+            await self.apply(anterior.chave, -anterior.peso_kg, -1)
+            self._record(anterior, -anterior.peso_kg)
+        if atual is not None:
+            await self.apply(atual.chave, atual.peso_kg, 1)
+            self._record(atual, atual.peso_kg)
+
+    def _record(self, entrada: EntradaResumo, kg: Decimal) -> None:
+        leaderboard.record(
+            self.db,
+            DeltaRanking(entrada.chave.turma_id, entrada.turma, periodo_of(entrada.chave.dia), kg)
+        )
+
+    async def apply(self, chave: ChaveResumo, peso_kg: Decimal, lancamentos: int) -> None:
+        """Soma o delta à linha de ``chave`` (criando-a se preciso) e remove a
+        linha quando não restam lançamentos"""
+        table = ResumoDiarioResiduo.__table__
+        values = {**chave._asdict(), "total_kg": peso_kg, "lancamentos": lancamentos}
+        dialect = self.db.bind.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(ChaveResumo._fields),
+                set_={
+                    "total_kg": table.c.total_kg + stmt.excluded.total_kg,
+                    "lancamentos": table.c.lancamentos + stmt.excluded.lancamentos,
+                }
+            )
+            await self.db.execute(stmt)
+        elif dialect in ("mysql", "mariadb"):
+            stmt = mysql.insert(table).values(values)
+            stmt = stmt.on_duplicate_key_update(
+                total_kg=table.c.total_kg + stmt.inserted.total_kg,
+                lancamentos=table.c.lancamentos + stmt.inserted.lancamentos,
+            )
+            await self.db.execute(stmt)
+        else:
+            # Sem upsert nativo: UPDATE e, se a linha ainda não existe, INSERT
+            result = await self.db.execute(
+                update(table)
+                .where(self._key_clause(chave))
+                .values(total_kg=table.c.total_kg + peso_kg, lancamentos=table.c.lancamentos + lancamentos)
+            )
+            if result.rowcount == 0:
+                await self.db.execute(insert(table).values(values))
+
+        if lancamentos < 0:
+            await self.db.execute(
+                delete(table).where(self._key_clause(chave), table.c.lancamentos <= 0)
+            )
+
+    async def rebuild(self, desde: Optional[date] = None) -> int:
+        """Recalcula o resumo (a partir de ``desde``, se informado) com um
+        DELETE e um INSERT ... SELECT agrupado; devolve as linhas gravadas."""
+        dia = day_expression(LancamentoResiduo.data, self.db.bind.dialect.name)
+        source = (
+            select(
+                dia,
+                LancamentoResiduo.ponto_coleta_id,
+                LancamentoResiduo.tipo_residuo_id,
+                PedidoDoacao.turma_id,
+                func.sum(LancamentoResiduo.peso_kg),
+                func.count(),
+            )
+            .join(PedidoDoacao, LancamentoResiduo.pedido_id == PedidoDoacao.id)
+            .group_by(dia, LancamentoResiduo.ponto_coleta_id, LancamentoResiduo.tipo_residuo_id, PedidoDoacao.turma_id)
+        )
+        remove = delete(ResumoDiarioResiduo).execution_options(synchronize_session=False)
+        if desde is not None:
+            source = source.where(LancamentoResiduo.data >= datetime.combine(desde, time.min))
+            remove = remove.where(ResumoDiarioResiduo.dia >= desde)
+
+        await self.db.execute(remove)
+        result = await self.db.execute(
+            insert(ResumoDiarioResiduo).from_select(
+                [*ChaveResumo._fields, "total_kg", "lancamentos"], source
+            )
+        )
+        return result.rowcount
+
+    async def turma_totals(self) -> Tuple[int, List[Any]]:
+        """``ranking_sequencia`` e kg por turma e mês, do resumo, com o que o
+        ranking precisa da turma; lidos num só comando, portanto num só snapshot"""
+        periodo = month_expression(ResumoDiarioResiduo.dia, self.db.bind.dialect.name)
+        totais = (
+            select(
+                Turma.id.label("turma_id"),
+                Turma.nome,
+                Turma.universidade_id,
+                Turma.unidade_id,
+                periodo.label("periodo"),
+                func.sum(ResumoDiarioResiduo.total_kg).label("total_kg"),
+            )
+            .join(Turma, ResumoDiarioResiduo.turma_id == Turma.id)
+            .group_by(Turma.id, Turma.nome, Turma.universidade_id, Turma.unidade_id, periodo)
+            .subquery()
+        )
+        sequencia = SequenciaRanking.__table__
+        result = await self.db.execute(
+            select(sequencia.c.valor.label("sequencia"), totais)
+            .select_from(sequencia.outerjoin(totais, true()))
+            .where(sequencia.c.id == 1)
+        )
+        rows = result.all()
+        return rows[0].sequencia, [row for row in rows if row.turma_id is not None]
+
+    @staticmethod
+    def _key_clause(chave: ChaveResumo) -> Any:
+        table = ResumoDiarioResiduo.__table__
+        return and_(*(table.c[name] == value for name, value in chave._asdict().items()))
@@ -0,0 +1,175 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.institutional import Universidade, Unidade, Curso, Turma
+from app.repositories.rollup import bucket_expression
+from app.db.models.recycling import (
+    TipoResiduo, PontoColeta, PedidoDoacao, LancamentoResiduo, ResumoDiarioResiduo, pedido_doacao_alunos
+)
+
+# Dimensão -> (coluna com o id no lançamento/turma, modelo com o nome)
+DIMENSOES: Dict[str, Tuple[Any, Any]] = {
+    "universidade": (Turma.universidade_id, Universidade),
+    "unidade": (Turma.unidade_id, Unidade),
+    "curso": (Turma.curso_id, Curso),
+    "turma": (PedidoDoacao.turma_id, Turma),
+    "ponto_coleta": (LancamentoResiduo.ponto_coleta_id, PontoColeta),
+    "tipo_residuo": (LancamentoResiduo.tipo_residuo_id, TipoResiduo),
+}
+
+# As mesmas dimensões lidas do resumo diário
+DIMENSOES_RESUMO: Dict[str, Any] = {
+    "universidade": Turma.universidade_id,
+    "unidade": Turma.unidade_id,
+    "curso": Turma.curso_id,
+    "turma": ResumoDiarioResiduo.turma_id,
+    "ponto_coleta": ResumoDiarioResiduo.ponto_coleta_id,
+    "tipo_residuo": ResumoDiarioResiduo.tipo_residuo_id,
+}
+
+
+def validate_dimensions(group_by: Sequence[str]) -> List[str]:
+    invalid = [name for name in group_by if name not in DIMENSOES]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid group_by: {', '.join(invalid)}"
+        )
+    return list(dict.fromkeys(group_by))
+
+
+class EstatisticasRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def aggregate(
+        self,
+        group_by: Sequence[str] = (),
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        filters: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """kg, lançamentos e alunos distintos por combinação das dimensões.
+
+        Uma única consulta: a CTE ``base`` filtra os lançamentos (uma linha
+        por lançamento); ``totais`` soma o peso e ``alunos`` conta os alunos
+        distintos pela tabela de associação, em agregados separados para que
+        um pedido com vários alunos não multiplique o peso.
+        """
+        group_by = validate_dimensions(group_by)
+        filters = filters or {}
+        validate_dimensions(list(filters))
+        
+        columns = [DIMENSOES[name][0].label(name) for name in group_by]
+        base = (
+            select(
+                *columns,
+                LancamentoResiduo.pedido_id,
+                LancamentoResiduo.peso_kg,
+            )
+            .join(PedidoDoacao, LancamentoResiduo.pedido_id == PedidoDoacao.id)
+            .join(Turma, PedidoDoacao.turma_id == Turma.id)
+        )
+        if data_inicio is not None:
+            base = base.where(LancamentoResiduo.data >= data_inicio)
+        if data_fim is not None:
+            base = base.where(LancamentoResiduo.data < data_fim)
+        for name, value in filters.items():
+            base = base.where(DIMENSOES[name][0] == value)
+        base = base.cte("base")
+        
+        keys = [base.c[name] for name in group_by]
+        totais = (
+            select(
+                *keys,
+                func.sum(base.c.peso_kg).label("total_kg"),
+                func.count().label("lancamentos"),
+            )
+            .select_from(base)
+            .group_by(*keys)
+            .cte("totais")
+        )
+        alunos = (
+            select(
+                *keys,
+                func.count(pedido_doacao_alunos.c.user_id.distinct()).label("alunos"),
+            )
+            .select_from(base)
+            .join(pedido_doacao_alunos, pedido_doacao_alunos.c.pedido_doacao_id == base.c.pedido_id)
+            .group_by(*keys)
+            .cte("alunos")
+        )
+        
+        stmt = select(
+            *(totais.c[name] for name in group_by),
+            func.coalesce(totais.c.total_kg, 0).label("total_kg"),
+            totais.c.lancamentos,
+            func.coalesce(alunos.c.alunos, 0).label("alunos"),
+        )
+        join_on = and_(*(alunos.c[name] == totais.c[name] for name in group_by)) if group_by else true()
+        stmt = stmt.select_from(totais).outerjoin(alunos, join_on)
+        for name in group_by:
+            model = DIMENSOES[name][1]
+            stmt = stmt.join(model, model.id == totais.c[name]).add_columns(model.nome.label(f"{name}_nome"))
+        stmt = stmt.order_by(totais.c.total_kg.desc(), *(totais.c[name] for name in group_by))
+        
+        result = await self.db.execute(stmt)
+        return [row._asdict() for row in result]
+    
+    async def aggregate_resumo(
+        self,
+        group_by: Sequence[str] = (),
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None,
+        filters: Optional[Dict[str, int]] = None,
+        intervalo: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """kg e lançamentos por combinação das dimensões, lidos só do resumo
+        diário: o custo acompanha dias x dimensões, não o total de lançamentos.
+        
+        Com ``intervalo`` (``dia``, ``semana`` ou ``mes``) agrupa também pelo
+        início do período, truncado no banco, em ``inicio``.
+        """
+        group_by = validate_dimensions(group_by)
+        filters = filters or {}
+        validate_dimensions(list(filters))
+        
+        columns = [DIMENSOES_RESUMO[name] for name in group_by]
+        if intervalo is not None:
+            columns.append(bucket_expression(ResumoDiarioResiduo.dia, intervalo, self.db.bind.dialect.name))
+        totais = (
+            select(
+                *(column.label(name) for name, column in zip([*group_by, "inicio"], columns)),
+                func.sum(ResumoDiarioResiduo.total_kg).label("total_kg"),
+                func.sum(ResumoDiarioResiduo.lancamentos).label("lancamentos"),
+            )
+            .join(Turma, ResumoDiarioResiduo.turma_id == Turma.id)
+            .group_by(*columns)
+        )
+        if data_inicio is not None:
+            totais = totais.where(ResumoDiarioResiduo.dia >= data_inicio)
+        if data_fim is not None:
+            totais = totais.where(ResumoDiarioResiduo.dia < data_fim)
+        for name, value in filters.items():
+            totais = totais.where(DIMENSOES_RESUMO[name] == value)
+        totais = totais.subquery("totais")
+        
+        stmt = select(
+            *(totais.c[name] for name in group_by),
+            func.coalesce(totais.c.total_kg, 0).label("total_kg"),
+            func.coalesce(totais.c.lancamentos, 0).label("lancamentos"),
+        ).select_from(totais)
+        for name in group_by:
+            model = DIMENSOES[name][1]
+            stmt = stmt.join(model, model.id == totais.c[name]).add_columns(model.nome.label(f"{name}_nome"))
+        if intervalo is not None:
+            stmt = stmt.add_columns(totais.c.inicio).order_by(*(totais.c[name] for name in group_by), totais.c.inicio)
+        else:
+            stmt = stmt.order_by(totais.c.total_kg.desc(), *(totais.c[name] for name in group_by))
+        
+        result = await self.db.execute(stmt)
+        return [row._asdict() for row in result]
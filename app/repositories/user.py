@@ -1,11 +1,14 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, or_
 
 from app.db.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash
+from app.core.hashing import password_hasher
+from app.core.cache import invalidate_principal
+from app.repositories.loading import load_options
+from app.repositories.pagination import paginate
+from app.repositories.writes import add_and_flush, delete_returning, update_returning
 
 
 class UserRepository:
@@ -13,33 +16,20 @@ class UserRepository:
         self.db = db
     
     async def get_all(self) -> List[User]:
-        result = await self.db.execute(
-            select(User).options(
-                selectinload(User.universidade),
-                selectinload(User.unidade),
-                selectinload(User.turma)
-            )
-        )
+        result = await self.db.execute(select(User))
         return result.scalars().all()
     
-    async def get_by_id(self, user_id: int) -> Optional[User]:
+    async def get_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[User], Optional[str]]:
+        return await paginate(self.db, select(User), [User.id], limit, cursor)
+    
+    async def get_by_id(self, user_id: int, include: Sequence[str] = ()) -> Optional[User]:
         result = await self.db.execute(
-            select(User).options(
-                selectinload(User.universidade),
-                selectinload(User.unidade),
-                selectinload(User.turma)
-            ).where(User.id == user_id)
+            select(User).options(*load_options(User, include=include)).where(User.id == user_id)
         )
         return result.scalar_one_or_none()
     
     async def get_by_username(self, username: str) -> Optional[User]:
-        result = await self.db.execute(
-            select(User).options(
-                selectinload(User.universidade),
-                selectinload(User.unidade),
-                selectinload(User.turma)
-            ).where(User.username == username)
-        )
+        result = await self.db.execute(select(User).where(User.username == username))
         return result.scalar_one_or_none()
     
     async def get_by_email(self, email: str) -> Optional[User]:
@@ -47,46 +37,75 @@ class UserRepository:
         return result.scalar_one_or_none()
     
     async def create(self, user_data: UserCreate, perfil: str) -> User:
-        user_dict = user_data.dict(exclude={"password"})
+        user_dict = user_data.model_dump(exclude={"password"})
         user_dict["perfil"] = perfil
-        user_dict["hashed_password"] = get_password_hash(user_data.password)
-        
-        user = User(**user_dict)
-        self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
+        user_dict["hashed_password"] = await password_hasher.hash(user_data.password)
+        return await self.insert_row(user_dict)
+    
+    async def insert_row(self, user_dict: dict) -> User:
+        """INSERT de uma linha já com ``hashed_password``.
+
+        Unicidade garantida pelos índices; conflitos sobem como IntegrityError.
+        O savepoint desfaz só este INSERT, sem derrubar a transação da requisição
+        """
+        async with self.db.begin_nested():
+            if self.db.bind.dialect.insert_returning:
+                user = await self.db.scalar(insert(User).values(**user_dict).returning(User))
+            else:
+                user = await add_and_flush(self.db, User(**user_dict))
         return user
     
+    async def get_existing_usernames_emails(self, usernames: List[str], emails: List[str]) -> Tuple[Set[str], Set[str]]:
+        result = await self.db.execute(
+            select(User.username, User.email).where(
+                or_(User.username.in_(usernames), User.email.in_(emails))
+            )
+        )
+        rows = result.all()
+        return {row.username for row in rows}, {row.email for row in rows}
+    
+    async def hash_rows(self, users_data: List[UserCreate], perfil: str) -> List[dict]:
+        """Linhas prontas para INSERT, com as senhas do lote calculadas no pool"""
+        hashes = await password_hasher.hash_many([u.password for u in users_data])
+        rows = []
+        for user_data, hashed_password in zip(users_data, hashes):
+            user_dict = user_data.model_dump(exclude={"password"})
+            user_dict["perfil"] = perfil
+            user_dict["hashed_password"] = hashed_password
+            rows.append(user_dict)
+        return rows
+    
+    async def insert_many(self, rows: List[dict]) -> List[User]:
+        # INSERT multi-linha; sem suporte a RETURNING (MySQL), relê pelos usernames
+        async with self.db.begin_nested():
+            if self.db.bind.dialect.insert_returning:
+                result = await self.db.scalars(insert(User).returning(User, sort_by_parameter_order=True), rows)
+                users = list(result.all())
+            else:
+                await self.db.execute(insert(User), rows)
+                result = await self.db.execute(
+                    select(User).where(User.username.in_([row["username"] for row in rows]))
+                )
+                users = list(result.scalars().all())
+        return users
+    
     async def update(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
-        user = await self.get_by_id(user_id)
-        if not user:
-            return None
-        
-        update_data = user_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(user, field, value)
-        
-        await self.db.commit()
-        await self.db.refresh(user)
+        update_data = user_data.model_dump(exclude_unset=True)
+        user = await update_returning(self.db, User, user_id, update_data)
+        invalidate_principal(self.db, user_id)
         return user
     
     async def delete(self, user_id: int) -> bool:
-        user = await self.get_by_id(user_id)
-        if not user:
-            return False
-        
-        await self.db.delete(user)
-        await self.db.commit()
-        return True
+        deleted = await delete_returning(self.db, User, user_id)
+        invalidate_principal(self.db, user_id)
+        return deleted
     
     async def authenticate(self, username: str, password: str) -> Optional[User]:
-        from app.core.security import verify_password
-        
         user = await self.get_by_username(username)
         if not user:
             return None
         
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             return None
         
         return user
@@ -0,0 +1,89 @@
+from typing import Any, List, Optional
+
+from sqlalchemy import delete, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import RelationshipDirection
+
+
+def _dependent_statements(model: Any, ids: Any) -> List[Any]:
+    """Comandos que reproduzem, sem carregar objetos, o que a unit of work
+    faria com os dependentes ao apagar as linhas ``ids`` de ``model``:
+    apaga linhas de associação (many-to-many), apaga filhos com cascade
+    ``delete`` e anula chaves estrangeiras anuláveis dos demais filhos.
+    """
+    statements = []
+    for rel in inspect(model).relationships:
+        if rel.viewonly:
+            continue
+        if rel.secondary is not None:
+            for _, column in rel.synchronize_pairs:
+                statements.append(delete(rel.secondary).where(column.in_(ids)))
+        elif rel.direction is RelationshipDirection.ONETOMANY:
+            child = rel.mapper.class_
+            foreign_keys = [remote for _, remote in rel.local_remote_pairs]
+            if "delete" in rel.cascade:
+                child_ids = select(inspect(child).primary_key[0]).where(foreign_keys[0].in_(ids))
+                statements.extend(_dependent_statements(child, child_ids))
+                statements.append(
+                    delete(child)
+                    .where(foreign_keys[0].in_(ids))
+                    .execution_options(synchronize_session=False)
+                )
+            elif all(fk.nullable for fk in foreign_keys):
+                statements.append(
+                    update(child)
+                    .where(foreign_keys[0].in_(ids))
+                    .values({fk.key: None for fk in foreign_keys})
+                    .execution_options(synchronize_session=False)
+                )
+    return statements
+
+
+async def add_and_flush(db: AsyncSession, obj: Any) -> Any:
+    """Insere ``obj`` na transação corrente sem commit.
+
+    Com RETURNING os defaults do servidor já voltam no INSERT; sem ele (MySQL)
+    ficam expirados após o flush e são relidos.
+    """
+    db.add(obj)
+    await db.flush()
+    expired = inspect(obj).expired_attributes
+    if expired:
+        await db.refresh(obj, list(expired))
+    return obj
+
+
+async def update_returning(db: AsyncSession, model: Any, pk: Any, values: dict) -> Optional[Any]:
+    """``UPDATE ... RETURNING`` em uma ida ao banco; ``None`` se a linha não existe.
+
+    Sem RETURNING (MySQL, SQLite < 3.35) faz o UPDATE e relê a linha. Não faz
+    commit: cabe à unit of work da requisição.
+    """
+    if not values:
+        return await db.get(model, pk)
+
+    key = inspect(model).primary_key[0]
+    stmt = update(model).where(key == pk).values(**values)
+    if db.bind.dialect.update_returning:
+        return await db.scalar(stmt.returning(model), execution_options={"populate_existing": True})
+
+    result = await db.execute(stmt)
+    if result.rowcount == 0:
+        return None
+    return await db.get(model, pk, populate_existing=True)
+
+
+async def delete_returning(db: AsyncSession, model: Any, pk: Any) -> bool:
+    """``DELETE ... RETURNING id`` sem buscar a linha antes; ``False`` se não existe.
+
+    Sem RETURNING (MySQL, SQLite < 3.35) usa o rowcount do DELETE. Não faz
+    commit: cabe à unit of work da requisição.
+    """
+    for statement in _dependent_statements(model, [pk]):
+        await db.execute(statement)
+
+    key = inspect(model).primary_key[0]
+    stmt = delete(model).where(key == pk).execution_options(synchronize_session=False)
+    if db.bind.dialect.delete_returning:
+        return (await db.execute(stmt.returning(key))).first() is not None
+    return (await db.execute(stmt)).rowcount > 0
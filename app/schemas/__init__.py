@@ -5,9 +5,11 @@ from app.schemas.institutional import (
     Turma, TurmaCreate, TurmaUpdate
 )
 from app.schemas.user import (
-    User, UserCreate, UserUpdate, UserInfo,
+    User, UserCreate, UserUpdate, UserInfo, Principal,
+    BulkUserResult, BulkUserResponse,
     Token, TokenData
 )
+from app.schemas.pagination import Page
 from app.schemas.recycling import (
     TipoResiduo, TipoResiduoCreate, TipoResiduoUpdate,
     PontoColeta, PontoColetaCreate, PontoColetaUpdate,
@@ -22,8 +24,11 @@ __all__ = [
     "Curso", "CursoCreate", "CursoUpdate",
     "Turma", "TurmaCreate", "TurmaUpdate",
     # User
-    "User", "UserCreate", "UserUpdate", "UserInfo",
+    "User", "UserCreate", "UserUpdate", "UserInfo", "Principal",
+    "BulkUserResult", "BulkUserResponse",
     "Token", "TokenData",
+    # Pagination
+    "Page",
     # Recycling
     "TipoResiduo", "TipoResiduoCreate", "TipoResiduoUpdate",
     "PontoColeta", "PontoColetaCreate", "PontoColetaUpdate",
@@ -0,0 +1,67 @@
+from functools import lru_cache
+from typing import Any, FrozenSet, Iterable, List, Optional, Type, get_args
+
+from pydantic import BaseModel, TypeAdapter, model_serializer, model_validator
+from sqlalchemy import inspect
+from sqlalchemy.orm import Mapper
+
+
+def nested_schema(annotation: Any) -> Optional[Type[BaseModel]]:
+    """Retorna o schema aninhado de uma anotação (``Optional[X]``, ``List[X]``)"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        schema = nested_schema(arg)
+        if schema is not None:
+            return schema
+    return None
+
+
+@lru_cache(maxsize=None)
+def expansion_fields(schema: Type[BaseModel]) -> FrozenSet[str]:
+    """Campos de relacionamento opcionais, preenchidos apenas com ``include=``"""
+    return frozenset(
+        name for name, field in schema.model_fields.items()
+        if field.default is None and nested_schema(field.annotation) is not None
+    )
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def validate_list(schema: Type[BaseModel], items: Iterable[Any]) -> List[Any]:
+    """Valida a lista inteira em uma chamada (objetos ORM ou linhas de SELECT)"""
+    return list_adapter(schema).validate_python(items, from_attributes=True)
+
+
+class ExpandableModel(BaseModel):
+    """Schema de resposta com relacionamentos expansíveis.
+
+    Relacionamentos não carregados no objeto ORM são ignorados (em vez de
+    disparar o lazy load) e ficam fora da resposta; os demais campos são
+    lidos normalmente.
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def _skip_unloaded(cls, data: Any) -> Any:
+        if isinstance(data, dict):
+            return data
+        state = inspect(data, raiseerr=False)
+        if state is None or isinstance(state, Mapper):
+            return data
+        skipped = expansion_fields(cls) & state.unloaded
+        return {
+            name: getattr(data, name)
+            for name in cls.model_fields
+            if name not in skipped and hasattr(type(data), name)
+        }
+
+    @model_serializer(mode="wrap")
+    def _drop_unexpanded(self, handler):
+        data = handler(self)
+        for name in expansion_fields(type(self)) - self.model_fields_set:
+            data.pop(name, None)
+        return data
@@ -1,8 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
 
+from app.schemas.base import ExpandableModel
+from app.schemas.institutional import Universidade, Unidade, Turma
+from app.schemas.user import User
+
 
 class TipoResiduoBase(BaseModel):
     nome: str
@@ -41,8 +45,11 @@ class PontoColetaUpdate(BaseModel):
     responsavel_id: Optional[int] = None
 
 
-class PontoColeta(PontoColetaBase):
+class PontoColeta(PontoColetaBase, ExpandableModel):
     id: int
+    universidade: Optional[Universidade] = None
+    unidade: Optional[Unidade] = None
+    responsavel: Optional[User] = None
 
     class Config:
         from_attributes = True
@@ -65,11 +72,19 @@ class PedidoDoacaoUpdate(BaseModel):
     confirmado: Optional[bool] = None
 
 
-class PedidoDoacao(PedidoDoacaoBase):
+class PedidoDoacao(PedidoDoacaoBase, ExpandableModel):
     id: int
     criado_por_id: Optional[int] = None
     criado_em: datetime
     confirmado: bool
+    criado_por: Optional[User] = None
+    turma: Optional[Turma] = None
+
+    @field_validator("alunos", mode="before")
+    @classmethod
+    def _alunos_ids(cls, value):
+        # O relacionamento ORM traz objetos User; a resposta expõe só os ids
+        return [getattr(aluno, "id", aluno) for aluno in value or []]
 
     class Config:
         from_attributes = True
@@ -93,9 +108,12 @@ class LancamentoResiduoUpdate(BaseModel):
     peso_kg: Optional[Decimal] = None
 
 
-class LancamentoResiduo(LancamentoResiduoBase):
+class LancamentoResiduo(LancamentoResiduoBase, ExpandableModel):
     id: int
     data: datetime
+    pedido: Optional[PedidoDoacao] = None
+    ponto_coleta: Optional[PontoColeta] = None
+    tipo_residuo: Optional[TipoResiduo] = None
 
     class Config:
         from_attributes = True
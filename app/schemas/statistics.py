@@ -0,0 +1,76 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import date
+from decimal import Decimal
+
+
+class Dimensao(BaseModel):
+    id: int
+    nome: str
+
+
+class EstatisticaGrupo(BaseModel):
+    # Chaves: as dimensões pedidas em group_by (ex.: {"turma": {...}, "tipo_residuo": {...}})
+    grupo: Dict[str, Dimensao]
+    total_kg: Decimal
+    lancamentos: int
+    alunos: int
+
+
+class Estatisticas(BaseModel):
+    group_by: List[str]
+    items: List[EstatisticaGrupo]
+
+
+class ResumoGrupo(BaseModel):
+    grupo: Dict[str, Dimensao]
+    total_kg: Decimal
+    lancamentos: int
+
+
+class ResumoEstatisticas(BaseModel):
+    group_by: List[str]
+    items: List[ResumoGrupo]
+
+
+class PosicaoRanking(BaseModel):
+    posicao: int
+    turma: Dimensao
+    total_kg: Decimal
+
+
+class Ranking(BaseModel):
+    escopo: str
+    escopo_id: Optional[int] = None
+    # Mês "AAAA-MM"; None para o acumulado
+    periodo: Optional[str] = None
+    items: List[PosicaoRanking]
+
+
+class RankingTurma(PosicaoRanking):
+    escopo: str
+    escopo_id: Optional[int] = None
+    periodo: Optional[str] = None
+    turmas: int
+
+
+class PontoSerie(BaseModel):
+    # Início do período (dia, segunda-feira da semana ou dia 1 do mês)
+    inicio: date
+    total_kg: Decimal
+    lancamentos: int
+
+
+class Serie(BaseModel):
+    grupo: Dict[str, Dimensao]
+    pontos: List[PontoSerie]
+    # Soma dos grupos que não couberam no limite de pontos (grupo vazio)
+    outros: bool = False
+
+
+class SerieTemporal(BaseModel):
+    intervalo: str
+    # Períodos somados em cada ponto quando a série foi reduzida a max_pontos
+    periodos_por_ponto: int
+    group_by: List[str]
+    series: List[Serie]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -41,6 +41,33 @@ class User(UserBase):
         from_attributes = True
 
 
+class BulkUserResult(BaseModel):
+    index: int
+    username: str
+    status: str
+    user: Optional[User] = None
+    detail: Optional[str] = None
+
+
+class BulkUserResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkUserResult]
+
+
+class Principal(BaseModel):
+    id: int
+    username: str
+    perfil: str
+    is_active: bool
+    universidade_id: Optional[int] = None
+    unidade_id: Optional[int] = None
+    turma_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
 class UserInfo(BaseModel):
     id: int
     username: str
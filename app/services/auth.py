@@ -1,10 +1,15 @@
-from typing import List, Optional
+from datetime import timedelta
+from typing import Any, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
 from app.repositories.user import UserRepository
-from app.schemas.user import User, UserCreate, UserUpdate, UserInfo, Token
+from app.schemas.user import User, UserCreate, UserUpdate, UserInfo, Token, BulkUserResult, BulkUserResponse
 from app.core.security import create_access_token, create_refresh_token, verify_token
+from app.core.config import settings
+from app.schemas.base import validate_list
+from app.schemas.pagination import Page
 
 
 class AuthService:
@@ -13,10 +18,28 @@ class AuthService:
     
     async def authenticate_user(self, username: str, password: str) -> Optional[User]:
         user = await self.user_repository.authenticate(username, password)
-        return User.from_orm(user) if user else None
+        return User.model_validate(user) if user else None
+    
+    def _create_access_token(self, user) -> str:
+        data = {"sub": user.username, "user_id": user.id}
+        if not settings.stateless_auth:
+            return create_access_token(data=data)
+        
+        # Claims de autorização recarregados a cada emissão/refresh
+        data.update({
+            "perfil": user.perfil,
+            "is_active": user.is_active,
+            "universidade_id": user.universidade_id,
+            "unidade_id": user.unidade_id,
+            "turma_id": user.turma_id,
+        })
+        return create_access_token(
+            data=data,
+            expires_delta=timedelta(minutes=settings.stateless_access_token_expire_minutes)
+        )
     
     async def create_tokens(self, user: User) -> Token:
-        access_token = create_access_token(data={"sub": user.username, "user_id": user.id})
+        access_token = self._create_access_token(user)
         refresh_token = create_refresh_token(data={"sub": user.username, "user_id": user.id})
         
         return {
@@ -45,7 +68,7 @@ class AuthService:
                     detail="User not found"
                 )
             
-            access_token = create_access_token(data={"sub": username, "user_id": user_id})
+            access_token = self._create_access_token(user)
             new_refresh_token = create_refresh_token(data={"sub": username, "user_id": user_id})
             
             return {
@@ -60,7 +83,7 @@ class AuthService:
             )
     
     async def get_user_info(self, user_id: int) -> Optional[UserInfo]:
-        user = await self.user_repository.get_by_id(user_id)
+        user = await self.user_repository.get_by_id(user_id, include=("universidade", "unidade", "turma"))
         if not user:
             return None
         
@@ -87,37 +110,110 @@ class UserService:
     def __init__(self, db: AsyncSession):
         self.repository = UserRepository(db)
     
+    @staticmethod
+    def _conflict_detail(exc: IntegrityError) -> str:
+        # Identifica a restrição violada pela mensagem do driver
+        message = str(exc.orig).lower()
+        if any(marker in message for marker in ("users.email", "ix_users_email", "key (email)")):
+            return "Email already registered"
+        if any(marker in message for marker in ("users.username", "ix_users_username", "key (username)")):
+            return "Username already registered"
+        raise exc
+    
+    @classmethod
+    def _raise_conflict(cls, exc: IntegrityError) -> None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=cls._conflict_detail(exc))
+    
     async def create_user(self, user_data: UserCreate, perfil: str) -> User:
-        # Verificar se username já existe
-        existing_user = await self.repository.get_by_username(user_data.username)
-        if existing_user:
+        try:
+            user = await self.repository.create(user_data, perfil)
+        except IntegrityError as exc:
+            self._raise_conflict(exc)
+        return User.model_validate(user)
+    
+    async def create_users_bulk(self, users_data: List[UserCreate], perfil: str) -> BulkUserResponse:
+        if len(users_data) > settings.bulk_signup_max_size:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already registered"
+                detail=f"Batch too large (max {settings.bulk_signup_max_size} users)"
             )
         
-        # Verificar se email já existe
-        existing_email = await self.repository.get_by_email(user_data.email)
-        if existing_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
+        # Uma única consulta de unicidade para o lote inteiro
+        existing_usernames, existing_emails = await self.repository.get_existing_usernames_emails(
+            [u.username for u in users_data],
+            [u.email for u in users_data]
+        )
+        
+        results: List[BulkUserResult] = []
+        to_create: List[UserCreate] = []
+        seen_usernames = set(existing_usernames)
+        seen_emails = set(existing_emails)
+        for index, user_data in enumerate(users_data):
+            detail = None
+            if user_data.username in seen_usernames:
+                detail = "Username already registered"
+            elif user_data.email in seen_emails:
+                detail = "Email already registered"
+            
+            results.append(BulkUserResult(
+                index=index,
+                username=user_data.username,
+                status="error" if detail else "created",
+                detail=detail
+            ))
+            if detail is None:
+                to_create.append(user_data)
+                seen_usernames.add(user_data.username)
+                seen_emails.add(user_data.email)
         
-        user = await self.repository.create(user_data, perfil)
-        return User.from_orm(user)
+        if to_create:
+            rows = await self.repository.hash_rows(to_create, perfil)
+            try:
+                created = await self.repository.insert_many(rows)
+            except IntegrityError:
+                # Cadastro concorrente entre a checagem e o INSERT: o savepoint do
+                # lote foi desfeito; cada linha é refeita no seu próprio savepoint,
+                # com as senhas já calculadas
+                created = await self._insert_each(rows, results)
+            created_by_username = {u.username: User.model_validate(u) for u in created}
+            for result in results:
+                if result.status == "created":
+                    result.user = created_by_username.get(result.username)
+        
+        failed = sum(result.status == "error" for result in results)
+        return BulkUserResponse(
+            created=len(users_data) - failed,
+            failed=failed,
+            results=results
+        )
+    
+    async def _insert_each(self, rows: List[dict], results: List[BulkUserResult]) -> List[Any]:
+        by_username = {result.username: result for result in results if result.status == "created"}
+        created = []
+        for row in rows:
+            try:
+                created.append(await self.repository.insert_row(row))
+            except IntegrityError as exc:
+                result = by_username[row["username"]]
+                result.status = "error"
+                result.detail = self._conflict_detail(exc)
+        return created
     
     async def get_user_by_id(self, user_id: int) -> Optional[User]:
         user = await self.repository.get_by_id(user_id)
-        return User.from_orm(user) if user else None
+        return User.model_validate(user) if user else None
     
     async def get_all_users(self) -> List[User]:
         users = await self.repository.get_all()
-        return [User.from_orm(u) for u in users]
+        return validate_list(User, users)
+    
+    async def get_users_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page[User]:
+        users, next_cursor = await self.repository.get_page(limit, cursor)
+        return Page[User](items=validate_list(User, users), next=next_cursor)
     
     async def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
         user = await self.repository.update(user_id, user_data)
-        return User.from_orm(user) if user else None
+        return User.model_validate(user) if user else None
     
     async def delete_user(self, user_id: int) -> bool:
         return await self.repository.delete(user_id)
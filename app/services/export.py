@@ -0,0 +1,41 @@
+import csv
+import io
+from typing import AsyncIterator, List, Sequence
+
+import orjson
+from sqlalchemy.engine import Row
+
+from app.core.responses import orjson_default
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+async def csv_chunks(columns: List[str], batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    """Um pedaço de CSV por lote; o cabeçalho sai mesmo sem linhas"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+
+
+async def ndjson_chunks(columns: List[str], batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    """Um objeto JSON por linha, um pedaço por lote"""
+    async for batch in batches:
+        yield b"".join(
+            orjson.dumps(dict(zip(columns, row)), default=orjson_default, option=orjson.OPT_APPEND_NEWLINE)
+            for row in batch
+        )
+
+
+ENCODERS = {
+    "csv": csv_chunks,
+    "ndjson": ndjson_chunks,
+}
@@ -11,6 +11,11 @@ from app.schemas.institutional import (
     Curso, CursoCreate, CursoUpdate,
     Turma, TurmaCreate, TurmaUpdate
 )
+from app.core.cache import reference_cache
+from app.core.responses import Snapshot, dump_json
+from app.repositories.pagination import clamp_limit
+from app.schemas.base import validate_list
+from app.schemas.pagination import Page
 
 
 class UniversidadeService:
@@ -19,19 +24,29 @@ class UniversidadeService:
     
     async def get_all_universidades(self) -> List[Universidade]:
         universidades = await self.repository.get_all()
-        return [Universidade.from_orm(u) for u in universidades]
+        return validate_list(Universidade, universidades)
+    
+    async def get_universidades_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page[Universidade]:
+        universidades, next_cursor = await self.repository.get_page(limit, cursor)
+        return Page[Universidade](items=validate_list(Universidade, universidades), next=next_cursor)
+    
+    async def get_universidades_page_snapshot(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Snapshot:
+        """Página já serializada (com ETag), servida do cache de dados de referência"""
+        async def load() -> bytes:
+            return dump_json(await self.get_universidades_page(limit, cursor))
+        return await reference_cache.get_or_load(self.repository.table, (clamp_limit(limit), cursor), load)
     
     async def get_universidade_by_id(self, universidade_id: int) -> Optional[Universidade]:
         universidade = await self.repository.get_by_id(universidade_id)
-        return Universidade.from_orm(universidade) if universidade else None
+        return Universidade.model_validate(universidade) if universidade else None
     
     async def create_universidade(self, universidade_data: UniversidadeCreate) -> Universidade:
         universidade = await self.repository.create(universidade_data)
-        return Universidade.from_orm(universidade)
+        return Universidade.model_validate(universidade)
     
     async def update_universidade(self, universidade_id: int, universidade_data: UniversidadeUpdate) -> Optional[Universidade]:
         universidade = await self.repository.update(universidade_id, universidade_data)
-        return Universidade.from_orm(universidade) if universidade else None
+        return Universidade.model_validate(universidade) if universidade else None
     
     async def delete_universidade(self, universidade_id: int) -> bool:
         return await self.repository.delete(universidade_id)
@@ -43,19 +58,29 @@ class UnidadeService:
     
     async def get_all_unidades(self) -> List[Unidade]:
         unidades = await self.repository.get_all()
-        return [Unidade.from_orm(u) for u in unidades]
+        return validate_list(Unidade, unidades)
+    
+    async def get_unidades_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page[Unidade]:
+        unidades, next_cursor = await self.repository.get_page(limit, cursor)
+        return Page[Unidade](items=validate_list(Unidade, unidades), next=next_cursor)
+    
+    async def get_unidades_page_snapshot(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Snapshot:
+        """Página já serializada (com ETag), servida do cache de dados de referência"""
+        async def load() -> bytes:
+            return dump_json(await self.get_unidades_page(limit, cursor))
+        return await reference_cache.get_or_load(self.repository.table, (clamp_limit(limit), cursor), load)
     
     async def get_unidade_by_id(self, unidade_id: int) -> Optional[Unidade]:
         unidade = await self.repository.get_by_id(unidade_id)
-        return Unidade.from_orm(unidade) if unidade else None
+        return Unidade.model_validate(unidade) if unidade else None
     
     async def create_unidade(self, unidade_data: UnidadeCreate) -> Unidade:
         unidade = await self.repository.create(unidade_data)
-        return Unidade.from_orm(unidade)
+        return Unidade.model_validate(unidade)
     
     async def update_unidade(self, unidade_id: int, unidade_data: UnidadeUpdate) -> Optional[Unidade]:
         unidade = await self.repository.update(unidade_id, unidade_data)
-        return Unidade.from_orm(unidade) if unidade else None
+        return Unidade.model_validate(unidade) if unidade else None
     
     async def delete_unidade(self, unidade_id: int) -> bool:
         return await self.repository.delete(unidade_id)
@@ -67,19 +92,29 @@ class CursoService:
     
     async def get_all_cursos(self) -> List[Curso]:
         cursos = await self.repository.get_all()
-        return [Curso.from_orm(c) for c in cursos]
+        return validate_list(Curso, cursos)
+    
+    async def get_cursos_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page[Curso]:
+        cursos, next_cursor = await self.repository.get_page(limit, cursor)
+        return Page[Curso](items=validate_list(Curso, cursos), next=next_cursor)
+    
+    async def get_cursos_page_snapshot(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Snapshot:
+        """Página já serializada (com ETag), servida do cache de dados de referência"""
+        async def load() -> bytes:
+            return dump_json(await self.get_cursos_page(limit, cursor))
+        return await reference_cache.get_or_load(self.repository.table, (clamp_limit(limit), cursor), load)
     
     async def get_curso_by_id(self, curso_id: int) -> Optional[Curso]:
         curso = await self.repository.get_by_id(curso_id)
-        return Curso.from_orm(curso) if curso else None
+        return Curso.model_validate(curso) if curso else None
     
     async def create_curso(self, curso_data: CursoCreate) -> Curso:
         curso = await self.repository.create(curso_data)
-        return Curso.from_orm(curso)
+        return Curso.model_validate(curso)
     
     async def update_curso(self, curso_id: int, curso_data: CursoUpdate) -> Optional[Curso]:
         curso = await self.repository.update(curso_id, curso_data)
-        return Curso.from_orm(curso) if curso else None
+        return Curso.model_validate(curso) if curso else None
     
     async def delete_curso(self, curso_id: int) -> bool:
         return await self.repository.delete(curso_id)
@@ -91,19 +126,29 @@ class TurmaService:
     
     async def get_all_turmas(self) -> List[Turma]:
         turmas = await self.repository.get_all()
-        return [Turma.from_orm(t) for t in turmas]
+        return validate_list(Turma, turmas)
+    
+    async def get_turmas_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page[Turma]:
+        turmas, next_cursor = await self.repository.get_page(limit, cursor)
+        return Page[Turma](items=validate_list(Turma, turmas), next=next_cursor)
+    
+    async def get_turmas_page_snapshot(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Snapshot:
+        """Página já serializada (com ETag), servida do cache de dados de referência"""
+        async def load() -> bytes:
+            return dump_json(await self.get_turmas_page(limit, cursor))
+        return await reference_cache.get_or_load(self.repository.table, (clamp_limit(limit), cursor), load)
     
     async def get_turma_by_id(self, turma_id: int) -> Optional[Turma]:
         turma = await self.repository.get_by_id(turma_id)
-        return Turma.from_orm(turma) if turma else None
+        return Turma.model_validate(turma) if turma else None
     
     async def create_turma(self, turma_data: TurmaCreate) -> Turma:
         turma = await self.repository.create(turma_data)
-        return Turma.from_orm(turma)
+        return Turma.model_validate(turma)
     
     async def update_turma(self, turma_id: int, turma_data: TurmaUpdate) -> Optional[Turma]:
         turma = await self.repository.update(turma_id, turma_data)
-        return Turma.from_orm(turma) if turma else None
+        return Turma.model_validate(turma) if turma else None
     
     async def delete_turma(self, turma_id: int) -> bool:
         return await self.repository.delete(turma_id)
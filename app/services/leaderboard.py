@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.core.leaderboard import leaderboard
+from app.db.session import AsyncPrimaryReadSessionLocal
+from app.repositories.pagination import clamp_limit
+from app.repositories.rollup import ResumoDiarioRepository
+from app.schemas.statistics import Dimensao, PosicaoRanking, Ranking, RankingTurma
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_leaderboard() -> None:
+    """Recarrega o ranking em memória a partir do resumo diário, lido do
+    primário: numa réplica atrasada o snapshot não corresponderia ao número
+    de sequência dos eventos já aplicados"""
+    async with AsyncPrimaryReadSessionLocal() as db:
+        desde = leaderboard.begin_refresh()
+        try:
+            sequencia, rows = await ResumoDiarioRepository(db).turma_totals()
+            leaderboard.load(rows, sequencia, desde)
+        finally:
+            leaderboard.end_refresh()
+
+
+async def refresh_leaderboard_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_leaderboard()
+        except Exception:
+            logger.exception("Leaderboard refresh failed")
+
+
+class RankingService:
+    """Leituras do ranking de turmas; não consultam o banco"""
+    
+    def get_ranking(
+        self,
+        escopo: str = "geral",
+        escopo_id: Optional[int] = None,
+        periodo: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Ranking:
+        if escopo == "geral":
+            escopo_id = None
+        elif escopo_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"escopo_id is required for escopo={escopo}"
+            )
+        items = []
+        for posicao, turma_id, kg in leaderboard.top(escopo, escopo_id, periodo, clamp_limit(limit)):
+            items.append(PosicaoRanking(
+                posicao=posicao,
+                turma=Dimensao(id=turma_id, nome=leaderboard.turma(turma_id).nome),
+                total_kg=kg
+            ))
+        return Ranking(escopo=escopo, escopo_id=escopo_id, periodo=periodo, items=items)
+    
+    def get_ranking_turma(
+        self,
+        turma_id: int,
+        escopo: str = "geral",
+        periodo: Optional[str] = None
+    ) -> RankingTurma:
+        ranked = leaderboard.rank(turma_id, escopo, periodo)
+        if ranked is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Turma not in ranking"
+            )
+        posicao, kg, turmas = ranked
+        info = leaderboard.turma(turma_id)
+        return RankingTurma(
+            posicao=posicao,
+            turma=Dimensao(id=turma_id, nome=info.nome),
+            total_kg=kg,
+            escopo=escopo,
+            escopo_id={"geral": None, "universidade": info.universidade_id, "unidade": info.unidade_id}[escopo],
+            periodo=periodo,
+            turmas=turmas
+        )
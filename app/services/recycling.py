@@ -1,6 +1,10 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Hashable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.repositories.loading import parse_include
 from app.repositories.recycling import (
     TipoResiduoRepository, PontoColetaRepository,
     PedidoDoacaoRepository, LancamentoResiduoRepository
@@ -11,6 +15,28 @@ from app.schemas.recycling import (
     PedidoDoacao, PedidoDoacaoCreate, PedidoDoacaoUpdate,
     LancamentoResiduo, LancamentoResiduoCreate, LancamentoResiduoUpdate
 )
+from app.core.cache import detail_cache, reference_cache
+from app.core.responses import Snapshot, dump_json
+from app.repositories.pagination import clamp_limit
+from app.schemas.base import validate_list
+from app.schemas.pagination import Page
+from app.services.export import ENCODERS
+
+
+async def _detail_snapshot(
+    tables: Tuple[str, ...],
+    key: Hashable,
+    load: Callable[[], Awaitable[Optional[BaseModel]]],
+    not_found: str
+) -> Snapshot:
+    """Detalhe já serializado (com ETag), servido do cache de detalhes: um
+    If-None-Match que bate com o snapshot dispensa a consulta"""
+    async def dump() -> bytes:
+        item = await load()
+        if item is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found)
+        return dump_json(item)
+    return await detail_cache.get_or_load(tables, key, dump)
 
 
 class TipoResiduoService:
@@ -19,19 +45,29 @@ class TipoResiduoService:
     
     async def get_all_tipos_residuo(self) -> List[TipoResiduo]:
         tipos = await self.repository.get_all()
-        return [TipoResiduo.from_orm(t) for t in tipos]
+        return validate_list(TipoResiduo, tipos)
+    
+    async def get_tipos_residuo_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page[TipoResiduo]:
+        tipos, next_cursor = await self.repository.get_page(limit, cursor)
+        return Page[TipoResiduo](items=validate_list(TipoResiduo, tipos), next=next_cursor)
+    
+    async def get_tipos_residuo_page_snapshot(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Snapshot:
+        """Página já serializada (com ETag), servida do cache de dados de referência"""
+        async def load() -> bytes:
+            return dump_json(await self.get_tipos_residuo_page(limit, cursor))
+        return await reference_cache.get_or_load(self.repository.table, (clamp_limit(limit), cursor), load)
     
     async def get_tipo_residuo_by_id(self, tipo_id: int) -> Optional[TipoResiduo]:
         tipo = await self.repository.get_by_id(tipo_id)
-        return TipoResiduo.from_orm(tipo) if tipo else None
+        return TipoResiduo.model_validate(tipo) if tipo else None
     
     async def create_tipo_residuo(self, tipo_data: TipoResiduoCreate) -> TipoResiduo:
         tipo = await self.repository.create(tipo_data)
-        return TipoResiduo.from_orm(tipo)
+        return TipoResiduo.model_validate(tipo)
     
     async def update_tipo_residuo(self, tipo_id: int, tipo_data: TipoResiduoUpdate) -> Optional[TipoResiduo]:
         tipo = await self.repository.update(tipo_id, tipo_data)
-        return TipoResiduo.from_orm(tipo) if tipo else None
+        return TipoResiduo.model_validate(tipo) if tipo else None
     
     async def delete_tipo_residuo(self, tipo_id: int) -> bool:
         return await self.repository.delete(tipo_id)
@@ -41,21 +77,39 @@ class PontoColetaService:
     def __init__(self, db: AsyncSession):
         self.repository = PontoColetaRepository(db)
     
-    async def get_all_pontos_coleta(self) -> List[PontoColeta]:
-        pontos = await self.repository.get_all()
-        return [PontoColeta.from_orm(p) for p in pontos]
-    
-    async def get_ponto_coleta_by_id(self, ponto_id: int) -> Optional[PontoColeta]:
-        ponto = await self.repository.get_by_id(ponto_id)
-        return PontoColeta.from_orm(ponto) if ponto else None
+    async def get_all_pontos_coleta(self, include: Optional[str] = None) -> List[PontoColeta]:
+        pontos = await self.repository.get_all(parse_include(include))
+        return validate_list(PontoColeta, pontos)
+    
+    async def get_pontos_coleta_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include: Optional[str] = None
+    ) -> Page[PontoColeta]:
+        pontos, next_cursor = await self.repository.get_page(limit, cursor, parse_include(include))
+        return Page[PontoColeta](items=validate_list(PontoColeta, pontos), next=next_cursor)
+    
+    async def get_ponto_coleta_by_id(self, ponto_id: int, include: Optional[str] = None) -> Optional[PontoColeta]:
+        ponto = await self.repository.get_by_id(ponto_id, parse_include(include))
+        return PontoColeta.model_validate(ponto) if ponto else None
+    
+    async def get_ponto_coleta_snapshot(self, ponto_id: int, include: Optional[str] = None) -> Snapshot:
+        names = parse_include(include)
+        return await _detail_snapshot(
+            self.repository.tables(names),
+            (ponto_id, tuple(names)),
+            lambda: self.get_ponto_coleta_by_id(ponto_id, include),
+            "Ponto não encontrado"
+        )
     
     async def create_ponto_coleta(self, ponto_data: PontoColetaCreate) -> PontoColeta:
         ponto = await self.repository.create(ponto_data)
-        return PontoColeta.from_orm(ponto)
+        return PontoColeta.model_validate(ponto)
     
     async def update_ponto_coleta(self, ponto_id: int, ponto_data: PontoColetaUpdate) -> Optional[PontoColeta]:
         ponto = await self.repository.update(ponto_id, ponto_data)
-        return PontoColeta.from_orm(ponto) if ponto else None
+        return PontoColeta.model_validate(ponto) if ponto else None
     
     async def delete_ponto_coleta(self, ponto_id: int) -> bool:
         return await self.repository.delete(ponto_id)
@@ -65,23 +119,48 @@ class PedidoDoacaoService:
     def __init__(self, db: AsyncSession):
         self.repository = PedidoDoacaoRepository(db)
     
-    async def get_all_pedidos_doacao(self) -> List[PedidoDoacao]:
-        pedidos = await self.repository.get_all()
-        return [PedidoDoacao.from_orm(p) for p in pedidos]
-    
-    async def get_pedido_doacao_by_id(self, pedido_id: int) -> Optional[PedidoDoacao]:
-        pedido = await self.repository.get_by_id(pedido_id)
-        return PedidoDoacao.from_orm(pedido) if pedido else None
+    async def get_all_pedidos_doacao(self, include: Optional[str] = None) -> List[PedidoDoacao]:
+        pedidos = await self.repository.get_all(parse_include(include))
+        return validate_list(PedidoDoacao, pedidos)
+    
+    async def get_pedidos_doacao_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include: Optional[str] = None
+    ) -> Page[PedidoDoacao]:
+        pedidos, next_cursor = await self.repository.get_page(limit, cursor, parse_include(include))
+        return Page[PedidoDoacao](items=validate_list(PedidoDoacao, pedidos), next=next_cursor)
+    
+    async def get_pedido_doacao_by_id(self, pedido_id: int, include: Optional[str] = None) -> Optional[PedidoDoacao]:
+        pedido = await self.repository.get_by_id(pedido_id, parse_include(include))
+        return PedidoDoacao.model_validate(pedido) if pedido else None
+    
+    async def get_pedido_doacao_snapshot(self, pedido_id: int, include: Optional[str] = None) -> Snapshot:
+        names = parse_include(include)
+        return await _detail_snapshot(
+            self.repository.tables(names),
+            (pedido_id, tuple(names)),
+            lambda: self.get_pedido_doacao_by_id(pedido_id, include),
+            "Pedido não encontrado"
+        )
     
     async def create_pedido_doacao(self, pedido_data: PedidoDoacaoCreate, criado_por_id: int) -> PedidoDoacao:
         pedido = await self.repository.create(pedido_data, criado_por_id)
-        return PedidoDoacao.from_orm(pedido)
+        return PedidoDoacao.model_validate(pedido)
     
     async def update_pedido_doacao(self, pedido_id: int, pedido_data: PedidoDoacaoUpdate) -> Optional[PedidoDoacao]:
         pedido = await self.repository.update(pedido_id, pedido_data)
-        return PedidoDoacao.from_orm(pedido) if pedido else None
+        return PedidoDoacao.model_validate(pedido) if pedido else None
     
     async def delete_pedido_doacao(self, pedido_id: int) -> bool:
+        # Sem cascade para o lançamento: no SQLite ele ficaria órfão (ainda somado no
+        # resumo e no ranking) e nos demais bancos a chave estrangeira falharia
+        if await self.repository.has_lancamento(pedido_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Pedido has a lancamento; delete the lancamento first"
+            )
         return await self.repository.delete(pedido_id)
 
 
@@ -89,21 +168,54 @@ class LancamentoResiduoService:
     def __init__(self, db: AsyncSession):
         self.repository = LancamentoResiduoRepository(db)
     
-    async def get_all_lancamentos_residuo(self) -> List[LancamentoResiduo]:
-        lancamentos = await self.repository.get_all()
-        return [LancamentoResiduo.from_orm(lancamento) for lancamento in lancamentos]
-    
-    async def get_lancamento_residuo_by_id(self, lancamento_id: int) -> Optional[LancamentoResiduo]:
-        lancamento = await self.repository.get_by_id(lancamento_id)
-        return LancamentoResiduo.from_orm(lancamento) if lancamento else None
+    async def get_all_lancamentos_residuo(self, include: Optional[str] = None) -> List[LancamentoResiduo]:
+        lancamentos = await self.repository.get_all(parse_include(include))
+        return validate_list(LancamentoResiduo, lancamentos)
+    
+    async def get_lancamentos_residuo_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include: Optional[str] = None
+    ) -> Page[LancamentoResiduo]:
+        lancamentos, next_cursor = await self.repository.get_page(limit, cursor, parse_include(include))
+        return Page[LancamentoResiduo](items=validate_list(LancamentoResiduo, lancamentos), next=next_cursor)
+    
+    async def get_lancamento_residuo_by_id(self, lancamento_id: int, include: Optional[str] = None) -> Optional[LancamentoResiduo]:
+        lancamento = await self.repository.get_by_id(lancamento_id, parse_include(include))
+        return LancamentoResiduo.model_validate(lancamento) if lancamento else None
+    
+    async def get_lancamento_residuo_snapshot(self, lancamento_id: int, include: Optional[str] = None) -> Snapshot:
+        names = parse_include(include)
+        return await _detail_snapshot(
+            self.repository.tables(names),
+            (lancamento_id, tuple(names)),
+            lambda: self.get_lancamento_residuo_by_id(lancamento_id, include),
+            "Lançamento não encontrado"
+        )
     
     async def create_lancamento_residuo(self, lancamento_data: LancamentoResiduoCreate) -> LancamentoResiduo:
         lancamento = await self.repository.create(lancamento_data)
-        return LancamentoResiduo.from_orm(lancamento)
+        return LancamentoResiduo.model_validate(lancamento)
     
     async def update_lancamento_residuo(self, lancamento_id: int, lancamento_data: LancamentoResiduoUpdate) -> Optional[LancamentoResiduo]:
         lancamento = await self.repository.update(lancamento_id, lancamento_data)
-        return LancamentoResiduo.from_orm(lancamento) if lancamento else None
+        return LancamentoResiduo.model_validate(lancamento) if lancamento else None
     
     async def delete_lancamento_residuo(self, lancamento_id: int) -> bool:
         return await self.repository.delete(lancamento_id)
+    
+    def export_lancamentos_residuo(
+        self,
+        format: str,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        ponto_coleta_id: Optional[int] = None,
+        tipo_residuo_id: Optional[int] = None,
+        universidade_id: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        stmt = self.repository.export_statement(
+            data_inicio, data_fim, ponto_coleta_id, tipo_residuo_id, universidade_id
+        )
+        columns = list(stmt.selected_columns.keys())
+        return ENCODERS[format](columns, self.repository.stream(stmt))
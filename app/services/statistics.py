@@ -0,0 +1,218 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.loading import parse_include
+from app.repositories.statistics import EstatisticasRepository, validate_dimensions
+from app.core.config import settings
+from app.schemas.statistics import (
+    Dimensao, EstatisticaGrupo, Estatisticas, ResumoEstatisticas, ResumoGrupo,
+    PontoSerie, Serie, SerieTemporal
+)
+
+
+def _filters(**ids: Optional[int]) -> Dict[str, int]:
+    return {name.removesuffix("_id"): value for name, value in ids.items() if value is not None}
+
+
+def _as_date(value: Any) -> date:
+    # O início do período volta como date, datetime ou texto conforme o driver
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _truncate(dia: date, intervalo: str) -> date:
+    """O mesmo truncamento de ``bucket_expression``, em Python"""
+    if intervalo == "semana":
+        return dia - timedelta(days=dia.weekday())
+    if intervalo == "mes":
+        return dia.replace(day=1)
+    return dia
+
+
+def _index(inicio: date, origem: date, intervalo: str) -> int:
+    """Posição do período ``inicio`` contada a partir de ``origem``"""
+    if intervalo == "mes":
+        return (inicio.year - origem.year) * 12 + inicio.month - origem.month
+    return (inicio - origem).days // (7 if intervalo == "semana" else 1)
+
+
+def _shift(origem: date, periodos: int, intervalo: str) -> date:
+    if intervalo == "mes":
+        meses = origem.month - 1 + periodos
+        return date(origem.year + meses // 12, meses % 12 + 1, 1)
+    return origem + timedelta(days=periodos * (7 if intervalo == "semana" else 1))
+
+
+class EstatisticasService:
+    def __init__(self, db: AsyncSession):
+        self.repository = EstatisticasRepository(db)
+    
+    async def get_estatisticas(
+        self,
+        group_by: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        universidade_id: Optional[int] = None,
+        unidade_id: Optional[int] = None,
+        curso_id: Optional[int] = None,
+        turma_id: Optional[int] = None,
+        ponto_coleta_id: Optional[int] = None,
+        tipo_residuo_id: Optional[int] = None
+    ) -> Estatisticas:
+        dimensions = validate_dimensions(parse_include(group_by))
+        rows = await self.repository.aggregate(
+            dimensions,
+            data_inicio,
+            data_fim,
+            _filters(
+                universidade_id=universidade_id, unidade_id=unidade_id, curso_id=curso_id,
+                turma_id=turma_id, ponto_coleta_id=ponto_coleta_id, tipo_residuo_id=tipo_residuo_id
+            )
+        )
+        return Estatisticas(
+            group_by=dimensions,
+            items=[
+                EstatisticaGrupo(
+                    grupo={name: Dimensao(id=row[name], nome=row[f"{name}_nome"]) for name in dimensions},
+                    total_kg=row["total_kg"],
+                    lancamentos=row["lancamentos"],
+                    alunos=row["alunos"]
+                )
+                for row in rows
+            ]
+        )
+    
+    async def get_resumo(
+        self,
+        group_by: Optional[str] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None,
+        universidade_id: Optional[int] = None,
+        unidade_id: Optional[int] = None,
+        curso_id: Optional[int] = None,
+        turma_id: Optional[int] = None,
+        ponto_coleta_id: Optional[int] = None,
+        tipo_residuo_id: Optional[int] = None
+    ) -> ResumoEstatisticas:
+        dimensions = validate_dimensions(parse_include(group_by))
+        rows = await self.repository.aggregate_resumo(
+            dimensions,
+            data_inicio,
+            data_fim,
+            _filters(
+                universidade_id=universidade_id, unidade_id=unidade_id, curso_id=curso_id,
+                turma_id=turma_id, ponto_coleta_id=ponto_coleta_id, tipo_residuo_id=tipo_residuo_id
+            )
+        )
+        return ResumoEstatisticas(
+            group_by=dimensions,
+            items=[
+                ResumoGrupo(
+                    grupo={name: Dimensao(id=row[name], nome=row[f"{name}_nome"]) for name in dimensions},
+                    total_kg=row["total_kg"],
+                    lancamentos=row["lancamentos"]
+                )
+                for row in rows
+            ]
+        )
+    
+    async def get_serie(
+        self,
+        intervalo: str = "dia",
+        group_by: Optional[str] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None,
+        max_pontos: Optional[int] = None,
+        universidade_id: Optional[int] = None,
+        unidade_id: Optional[int] = None,
+        curso_id: Optional[int] = None,
+        turma_id: Optional[int] = None,
+        ponto_coleta_id: Optional[int] = None,
+        tipo_residuo_id: Optional[int] = None
+    ) -> SerieTemporal:
+        """Série de kg por período, lida do resumo diário.
+        
+        Períodos sem lançamentos entram com zero, no intervalo pedido (ou entre
+        o primeiro e o último período com dados). Se houver mais períodos que
+        ``max_pontos``, cada ponto soma ``k`` períodos consecutivos, mantendo o
+        total da série; o mesmo limite vale para a soma dos pontos de todas as
+        séries.
+        """
+        dimensions = validate_dimensions(parse_include(group_by))
+        rows = await self.repository.aggregate_resumo(
+            dimensions,
+            data_inicio,
+            data_fim,
+            _filters(
+                universidade_id=universidade_id, unidade_id=unidade_id, curso_id=curso_id,
+                turma_id=turma_id, ponto_coleta_id=ponto_coleta_id, tipo_residuo_id=tipo_residuo_id
+            ),
+            intervalo
+        )
+        for row in rows:
+            row["inicio"] = _as_date(row["inicio"])
+        
+        inicios = [row["inicio"] for row in rows]
+        primeiro = _truncate(data_inicio, intervalo) if data_inicio else min(inicios, default=None)
+        ultimo = _truncate(data_fim - timedelta(days=1), intervalo) if data_fim else max(inicios, default=None)
+        if primeiro is None or ultimo is None or ultimo < primeiro:
+            return SerieTemporal(intervalo=intervalo, periodos_por_ponto=1, group_by=dimensions, series=[])
+        
+        periodos = _index(ultimo, primeiro, intervalo) + 1
+        limite = min(max_pontos or settings.timeseries_max_points, settings.timeseries_max_points)
+        por_ponto = -(-periodos // max(limite, 1))
+        pontos = -(-periodos // por_ponto)
+        
+        # Pontos esparsos por grupo (índice -> [kg, lançamentos]); só as séries
+        # devolvidas são preenchidas com zeros
+        series: Dict[Tuple[int, ...], Tuple[Dict[str, Dimensao], Dict[int, List[Any]]]] = {}
+        for row in rows:
+            key = tuple(row[name] for name in dimensions)
+            if key not in series:
+                series[key] = ({name: Dimensao(id=row[name], nome=row[f"{name}_nome"]) for name in dimensions}, {})
+            valores = series[key][1].setdefault(
+                _index(row["inicio"], primeiro, intervalo) // por_ponto, [Decimal("0.00"), 0]
+            )
+            valores[0] += row["total_kg"]
+            valores[1] += row["lancamentos"]
+        if not dimensions and not series:
+            series[()] = ({}, {})
+        
+        # O limite vale para o total de pontos da resposta: com mais grupos que
+        # cabem nele, ficam os de mais kg e os demais somam uma série "outros"
+        grupos = list(series.values())
+        outros = None
+        max_series = max(limite // pontos, 1)
+        if len(grupos) > max_series:
+            ranked = sorted(range(len(grupos)), key=lambda i: -sum(kg for kg, _ in grupos[i][1].values()))
+            mantidos = set(ranked[:max_series - 1])
+            outros = {}
+            for i, (_, valores) in enumerate(grupos):
+                if i not in mantidos:
+                    for ponto, (kg, count) in valores.items():
+                        soma = outros.setdefault(ponto, [Decimal("0.00"), 0])
+                        soma[0] += kg
+                        soma[1] += count
+            grupos = [grupo for i, grupo in enumerate(grupos) if i in mantidos]
+        
+        def pontos_de(valores: Dict[int, List[Any]]) -> List[PontoSerie]:
+            vazio = (Decimal("0.00"), 0)
+            return [
+                PontoSerie(inicio=_shift(primeiro, i * por_ponto, intervalo), total_kg=kg, lancamentos=count)
+                for i, (kg, count) in ((i, valores.get(i, vazio)) for i in range(pontos))
+            ]
+        
+        resultado = [Serie(grupo=grupo, pontos=pontos_de(valores)) for grupo, valores in grupos]
+        if outros is not None:
+            resultado.append(Serie(grupo={}, pontos=pontos_de(outros), outros=True))
+        return SerieTemporal(
+            intervalo=intervalo,
+            periodos_por_ponto=por_ponto,
+            group_by=dimensions,
+            series=resultado
+        )
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark da serialização de listagens grandes de lançamentos
+
+Compara o caminho anterior (entidades ORM, um ``model_validate`` por linha,
+revalidação contra o ``response_model`` e ``json.dumps``) com o caminho
+rápido (SELECT de colunas, ``TypeAdapter`` em cache e orjson) para respostas
+de 1k, 10k e 100k linhas.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.responses import model_response
+from app.db.base import Base
+from app.db.models.institutional import Universidade, Unidade, Curso, Turma
+from app.db.models.recycling import TipoResiduo, PontoColeta, PedidoDoacao, LancamentoResiduo
+from app.repositories.recycling import LancamentoResiduoRepository
+from app.schemas.base import validate_list
+from app.schemas.pagination import Page
+from app.schemas.recycling import LancamentoResiduo as LancamentoSchema
+
+SIZES = (1_000, 10_000, 100_000)
+REPEAT = 3
+
+
+async def seed(session: AsyncSession, size: int) -> None:
+    """Cria ``size`` lançamentos via INSERT em lote"""
+    await session.execute(insert(Universidade).values(id=1, nome="Universidade"))
+    await session.execute(insert(Unidade).values(id=1, nome="Unidade", universidade_id=1))
+    await session.execute(insert(Curso).values(id=1, nome="Curso", universidade_id=1, unidade_id=1))
+    await session.execute(insert(Turma).values(id=1, nome="Turma", curso_id=1, unidade_id=1, universidade_id=1))
+    await session.execute(insert(PontoColeta).values(id=1, nome="Ponto", universidade_id=1, unidade_id=1))
+    await session.execute(insert(TipoResiduo).values(id=1, nome="Papel"))
+    await session.execute(insert(PedidoDoacao), [
+        {"id": i, "codigo": f"P{i}", "turma_id": 1} for i in range(1, size + 1)
+    ])
+    start = datetime(2024, 1, 1)
+    await session.execute(insert(LancamentoResiduo), [
+        {
+            "pedido_id": i,
+            "ponto_coleta_id": 1,
+            "tipo_residuo_id": 1,
+            "peso_kg": Decimal("1.25"),
+            "data": start + timedelta(minutes=i),
+        }
+        for i in range(1, size + 1)
+    ])
+    await session.commit()
+
+
+async def legacy(session: AsyncSession, size: int) -> bytes:
+    result = await session.execute(
+        select(LancamentoResiduo).order_by(LancamentoResiduo.data.desc(), LancamentoResiduo.id.desc()).limit(size + 1)
+    )
+    page = Page[LancamentoSchema](
+        items=[LancamentoSchema.model_validate(item) for item in result.scalars().all()[:size]]
+    )
+    # O que o FastAPI faz com o retorno: valida contra o response_model e codifica
+    validated = TypeAdapter(Page[LancamentoSchema]).validate_python(page)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def fast(session: AsyncSession, size: int) -> bytes:
+    items, next_cursor = await LancamentoResiduoRepository(session).get_page(limit=size)
+    page = Page[LancamentoSchema](items=validate_list(LancamentoSchema, items), next=next_cursor)
+    return model_response(page).body
+
+
+async def bench(label: str, func, session_factory, size: int) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        async with session_factory() as session:
+            start = time.perf_counter()
+            body = await func(session, size)
+            timings.append(time.perf_counter() - start)
+    best = min(timings) * 1000
+    print(f"  {label:<8} {best:10.1f} ms  ({len(body) / 1024:,.0f} KiB)")
+    return best
+
+
+async def run() -> None:
+    for size in SIZES:
+        settings.page_max_limit = size
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_factory() as session:
+            await seed(session, size)
+
+        print(f"{size:,} linhas")
+        before = await bench("anterior", legacy, session_factory, size)
+        after = await bench("rápido", fast, session_factory, size)
+        print(f"  ganho: {before / after:.1f}x")
+        await engine.dispose()
+
+
+def main():
+    """Função principal"""
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
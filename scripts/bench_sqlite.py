@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark de requisições/s no SQLite com e sem o perfil de produção (WAL)
+
+Cada modo roda em um subprocesso com um banco em arquivo novo, pois as
+configurações do engine são lidas na importação de app.db.session.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REQUESTS = 2000
+CONCURRENCY = 50
+WRITE_EVERY = 5  # 1 escrita a cada 5 requisições
+
+
+async def run_workload():
+    """Executa a carga mista de leituras e escritas contra a aplicação"""
+    from httpx import AsyncClient, ASGITransport
+
+    from app.main import app, lifespan
+    from app.db.session import AsyncSessionLocal
+    from app.db.models.user import User
+    from app.core.security import create_access_token, get_password_hash
+
+    async with lifespan(app):
+        async with AsyncSessionLocal() as db:
+            admin = User(
+                username="bench",
+                email="bench@example.com",
+                hashed_password=get_password_hash("bench"),
+                perfil="ADMIN_UNI"
+            )
+            db.add(admin)
+            await db.commit()
+            token = create_access_token(data={"sub": admin.username, "user_id": admin.id})
+
+        headers = {"Authorization": f"Bearer {token}"}
+        counter = iter(range(REQUESTS))
+        statuses = {}
+
+        async def worker(client: AsyncClient):
+            for i in counter:
+                if i % WRITE_EVERY == 0:
+                    response = await client.post(
+                        "/api/v1/recycling/tipo-residuo/", json={"nome": f"Tipo {i}"}, headers=headers
+                    )
+                else:
+                    response = await client.get("/api/v1/recycling/tipo-residuo/", headers=headers)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        transport = ASGITransport(app=app, raise_app_exceptions=False)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(CONCURRENCY)))
+            elapsed = time.perf_counter() - start
+
+    print(f"{REQUESTS / elapsed:.1f} req/s  status={statuses}")
+
+
+def main():
+    """Função principal"""
+    if os.environ.get("BENCH_CHILD"):
+        asyncio.run(run_workload())
+        return
+
+    root = Path(__file__).parent.parent
+    for profile in ("False", "True"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                BENCH_CHILD="1",
+                PYTHONPATH=str(root),
+                DATABASE_URL=f"sqlite:///{tmp}/bench.db",
+                SQLITE_PROFILE=profile,
+                DEBUG="False",
+                ENVIRONMENT="development",
+            )
+            print(f"SQLITE_PROFILE={profile}: ", end="", flush=True)
+            subprocess.run([sys.executable, __file__], env=env, cwd=tmp, check=True)
+
+
+if __name__ == "__main__":
+    main()
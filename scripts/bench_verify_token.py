@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark do verify_token com e sem o cache de payloads decodificados
+"""
+import timeit
+
+from app.core.cache import token_cache
+from app.core.security import create_access_token, verify_token
+
+ITERATIONS = 20000
+
+
+def bench(label: str, func) -> float:
+    seconds = min(timeit.repeat(func, number=ITERATIONS, repeat=5))
+    per_call_us = seconds / ITERATIONS * 1_000_000
+    print(f"{label:<24} {per_call_us:8.2f} µs/requisição")
+    return per_call_us
+
+
+def main():
+    """Função principal"""
+    token = create_access_token(data={"sub": "bench", "user_id": 1})
+
+    def uncached():
+        token_cache.clear()
+        verify_token(token, "access")
+
+    def cached():
+        verify_token(token, "access")
+
+    before = bench("sem cache", uncached)
+    verify_token(token, "access")
+    after = bench("com cache", cached)
+    print(f"ganho: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
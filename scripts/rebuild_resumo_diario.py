@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Recalcula a tabela resumo_diario_residuo a partir dos lançamentos
+
+Uso: PYTHONPATH=. python scripts/rebuild_resumo_diario.py [--desde AAAA-MM-DD]
+
+Sem ``--desde`` o resumo inteiro é refeito; com ele, apenas os dias a partir
+da data informada. Tudo acontece em uma única transação.
+
+O ranking de turmas fica em memória nos workers da API e não é alcançado por
+este processo: ele passa a refletir o resumo recalculado na próxima recarga
+periódica (LEADERBOARD_REFRESH_SECONDS) ou, com a recarga desativada, após
+reiniciar a aplicação.
+"""
+import argparse
+import asyncio
+from datetime import date
+from typing import Optional
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, unit_of_work
+from app.repositories.rollup import ResumoDiarioRepository
+
+
+async def rebuild(desde: Optional[date]) -> None:
+    async with AsyncSessionLocal() as db:
+        async with unit_of_work(db):
+            linhas = await ResumoDiarioRepository(db).rebuild(desde)
+    print(f"Resumo diário recalculado: {linhas} linhas")
+    if settings.leaderboard_refresh_seconds > 0:
+        print(f"O ranking da API o recarrega em até {settings.leaderboard_refresh_seconds:g}s")
+    else:
+        print("Recarga do ranking desativada: reinicie a API para atualizá-lo")
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--desde", type=date.fromisoformat, help="primeiro dia a recalcular (AAAA-MM-DD)")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.desde))
+
+
+if __name__ == "__main__":
+    main()
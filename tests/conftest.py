@@ -1,31 +1,52 @@
 import pytest
 import asyncio
+import itertools
 from typing import AsyncGenerator
 from fastapi.testclient import TestClient
-from httpx import AsyncClient
+from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 from app.main import app
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import get_auth_db, get_db, get_read_db, unit_of_work
+from app.db.querystats import instrument_engine
 from app.core.config import settings
+from app.core.cache import detail_cache, reference_cache
+from app.core.leaderboard import leaderboard
+from app.core.security import create_access_token
+from app.services.auth import UserService
+from app.schemas.user import UserCreate
+from app.db.models.institutional import Universidade, Unidade, Curso, Turma
+from app.db.models.recycling import TipoResiduo, PontoColeta, PedidoDoacao, LancamentoResiduo
 
 # URL de teste - SQLite em memória
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 # Engine de teste
 test_engine = create_async_engine(TEST_DATABASE_URL, echo=True)
+instrument_engine(test_engine)
 TestingSessionLocal = async_sessionmaker(
     test_engine, class_=AsyncSession, expire_on_commit=False
 )
 
 
 async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with TestingSessionLocal() as session:
+        async with unit_of_work(session):
+            yield session
+
+
+async def override_get_read_db() -> AsyncGenerator[AsyncSession, None]:
     async with TestingSessionLocal() as session:
         yield session
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_read_db
+app.dependency_overrides[get_auth_db] = override_get_read_db
+
+# O banco em memória é compartilhado pela sessão de testes; valores únicos vêm daqui
+_sequence = itertools.count(1)
 
 
 @pytest.fixture(scope="session")
@@ -46,9 +67,22 @@ async def setup_test_db():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+def clear_reference_cache():
+    """Start every test with empty reference-data and detail caches"""
+    reference_cache.clear()
+    detail_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_leaderboard():
+    """Start every test with an empty turma leaderboard"""
+    leaderboard.clear()
+
+
 @pytest.fixture
 async def async_client() -> AsyncGenerator[AsyncClient, None]:
-    async with AsyncClient(app=app, base_url="http://test") as client:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
         yield client
 
 
@@ -59,5 +93,78 @@ def client() -> TestClient:
 
 @pytest.fixture
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     async with TestingSessionLocal() as session:
         yield session
+
+
+@pytest.fixture
+def auth_headers(db_session: AsyncSession):
+    """Create a user with the given perfil and return bearer headers for it"""
+    counter = {"n": 0}
+
+    async def factory(perfil: str = "ADMIN_UNI", **fields) -> dict:
+        counter["n"] += 1
+        username = f"{perfil.lower()}_{id(counter)}_{counter['n']}"
+        user = await UserService(db_session).create_user(UserCreate(
+            username=username,
+            email=f"{username}@example.com",
+            password="testpass123",
+            perfil=perfil,
+            **fields
+        ), perfil)
+        token = create_access_token(data={"sub": user.username, "user_id": user.id})
+        return {"Authorization": f"Bearer {token}"}
+
+    return factory
+
+
+@pytest.fixture
+def make_lancamentos(db_session: AsyncSession):
+    """Create a universidade/unidade/curso/turma, a ponto and a tipo, then one
+    pedido + lancamento per entry of ``pesos`` (optionally with fixed ``datas``)"""
+    async def factory(pesos, datas=None) -> dict:
+        tag = next(_sequence)
+        universidade = Universidade(nome=f"Universidade {tag}")
+        db_session.add(universidade)
+        await db_session.flush()
+        unidade = Unidade(nome=f"Unidade {tag}", universidade_id=universidade.id)
+        db_session.add(unidade)
+        await db_session.flush()
+        curso = Curso(nome=f"Curso {tag}", universidade_id=universidade.id, unidade_id=unidade.id)
+        db_session.add(curso)
+        await db_session.flush()
+        turma = Turma(nome=f"Turma {tag}", curso_id=curso.id, unidade_id=unidade.id, universidade_id=universidade.id)
+        ponto = PontoColeta(nome=f"Ponto {tag}", universidade_id=universidade.id, unidade_id=unidade.id)
+        tipo = TipoResiduo(nome=f"Tipo {tag}")
+        db_session.add_all([turma, ponto, tipo])
+        await db_session.flush()
+
+        lancamentos = []
+        for i, peso in enumerate(pesos):
+            pedido = PedidoDoacao(codigo=f"P{next(_sequence)}", turma_id=turma.id)
+            db_session.add(pedido)
+            await db_session.flush()
+            lancamento = LancamentoResiduo(
+                pedido_id=pedido.id,
+                ponto_coleta_id=ponto.id,
+                tipo_residuo_id=tipo.id,
+                peso_kg=peso,
+                **({"data": datas[i]} if datas else {})
+            )
+            db_session.add(lancamento)
+            lancamentos.append(lancamento)
+        await db_session.commit()
+
+        return {
+            "universidade": universidade,
+            "unidade": unidade,
+            "curso": curso,
+            "turma": turma,
+            "ponto": ponto,
+            "tipo": tipo,
+            "lancamentos": lancamentos,
+        }
+
+    return factory
@@ -1,9 +1,19 @@
+import asyncio
+import threading
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.auth import UserService
-from app.schemas.user import UserCreate
+from app.services.auth import AuthService, UserService
+from app.schemas.user import UserCreate, UserUpdate
+from app.core.hashing import PasswordHasher, password_hasher
+from app.core.cache import VersionedTTLCache, principal_cache, token_cache
+from app.core.config import settings
+from app.core.security import verify_token, create_access_token
+from datetime import timedelta
+from app.deps import get_current_user
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
 
 
 class TestAuth:
@@ -51,3 +61,288 @@ class TestAuth:
         
         with pytest.raises(Exception):  # Should raise HTTPException
             await service.create_user(user_data_duplicate, "ALUNO")
+    
+    @pytest.mark.asyncio
+    async def test_create_duplicate_email(self, db_session: AsyncSession):
+        """Test creating a user with duplicate email maps the unique violation"""
+        service = UserService(db_session)
+        owner = await service.create_user(UserCreate(
+            username="emailowner",
+            email="taken@example.com",
+            password="testpass123",
+            perfil="ALUNO"
+        ), "ALUNO")
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await service.create_user(UserCreate(
+                username="emailthief",
+                email="taken@example.com",
+                password="testpass123",
+                perfil="ALUNO"
+            ), "ALUNO")
+        
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.detail == "Email already registered"
+        
+        # Só o INSERT conflitante é desfeito; a transação continua utilizável
+        assert await service.get_user_by_id(owner.id) is not None
+        user = await service.create_user(UserCreate(
+            username="emailthief",
+            email="free@example.com",
+            password="testpass123",
+            perfil="ALUNO"
+        ), "ALUNO")
+        assert user.id is not None
+    
+    @pytest.mark.asyncio
+    async def test_authenticate_user(self, db_session: AsyncSession):
+        """Test authenticating with the hashed password"""
+        user_service = UserService(db_session)
+        user_data = UserCreate(
+            username="loginuser",
+            email="login@example.com",
+            password="testpass123",
+            perfil="ALUNO"
+        )
+        await user_service.create_user(user_data, "ALUNO")
+        
+        auth_service = AuthService(db_session)
+        
+        assert await auth_service.authenticate_user("loginuser", "testpass123") is not None
+        assert await auth_service.authenticate_user("loginuser", "wrongpass") is None
+    
+    @pytest.mark.asyncio
+    async def test_password_hasher_rejects_when_queue_is_full(self):
+        """Test the hashing pool rejects work beyond its queue limit"""
+        hasher = PasswordHasher(max_workers=1, queue_limit=0)
+        hasher._pending = 1
+        
+        with pytest.raises(Exception):  # Should raise HTTPException 503
+            await hasher.hash("testpass123")
+        
+        assert hasher.stats()["rejected"] == 1
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_password_hasher_counts_work_until_the_thread_finishes(self):
+        """Test failures are not completions and a cancelled caller does not free its slot early"""
+        hasher = PasswordHasher(max_workers=1, queue_limit=0)
+
+        def fail():
+            raise ValueError("bad hash")
+
+        with pytest.raises(ValueError):
+            await hasher._run(fail)
+        await asyncio.sleep(0)
+        assert (hasher.stats()["completed"], hasher._pending) == (0, 0)
+
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "hash"
+
+        task = asyncio.create_task(hasher._run(slow))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # A thread continua ocupada: o pool segue cheio
+        assert hasher._pending == 1
+        with pytest.raises(HTTPException):
+            await hasher.hash("testpass123")
+
+        release.set()
+        for _ in range(100):
+            if hasher._pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert (hasher.stats()["completed"], hasher._pending) == (1, 0)
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_principal_cache(self, db_session: AsyncSession, async_client: AsyncClient):
+        """Test authenticated principals are cached and invalidated on update"""
+        user_service = UserService(db_session)
+        user = await user_service.create_user(UserCreate(
+            username="cacheduser",
+            email="cached@example.com",
+            password="testpass123",
+            perfil="ALUNO"
+        ), "ALUNO")
+        tokens = await AuthService(db_session).create_tokens(user)
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        
+        response = await async_client.get("/api/v1/auth/me/", headers=headers)
+        assert response.status_code == 200
+        assert principal_cache.get(user.id) is not None
+        
+        hits = principal_cache.hits
+        response = await async_client.get("/api/v1/auth/me/", headers=headers)
+        assert response.status_code == 200
+        assert principal_cache.hits > hits
+        
+        await user_service.update_user(user.id, UserUpdate(is_active=False))
+        assert principal_cache.get(user.id) is None
+        
+        response = await async_client.get("/api/v1/auth/me/", headers=headers)
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_principal_cache_invalidated_on_commit(self, db_session: AsyncSession):
+        """Test a lookup that runs between the UPDATE and the commit cannot keep a stale principal"""
+        user_service = UserService(db_session)
+        user = await user_service.create_user(UserCreate(
+            username="racinguser",
+            email="racing@example.com",
+            password="testpass123",
+            perfil="ALUNO"
+        ), "ALUNO")
+        await db_session.commit()
+        user_id = user.id
+        token = (await AuthService(db_session).create_tokens(user))["access_token"]
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        stale = await get_current_user(db_session, credentials)
+
+        # Consulta concorrente que começou antes do UPDATE e termina depois dele
+        version = principal_cache.version(user_id)
+        await user_service.update_user(user_id, UserUpdate(is_active=False))
+        principal_cache.set_if_version(user_id, stale, version)
+        assert principal_cache.get(user_id) is None
+
+        # Consulta concorrente que leu a linha ainda não commitada como antiga
+        principal_cache.set(user_id, stale)
+        await db_session.commit()
+        assert principal_cache.get(user_id) is None
+
+        principal = await get_current_user(db_session, credentials)
+        assert principal.is_active is False
+
+    def test_versioned_cache_bounds_versions(self):
+        """Test invalidation versions stay within the cache size and an evicted key stays invalidated"""
+        cache = VersionedTTLCache(maxsize=2, ttl=60)
+        stale = cache.version("a")
+        cache.invalidate("a")
+        for key in range(10):
+            cache.invalidate(key)
+        assert len(cache._versions) == 2
+        
+        # A versão de "a" saiu do LRU, mas a leitura anterior à invalidação continua descartada
+        cache.set_if_version("a", "stale", stale)
+        assert cache.get("a") is None
+        cache.set_if_version("a", "fresh", cache.version("a"))
+        assert cache.get("a") == "fresh"
+    
+    @pytest.mark.asyncio
+    async def test_stateless_auth_claims(self, db_session: AsyncSession, monkeypatch):
+        """Test stateless mode authorizes from token claims without the database"""
+        monkeypatch.setattr(settings, "stateless_auth", True)
+        user_service = UserService(db_session)
+        user = await user_service.create_user(UserCreate(
+            username="statelessuser",
+            email="stateless@example.com",
+            password="testpass123",
+            perfil="CHEFE",
+            turma_id=7
+        ), "CHEFE")
+        
+        auth_service = AuthService(db_session)
+        tokens = await auth_service.create_tokens(user)
+        payload = verify_token(tokens["access_token"], "access")
+        assert payload["perfil"] == "CHEFE"
+        assert payload["turma_id"] == 7
+        
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=tokens["access_token"])
+        principal = await get_current_user(db=None, credentials=credentials)
+        assert principal.id == user.id
+        assert principal.perfil == "CHEFE"
+        
+        # Mudança de perfil só aparece após o refresh
+        await user_service.update_user(user.id, UserUpdate(perfil="COORD"))
+        refreshed = await auth_service.refresh_access_token(tokens["refresh_token"])
+        assert verify_token(refreshed["access_token"], "access")["perfil"] == "COORD"
+    
+    def test_token_cache_expires_with_token(self):
+        """Test verified token payloads are cached until the token expires"""
+        token = create_access_token(data={"sub": "cached", "user_id": 1})
+        hits = token_cache.hits
+        
+        assert verify_token(token, "access")["user_id"] == 1
+        assert verify_token(token, "access")["user_id"] == 1
+        assert token_cache.hits == hits + 1
+        
+        with pytest.raises(Exception):  # Cached payload still enforces the type
+            verify_token(token, "refresh")
+        
+        expired = create_access_token(data={"sub": "expired", "user_id": 2}, expires_delta=timedelta(seconds=-1))
+        with pytest.raises(Exception):
+            verify_token(expired, "access")
+    
+    @pytest.mark.asyncio
+    async def test_create_users_bulk(self, db_session: AsyncSession):
+        """Test bulk signup creates valid rows and reports conflicts per row"""
+        service = UserService(db_session)
+        await service.create_user(UserCreate(
+            username="bulkexisting",
+            email="bulkexisting@example.com",
+            password="testpass123",
+            perfil="ALUNO"
+        ), "ALUNO")
+        
+        users_data = [
+            UserCreate(username=f"bulk{i}", email=f"bulk{i}@example.com", password="testpass123", perfil="ALUNO")
+            for i in range(5)
+        ]
+        users_data.append(UserCreate(username="bulkexisting", email="other@example.com", password="x", perfil="ALUNO"))
+        users_data.append(UserCreate(username="bulk0", email="dup@example.com", password="x", perfil="ALUNO"))
+        
+        response = await service.create_users_bulk(users_data, "ALUNO")
+        
+        assert response.created == 5
+        assert response.failed == 2
+        assert [r.status for r in response.results] == ["created"] * 5 + ["error", "error"]
+        assert response.results[0].user.id is not None
+        assert response.results[0].user.perfil == "ALUNO"
+        assert response.results[5].detail == "Username already registered"
+        
+        auth_service = AuthService(db_session)
+        assert await auth_service.authenticate_user("bulk3", "testpass123") is not None
+
+    @pytest.mark.asyncio
+    async def test_create_users_bulk_concurrent_conflict(self, db_session: AsyncSession, monkeypatch):
+        """Test a signup that lands between the uniqueness check and the insert fails only its own row"""
+        service = UserService(db_session)
+        check = service.repository.get_existing_usernames_emails
+        
+        hashed = []
+        hash_password = password_hasher.hash
+        
+        async def counting_hash(password):
+            hashed.append(password)
+            return await hash_password(password)
+        
+        async def check_then_race(usernames, emails):
+            existing = await check(usernames, emails)
+            await UserService(db_session).create_user(UserCreate(
+                username="raced1", email="raced-other@example.com", password="racepass123", perfil="ALUNO"
+            ), "ALUNO")
+            return existing
+        
+        monkeypatch.setattr(password_hasher, "hash", counting_hash)
+        
+        monkeypatch.setattr(service.repository, "get_existing_usernames_emails", check_then_race)
+        users_data = [
+            UserCreate(username=f"raced{i}", email=f"raced{i}@example.com", password="testpass123", perfil="ALUNO")
+            for i in range(3)
+        ]
+        
+        response = await service.create_users_bulk(users_data, "ALUNO")
+        
+        assert (response.created, response.failed) == (2, 1)
+        assert [r.status for r in response.results] == ["created", "error", "created"]
+        assert response.results[1].detail == "Username already registered"
+        assert response.results[1].user is None
+        assert response.results[2].user.username == "raced2"
+        # O fallback reaproveita as senhas do lote: um bcrypt por linha, mais o concorrente
+        assert sorted(hashed) == ["racepass123"] + ["testpass123"] * 3
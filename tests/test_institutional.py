@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.institutional import UniversidadeService, UnidadeService
 from app.schemas.institutional import UniversidadeCreate, UnidadeCreate
+from app.db.querystats import collect_queries, query_budget
+from app.core.cache import ReferenceCache
 
 
 class TestInstitutional:
@@ -53,3 +55,81 @@ class TestInstitutional:
         assert unidade.id is not None
         assert unidade.nome == "Unidade Teste"
         assert unidade.universidade_id == universidade.id
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("url", [
+        "/api/v1/institutional/university/",
+        "/api/v1/institutional/unit/",
+        "/api/v1/institutional/course/",
+        "/api/v1/institutional/class/",
+    ])
+    async def test_list_routes_query_budget(self, async_client: AsyncClient, auth_headers, url):
+        """Test institutional list routes run one query for auth and one for the page"""
+        headers = await auth_headers("ADMIN_UNI")
+        
+        with query_budget(2):
+            response = await async_client.get(url, headers=headers)
+        
+        assert response.status_code == 200
+    
+    @pytest.mark.asyncio
+    async def test_delete_universidade_cascades_unidades(self, db_session: AsyncSession):
+        """Test deleting a university also deletes its units without loading them"""
+        uni_service = UniversidadeService(db_session)
+        unidade_service = UnidadeService(db_session)
+        universidade = await uni_service.create_universidade(UniversidadeCreate(nome="Universidade Cascata"))
+        unidade = await unidade_service.create_unidade(
+            UnidadeCreate(nome="Unidade Cascata", universidade_id=universidade.id)
+        )
+        
+        assert await uni_service.delete_universidade(universidade.id) is True
+        assert await unidade_service.get_unidade_by_id(unidade.id) is None
+        assert await uni_service.delete_universidade(universidade.id) is False
+    
+    @pytest.mark.asyncio
+    async def test_reference_list_cached_until_write(self, async_client: AsyncClient, auth_headers, db_session: AsyncSession):
+        """Test reference lists are served from cache without queries until a write (even a cascade) invalidates them"""
+        headers = await auth_headers("ADMIN_UNI")
+        universidade = await UniversidadeService(db_session).create_universidade(UniversidadeCreate(nome="Universidade Cache"))
+        unidade = await UnidadeService(db_session).create_unidade(
+            UnidadeCreate(nome="Unidade Cache", universidade_id=universidade.id)
+        )
+        url = "/api/v1/institutional/unit/?limit=500"
+        
+        with collect_queries() as miss:
+            first = await async_client.get(url, headers=headers)
+        with collect_queries() as hit:
+            second = await async_client.get(url, headers=headers)
+        
+        assert any("FROM unidades" in shape for shape in miss.shapes)
+        assert not any("FROM unidades" in shape for shape in hit.shapes)
+        assert second.content == first.content
+        assert unidade.id in [u["id"] for u in second.json()["items"]]
+        
+        # O DELETE em cascata também invalida a tabela de unidades
+        await UniversidadeService(db_session).delete_universidade(universidade.id)
+        response = await async_client.get(url, headers=headers)
+        assert unidade.id not in [u["id"] for u in response.json()["items"]]
+        
+        response = await async_client.post(
+            "/api/v1/institutional/unit/", json={"nome": "Unidade Nova", "universidade_id": universidade.id}, headers=headers
+        )
+        assert response.status_code == 200
+        response = await async_client.get(url, headers=headers)
+        assert "Unidade Nova" in [u["nome"] for u in response.json()["items"]]
+    
+    @pytest.mark.asyncio
+    async def test_reference_cache_discards_snapshot_raced_by_write(self):
+        """Test a snapshot loaded while its table was written is returned but not stored"""
+        cache = ReferenceCache(maxsize=8, ttl=60)
+        
+        async def racing_load() -> bytes:
+            cache.invalidate("tipos_residuo")
+            return b"stale"
+        
+        async def load() -> bytes:
+            return b"fresh"
+        
+        assert (await cache.get_or_load("tipos_residuo", "page", racing_load)).body == b"stale"
+        assert (await cache.get_or_load("tipos_residuo", "page", load)).body == b"fresh"
+        assert (await cache.get_or_load("tipos_residuo", "page", racing_load)).body == b"fresh"
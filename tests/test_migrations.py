@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, text
+
+from app.db.base import Base
+from app.db import models  # noqa: F401
+
+ALEMBIC_DIR = Path(__file__).parent.parent / "alembic"
+
+# (consulta do caminho quente, índice esperado no plano)
+HOT_QUERIES = [
+    ("SELECT id FROM lancamentos_residuo WHERE ponto_coleta_id = 1", "ix_lancamentos_residuo_ponto_coleta_id"),
+    ("SELECT id FROM lancamentos_residuo WHERE tipo_residuo_id = 1", "ix_lancamentos_residuo_tipo_residuo_id"),
+    ("SELECT id FROM lancamentos_residuo WHERE data >= '2024-01-01'", "ix_lancamentos_residuo_data"),
+    ("SELECT id FROM pedidos_doacao WHERE turma_id = 1", "ix_pedidos_doacao_turma_id"),
+    ("SELECT id FROM pedidos_doacao WHERE criado_por_id = 1", "ix_pedidos_doacao_criado_por_id"),
+    ("SELECT id FROM pedidos_doacao WHERE criado_em >= '2024-01-01'", "ix_pedidos_doacao_criado_em"),
+    ("SELECT pedido_doacao_id FROM pedido_doacao_alunos WHERE user_id = 1", "ix_pedido_doacao_alunos_user_id"),
+    ("SELECT id FROM users WHERE email = 'a@example.com'", "ix_users_email"),
+    ("SELECT id FROM turmas WHERE curso_id = 1", "ix_turmas_curso_id"),
+    ("SELECT id FROM turmas WHERE unidade_id = 1", "ix_turmas_unidade_id"),
+    ("SELECT id FROM turmas WHERE universidade_id = 1", "ix_turmas_universidade_id"),
+    ("SELECT id FROM cursos WHERE universidade_id = 1", "ix_cursos_universidade_id"),
+    ("SELECT id FROM cursos WHERE unidade_id = 1", "ix_cursos_unidade_id"),
+    ("SELECT id FROM pontos_coleta WHERE universidade_id = 1", "ix_pontos_coleta_universidade_id"),
+    ("SELECT id FROM pontos_coleta WHERE unidade_id = 1", "ix_pontos_coleta_unidade_id"),
+    ("SELECT id FROM pontos_coleta WHERE responsavel_id = 1", "ix_pontos_coleta_responsavel_id"),
+]
+
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    url = f"sqlite:///{tmp_path}/migrations.db"
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+    engine = create_engine(url)
+    yield engine
+    engine.dispose()
+    command.downgrade(config, "base")
+
+
+class TestMigrations:
+
+    def test_migrations_match_models(self, migrated_engine):
+        """Test upgrading to head produces exactly the schema of the models"""
+        with migrated_engine.connect() as conn:
+            diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+
+        assert diff == []
+
+    @pytest.mark.parametrize("query,index_name", HOT_QUERIES)
+    def test_hot_queries_use_index(self, migrated_engine, query, index_name):
+        """Test each hot-path query is planned through its index"""
+        with migrated_engine.connect() as conn:
+            plan = " ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+
+        assert index_name in plan
@@ -1,8 +1,20 @@
+import asyncio
+import os
+import subprocess
+import sys
 import pytest
+from pathlib import Path
 from httpx import AsyncClient
 from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
 
 from app.main import app
+from app.core import health
+from app.core.config import settings
+from app.db.models.recycling import TipoResiduo
+from app.db.querystats import collect_queries, query_budget
+from app.db.session import InstrumentedAsyncQueuePool
 
 
 class TestMonitoring:
@@ -26,3 +38,184 @@ class TestMonitoring:
         data = response.json()
         assert data["status"] == "healthy"
         assert data["message"] == "Service is running"
+    
+    def test_stats(self):
+        """Test stats endpoint exposes worker pool and cache metrics"""
+        client = TestClient(app)
+        response = client.get("/api/v1/monitoring/stats/")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["password_hashing"]["pool_size"] >= 1
+        assert "saturation" in data["password_hashing"]
+        assert "hits" in data["principal_cache"]
+        assert "misses" in data["principal_cache"]
+        assert "pool_class" in data["db_pool"]
+    
+    @pytest.mark.asyncio
+    async def test_pool_stats_track_checkouts(self, tmp_path):
+        """Test the instrumented pool reports checkouts and wait time"""
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path}/pool.db",
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=2
+        )
+        async with engine.connect() as conn:
+            assert engine.pool.checkedout() == 1
+        
+        assert engine.pool.checkouts == 1
+        assert engine.pool.max_wait >= 0
+        await engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_query_stats_headers(self, async_client: AsyncClient, auth_headers):
+        """Test responses report the SQL query count and DB time"""
+        headers = await auth_headers("ADMIN_UNI")
+        
+        response = await async_client.get("/api/v1/recycling/tipo-residuo/", headers=headers)
+        
+        assert response.status_code == 200
+        assert int(response.headers["X-DB-Queries"]) >= 1
+        assert response.headers["Server-Timing"].startswith("db;dur=")
+    
+    @pytest.mark.asyncio
+    async def test_repeated_queries_are_flagged(self, db_session):
+        """Test identical statement shapes are reported as likely N+1"""
+        with collect_queries() as stats:
+            for tipo_id in range(5):
+                await db_session.execute(select(TipoResiduo).where(TipoResiduo.id == tipo_id))
+        
+        assert stats.count == 5
+        assert list(stats.repeated(5).values()) == [5]
+        assert stats.repeated(6) == {}
+    
+    @pytest.mark.asyncio
+    async def test_query_budget_fails_when_exceeded(self, db_session):
+        """Test query_budget raises when a block runs too many queries"""
+        with pytest.raises(AssertionError, match="at most 1 queries, got 2"):
+            with query_budget(1):
+                await db_session.execute(text("SELECT 1"))
+                await db_session.execute(text("SELECT 2"))
+    
+    @pytest.mark.asyncio
+    async def test_metrics_exposition(self, async_client: AsyncClient):
+        """Test the metrics endpoint reports per-route counters, histograms and gauges"""
+        await async_client.get("/api/v1/monitoring/healthcheck/")
+        await async_client.get("/api/v1/recycling/ponto-coleta/123/")
+        
+        response = await async_client.get("/api/v1/monitoring/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert 'http_requests_total{method="GET",route="/api/v1/monitoring/healthcheck/",status="200"}' in body
+        assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/api/v1/monitoring/healthcheck/"}' in body
+        assert 'route="/api/v1/recycling/ponto-coleta/{ponto_id}/"' in body
+        assert "http_requests_in_progress" in body
+        assert "password_hash_saturation" in body
+    
+    def test_metrics_aggregate_across_processes(self, tmp_path):
+        """Test counters written by separate worker processes are summed on scrape"""
+        worker = (
+            "from app.core import metrics\n"
+            "assert metrics.MULTIPROCESS\n"
+            "metrics.REQUESTS.labels('GET', '/r/', '200').inc(3)\n"
+        )
+        env = dict(
+            os.environ,
+            PROMETHEUS_MULTIPROC_DIR=str(tmp_path),
+            PYTHONPATH=str(Path(__file__).parent.parent)
+        )
+        for _ in range(2):
+            subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+        
+        scrape = (
+            "from app.core.metrics import render_metrics\n"
+            "print(render_metrics()[0].decode())\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", scrape], env=env, check=True, capture_output=True, text=True
+        ).stdout
+        
+        assert 'http_requests_total{method="GET",route="/r/",status="200"} 6.0' in output
+    
+    @pytest.mark.asyncio
+    async def test_liveness(self, async_client: AsyncClient):
+        """Test the liveness probe does not depend on the database"""
+        response = await async_client.get("/api/v1/monitoring/live/")
+        
+        assert response.status_code == 200
+        assert response.json()["status"] == "alive"
+    
+    @pytest.mark.asyncio
+    async def test_readiness_ready_and_cached(self, async_client: AsyncClient, tmp_path, monkeypatch):
+        """Test readiness pings the database once and serves concurrent probes from cache"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/ready.db")
+        monkeypatch.setattr(health, "readiness_checker", health.ReadinessChecker({"primary": engine}))
+        
+        responses = await asyncio.gather(
+            *(async_client.get("/api/v1/monitoring/ready/") for _ in range(10))
+        )
+        
+        assert all(r.status_code == 200 for r in responses)
+        assert responses[0].json()["checks"]["primary_database"]["ok"] is True
+        assert sum(not r.json()["cached"] for r in responses) == 1
+        await engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_readiness_unreachable_database(self, async_client: AsyncClient, tmp_path, monkeypatch):
+        """Test readiness returns 503 with reasons when the database is unreachable"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/dir/ready.db")
+        monkeypatch.setattr(health, "readiness_checker", health.ReadinessChecker({"primary": engine}))
+        
+        response = await async_client.get("/api/v1/monitoring/ready/")
+        
+        assert response.status_code == 503
+        assert response.json()["status"] == "not_ready"
+        assert "primary database unreachable" in response.json()["reasons"][0]
+        await engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_readiness_pool_exhausted(self, tmp_path, monkeypatch):
+        """Test readiness reports an exhausted pool instead of hanging on it"""
+        monkeypatch.setattr(settings, "readiness_db_timeout", 0.2)
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path}/pool.db",
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=1,
+            max_overflow=0
+        )
+        checker = health.ReadinessChecker({"primary": engine})
+        
+        async with engine.connect():
+            result = await checker.check()
+        
+        assert result["status"] == "not_ready"
+        assert result["checks"]["primary_pool"]["exhausted"] is True
+        assert any("exhausted" in reason for reason in result["reasons"])
+        assert any("timed out" in reason for reason in result["reasons"])
+        await engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_readiness_ignores_busy_sqlite_writer(self, async_client: AsyncClient, tmp_path, monkeypatch):
+        """Test a write holding the single SQLite writer connection keeps the probe ready"""
+        monkeypatch.setattr(settings, "readiness_db_timeout", 0.2)
+        url = f"sqlite+aiosqlite:///{tmp_path}/writer.db"
+        writer = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, pool_size=1, max_overflow=0)
+        reader = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, pool_size=2, max_overflow=0)
+        monkeypatch.setattr(
+            health, "readiness_checker",
+            health.ReadinessChecker({"primary": writer, "read": reader}, single_writer=("primary",))
+        )
+        
+        async with writer.begin() as conn:
+            await conn.execute(text("CREATE TABLE t (id INTEGER)"))
+            response = await async_client.get("/api/v1/monitoring/ready/")
+        
+        assert response.status_code == 200
+        checks = response.json()["checks"]
+        assert checks["primary_pool"]["exhausted"] is False
+        assert checks["primary_database"]["ok"] is True
+        assert response.json()["reasons"] == []
+        await writer.dispose()
+        await reader.dispose()
@@ -1,11 +1,30 @@
+import csv
+import io
+import json
 import pytest
-from httpx import AsyncClient
+from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.recycling import TipoResiduoService, PontoColetaService
-from app.services.institutional import UniversidadeService, UnidadeService
-from app.schemas.recycling import TipoResiduoCreate, PontoColetaCreate
-from app.schemas.institutional import UniversidadeCreate, UnidadeCreate
+from app.services.recycling import TipoResiduoService, PontoColetaService, PedidoDoacaoService, LancamentoResiduoService
+from app.services.institutional import UniversidadeService, UnidadeService, TurmaService
+from app.schemas.recycling import TipoResiduoCreate, PontoColetaCreate, PedidoDoacaoCreate
+from app.schemas.recycling import LancamentoResiduo as LancamentoResiduoSchema
+from app.schemas.institutional import UniversidadeCreate, UniversidadeUpdate, UnidadeCreate, TurmaUpdate
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from app.main import app
+from app.db.base import Base
+from app.db.session import get_read_db
+from app.db.models.recycling import TipoResiduo as TipoResiduoModel, pedido_doacao_alunos
+from app.db.models.user import User as UserModel
+from app.repositories.recycling import LancamentoResiduoRepository
+from app.services.auth import UserService
+from app.schemas.user import UserCreate
+from sqlalchemy import insert, select
+from sqlalchemy.exc import InvalidRequestError
+from app.db.querystats import collect_queries, query_budget
+from app.core.config import settings
 
 
 class TestRecycling:
@@ -64,3 +83,826 @@ class TestRecycling:
         assert ponto.nome == "Ponto Teste"
         assert ponto.universidade_id == universidade.id
         assert ponto.unidade_id == unidade.id
+    
+    @pytest.mark.asyncio
+    async def test_get_routes_use_read_session(self, async_client: AsyncClient, auth_headers, tmp_path):
+        """Test GET routes read from the replica while writes go to the primary"""
+        replica_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+        async with replica_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        ReplicaSession = async_sessionmaker(replica_engine, expire_on_commit=False)
+        async with ReplicaSession() as session:
+            session.add(TipoResiduoModel(nome="Somente na réplica"))
+            await session.commit()
+        
+        async def override_get_read_db():
+            async with ReplicaSession() as session:
+                yield session
+        
+        previous_override = app.dependency_overrides[get_read_db]
+        app.dependency_overrides[get_read_db] = override_get_read_db
+        try:
+            headers = await auth_headers("ADMIN_UNI")
+            response = await async_client.post(
+                "/api/v1/recycling/tipo-residuo/", json={"nome": "Somente no primário"}, headers=headers
+            )
+            assert response.status_code == 200
+            
+            response = await async_client.get("/api/v1/recycling/tipo-residuo/", headers=headers)
+            nomes = [t["nome"] for t in response.json()["items"]]
+            assert nomes == ["Somente na réplica"]
+        finally:
+            app.dependency_overrides[get_read_db] = previous_override
+            await replica_engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_failed_commit_returns_error(self, async_client: AsyncClient, auth_headers, db_session: AsyncSession, monkeypatch):
+        """Test a failed commit surfaces as a 500 instead of a successful response"""
+        headers = await auth_headers("ADMIN_UNI")
+        
+        async def failing_commit(self):
+            raise RuntimeError("commit failed")
+        
+        monkeypatch.setattr(AsyncSession, "commit", failing_commit)
+        transport = ASGITransport(app=app, raise_app_exceptions=False)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/recycling/tipo-residuo/", json={"nome": "Nunca confirmado"}, headers=headers
+            )
+        monkeypatch.undo()
+        
+        assert response.status_code == 500
+        nomes = (await db_session.scalars(select(TipoResiduoModel.nome))).all()
+        assert "Nunca confirmado" not in nomes
+    
+    @pytest.mark.asyncio
+    async def test_tipos_residuo_keyset_pages(self, db_session: AsyncSession):
+        """Test walking tipo-residuo pages with the next cursor visits every row once"""
+        service = TipoResiduoService(db_session)
+        for i in range(5):
+            await service.create_tipo_residuo(TipoResiduoCreate(nome=f"Paginado {i}"))
+        
+        seen = []
+        cursor = None
+        while True:
+            page = await service.get_tipos_residuo_page(limit=2, cursor=cursor)
+            assert len(page.items) <= 2
+            seen.extend(t.id for t in page.items)
+            if page.next is None:
+                break
+            cursor = page.next
+        
+        assert seen == sorted(seen)
+        assert len(seen) == len(set(seen))
+        assert len(seen) == len(await service.get_all_tipos_residuo())
+    
+    @pytest.mark.asyncio
+    async def test_lancamentos_keyset_pages_by_data_and_id(self, db_session: AsyncSession, make_lancamentos):
+        """Test lancamento pages are ordered by (data, id) desc and stable on ties"""
+        same_day = datetime(2030, 1, 1, 12, 0)
+        seeded = await make_lancamentos(
+            [Decimal("1.00")] * 4,
+            datas=[same_day, same_day, same_day, datetime(2030, 1, 2)]
+        )
+        service = LancamentoResiduoService(db_session)
+        
+        first = await service.get_lancamentos_residuo_page(limit=2)
+        second = await service.get_lancamentos_residuo_page(limit=2, cursor=first.next)
+        
+        ids = [l.id for l in first.items + second.items]
+        expected = [seeded["lancamentos"][3].id] + sorted(
+            (l.id for l in seeded["lancamentos"][:3]), reverse=True
+        )
+        assert ids == expected[:4]
+    
+    @pytest.mark.asyncio
+    async def test_list_endpoint_rejects_invalid_cursor(self, async_client: AsyncClient, auth_headers):
+        """Test list endpoints return a page envelope and reject bad cursors"""
+        headers = await auth_headers("ADMIN_UNI")
+        
+        response = await async_client.get("/api/v1/recycling/tipo-residuo/?limit=1", headers=headers)
+        assert response.status_code == 200
+        assert set(response.json()) == {"items", "next"}
+        
+        response = await async_client.get("/api/v1/recycling/tipo-residuo/?cursor=not-a-cursor", headers=headers)
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_lancamentos_skip_unrequested_relationships(self, db_session: AsyncSession, make_lancamentos):
+        """Test list queries load no relationships unless included, and lazy loads raise"""
+        await make_lancamentos([Decimal("2.50")])
+        db_session.expunge_all()
+        
+        lancamentos = await LancamentoResiduoRepository(db_session).get_all()
+        with pytest.raises(InvalidRequestError):
+            lancamentos[0].pedido
+        
+        page = await LancamentoResiduoService(db_session).get_lancamentos_residuo_page()
+        assert "ponto_coleta" not in page.items[0].model_dump()
+    
+    @pytest.mark.asyncio
+    async def test_lancamentos_include_relationships(self, db_session: AsyncSession, make_lancamentos):
+        """Test include= loads and renders the requested relationships"""
+        seeded = await make_lancamentos([Decimal("3.00")])
+        db_session.expunge_all()
+        service = LancamentoResiduoService(db_session)
+        
+        lancamento = await service.get_lancamento_residuo_by_id(
+            seeded["lancamentos"][0].id, include="pedido,tipo_residuo"
+        )
+        data = lancamento.model_dump()
+        
+        assert data["tipo_residuo"]["nome"] == seeded["tipo"].nome
+        assert data["pedido"]["alunos"] == []
+        assert "ponto_coleta" not in data
+    
+    @pytest.mark.asyncio
+    async def test_pedido_doacao_returns_aluno_ids(self, db_session: AsyncSession, make_lancamentos):
+        """Test pedidos expose their alunos as ids after create and fetch"""
+        seeded = await make_lancamentos([])
+        aluno = await UserService(db_session).create_user(UserCreate(
+            username="aluno_pedido", email="aluno_pedido@example.com",
+            password="testpass123", perfil="ALUNO"
+        ), "ALUNO")
+        service = PedidoDoacaoService(db_session)
+        
+        pedido = await service.create_pedido_doacao(
+            PedidoDoacaoCreate(codigo="ALU1", turma_id=seeded["turma"].id, alunos=[aluno.id]),
+            None
+        )
+        db_session.expunge_all()
+        fetched = await service.get_pedido_doacao_by_id(pedido.id)
+        
+        assert pedido.alunos == [aluno.id]
+        assert fetched.alunos == [aluno.id]
+    
+    @pytest.mark.asyncio
+    async def test_include_rejects_unknown_relationship(self, async_client: AsyncClient, auth_headers):
+        """Test include= with an unknown relationship returns 400"""
+        headers = await auth_headers("PONTO")
+        
+        response = await async_client.get(
+            "/api/v1/recycling/lancamento-residuo/?include=lancamentos", headers=headers
+        )
+        
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("url,perfil,budget", [
+        ("/api/v1/recycling/tipo-residuo/", "ADMIN_UNI", 2),
+        ("/api/v1/recycling/pontos-coleta/", "ADMIN_UNI", 2),
+        ("/api/v1/recycling/pedido-doacao/", "CHEFE", 3),
+        ("/api/v1/recycling/lancamento-residuo/", "PONTO", 2),
+        ("/api/v1/recycling/lancamento-residuo/?include=pedido,ponto_coleta,tipo_residuo", "PONTO", 6),
+    ])
+    async def test_list_routes_query_budget(self, async_client: AsyncClient, auth_headers, make_lancamentos, url, perfil, budget):
+        """Test list routes stay within their query budget (auth + page + loads)"""
+        await make_lancamentos([Decimal("1.00")] * 3)
+        headers = await auth_headers(perfil)
+        
+        with query_budget(budget):
+            response = await async_client.get(url, headers=headers)
+        
+        assert response.status_code == 200
+    
+    @pytest.mark.asyncio
+    async def test_update_lancamento_single_statement(self, async_client: AsyncClient, auth_headers, make_lancamentos):
+        """Test PUT updates with one UPDATE ... RETURNING (plus the locked pre-read,
+        the rollup upsert and the ranking sequence bump) and keeps 404 for missing rows"""
+        seeded = await make_lancamentos([Decimal("1.00")])
+        lancamento_id = seeded["lancamentos"][0].id
+        headers = await auth_headers("PONTO")
+        
+        with query_budget(5):
+            response = await async_client.put(
+                f"/api/v1/recycling/lancamento-residuo/{lancamento_id}/",
+                json={"peso_kg": "7.25"},
+                headers=headers
+            )
+        assert response.status_code == 200
+        assert Decimal(response.json()["peso_kg"]) == Decimal("7.25")
+        
+        response = await async_client.put(
+            "/api/v1/recycling/lancamento-residuo/999999/", json={"peso_kg": "1.00"}, headers=headers
+        )
+        assert response.status_code == 404
+    
+    @pytest.mark.asyncio
+    async def test_update_and_delete_pedido_alunos(self, async_client: AsyncClient, auth_headers, make_lancamentos, db_session: AsyncSession):
+        """Test PUT replaces pedido alunos and DELETE removes association rows without a pre-fetch"""
+        from sqlalchemy import func, select
+        from app.db.models.recycling import pedido_doacao_alunos
+        
+        seeded = await make_lancamentos([])
+        alunos = [
+            await UserService(db_session).create_user(UserCreate(
+                username=f"aluno_put_{i}", email=f"aluno_put_{i}@example.com",
+                password="testpass123", perfil="ALUNO"
+            ), "ALUNO")
+            for i in range(2)
+        ]
+        pedido = await PedidoDoacaoService(db_session).create_pedido_doacao(
+            PedidoDoacaoCreate(codigo="PUT1", turma_id=seeded["turma"].id, alunos=[alunos[0].id]),
+            None
+        )
+        headers = await auth_headers("CHEFE")
+        
+        response = await async_client.put(
+            f"/api/v1/recycling/pedido-doacao/{pedido.id}/",
+            json={"alunos": [alunos[1].id, 999999], "confirmado": True},
+            headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["alunos"] == [alunos[1].id]
+        assert response.json()["confirmado"] is True
+        
+        with query_budget(3):
+            response = await async_client.delete(f"/api/v1/recycling/pedido-doacao/{pedido.id}/", headers=headers)
+        assert response.status_code == 200
+        remaining = await db_session.scalar(
+            select(func.count()).select_from(pedido_doacao_alunos)
+            .where(pedido_doacao_alunos.c.pedido_doacao_id == pedido.id)
+        )
+        assert remaining == 0
+        
+        response = await async_client.delete(f"/api/v1/recycling/pedido-doacao/{pedido.id}/", headers=headers)
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_delete_pedido_with_lancamento_conflicts(self, async_client: AsyncClient, auth_headers, make_lancamentos, db_session: AsyncSession):
+        """Test deleting a pedido that still has a lancamento returns 409 and keeps the lancamento counted"""
+        from sqlalchemy import func, select
+        from app.db.models.recycling import LancamentoResiduo as LancamentoResiduoModel, ResumoDiarioResiduo
+        from app.repositories.rollup import ResumoDiarioRepository
+
+        seeded = await make_lancamentos([Decimal("4.00")])
+        lancamento_id, pedido_id, turma_id = seeded["lancamentos"][0].id, seeded["lancamentos"][0].pedido_id, seeded["turma"].id
+        await ResumoDiarioRepository(db_session).rebuild()
+        await db_session.commit()
+
+        response = await async_client.delete(
+            f"/api/v1/recycling/pedido-doacao/{pedido_id}/", headers=await auth_headers("CHEFE")
+        )
+        assert response.status_code == 409
+        assert await db_session.get(LancamentoResiduoModel, lancamento_id) is not None
+        total = await db_session.scalar(
+            select(func.sum(ResumoDiarioResiduo.total_kg)).where(ResumoDiarioResiduo.turma_id == turma_id)
+        )
+        assert total == Decimal("4.00")
+
+        response = await async_client.delete(
+            f"/api/v1/recycling/lancamento-residuo/{lancamento_id}/", headers=await auth_headers("PONTO")
+        )
+        assert response.status_code == 200
+        response = await async_client.delete(
+            f"/api/v1/recycling/pedido-doacao/{pedido_id}/", headers=await auth_headers("CHEFE")
+        )
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_update_delete_fallback_without_returning(self, db_session: AsyncSession, monkeypatch):
+        """Test update/delete fall back to rowcount and re-read on dialects without RETURNING"""
+        from app.schemas.recycling import TipoResiduoUpdate
+        
+        service = TipoResiduoService(db_session)
+        tipo = await service.create_tipo_residuo(TipoResiduoCreate(nome="Sem Returning"))
+        dialect = db_session.bind.dialect
+        monkeypatch.setattr(dialect, "update_returning", False)
+        monkeypatch.setattr(dialect, "delete_returning", False)
+        
+        updated = await service.update_tipo_residuo(tipo.id, TipoResiduoUpdate(nome="Renomeado"))
+        assert updated.nome == "Renomeado"
+        assert await service.update_tipo_residuo(999999, TipoResiduoUpdate(nome="x")) is None
+        
+        assert await service.delete_tipo_residuo(tipo.id) is True
+        assert await service.delete_tipo_residuo(tipo.id) is False
+    
+    @pytest.mark.asyncio
+    async def test_export_lancamentos_csv(self, async_client: AsyncClient, auth_headers, make_lancamentos):
+        """Test the CSV export streams a header plus one line per filtered record"""
+        datas = [datetime(2024, 1, 10), datetime(2024, 2, 10), datetime(2024, 3, 10)]
+        seeded = await make_lancamentos([Decimal("1.50"), Decimal("2.00"), Decimal("3.25")], datas)
+        await make_lancamentos([Decimal("9.00")], [datetime(2024, 2, 10)])
+        headers = await auth_headers("PONTO")
+        
+        with query_budget(2):
+            response = await async_client.get(
+                "/api/v1/recycling/lancamento-residuo/export/",
+                params={
+                    "universidade_id": seeded["universidade"].id,
+                    "data_inicio": "2024-02-01T00:00:00",
+                    "data_fim": "2024-04-01T00:00:00",
+                },
+                headers=headers
+            )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["peso_kg"] for row in rows] == ["2.00", "3.25"]
+        assert {row["ponto_coleta"] for row in rows} == {seeded["ponto"].nome}
+        assert {row["universidade"] for row in rows} == {seeded["universidade"].nome}
+    
+    @pytest.mark.asyncio
+    async def test_export_lancamentos_ndjson(self, async_client: AsyncClient, auth_headers, make_lancamentos):
+        """Test the NDJSON export filters by ponto and tipo and keeps API value formats"""
+        seeded = await make_lancamentos([Decimal("1.50"), Decimal("2.00")])
+        await make_lancamentos([Decimal("9.00")])
+        headers = await auth_headers("PONTO")
+        
+        response = await async_client.get(
+            "/api/v1/recycling/lancamento-residuo/export/",
+            params={"format": "ndjson", "ponto_coleta_id": seeded["ponto"].id, "tipo_residuo_id": seeded["tipo"].id},
+            headers=headers
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["id"] for r in records] == [l.id for l in seeded["lancamentos"]]
+        assert records[0]["peso_kg"] == "1.50"
+        assert records[0]["tipo_residuo"] == seeded["tipo"].nome
+        
+        response = await async_client.get(
+            "/api/v1/recycling/lancamento-residuo/export/", params={"format": "xlsx"}, headers=headers
+        )
+        assert response.status_code == 422
+    
+    @pytest.mark.asyncio
+    async def test_export_streams_in_batches(self, db_session: AsyncSession, make_lancamentos, monkeypatch):
+        """Test the export yields one chunk per server-side batch instead of one big body"""
+        seeded = await make_lancamentos([Decimal("1.00")] * 5)
+        monkeypatch.setattr(settings, "export_batch_size", 2)
+        service = LancamentoResiduoService(db_session)
+        
+        chunks = [
+            chunk async for chunk in service.export_lancamentos_residuo("csv", ponto_coleta_id=seeded["ponto"].id)
+        ]
+        
+        # cabeçalho + lotes de 2, 2 e 1 linhas
+        assert len(chunks) == 4
+        assert b"".join(chunks).decode().count("\n") == 6
+    
+    @pytest.mark.asyncio
+    async def test_list_fast_path_matches_schema_json(self, async_client: AsyncClient, auth_headers, make_lancamentos, db_session: AsyncSession):
+        """Test list pages come from plain rows and serialize like the Pydantic JSON of the ORM object"""
+        seeded = await make_lancamentos([Decimal("1.50")], [datetime(2031, 5, 4, 10, 30, 15, 250000)])
+        lancamento = seeded["lancamentos"][0]
+        
+        items, _ = await LancamentoResiduoRepository(db_session).get_page(limit=1)
+        assert isinstance(items[0], dict)
+        
+        headers = await auth_headers("PONTO")
+        response = await async_client.get("/api/v1/recycling/lancamento-residuo/?limit=1", headers=headers)
+        
+        assert response.status_code == 200
+        expected = LancamentoResiduoSchema.model_validate(lancamento).model_dump(mode="json")
+        assert response.json()["items"] == [expected]
+        assert expected["peso_kg"] == "1.50"
+        assert expected["data"] == "2031-05-04T10:30:15.250000"
+        
+        response = await async_client.get(
+            "/api/v1/recycling/lancamento-residuo/?limit=1&include=tipo_residuo", headers=headers
+        )
+        assert response.json()["items"][0]["tipo_residuo"] == {"id": seeded["tipo"].id, "nome": seeded["tipo"].nome}
+    
+    @pytest.mark.asyncio
+    async def test_reference_list_conditional_get(self, async_client: AsyncClient, auth_headers):
+        """Test If-None-Match on a cached reference list returns 304 without querying the table"""
+        headers = await auth_headers("ADMIN_UNI")
+        url = "/api/v1/recycling/tipo-residuo/?limit=500"
+        
+        response = await async_client.get(url, headers=headers)
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == settings.cache_control_reference
+        
+        with collect_queries() as stats:
+            response = await async_client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert not any("FROM tipos_residuo" in shape for shape in stats.shapes)
+        
+        await async_client.post("/api/v1/recycling/tipo-residuo/", json={"nome": "Vidro"}, headers=headers)
+        response = await async_client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+    
+    @pytest.mark.asyncio
+    async def test_detail_conditional_get(self, async_client: AsyncClient, auth_headers, make_lancamentos, db_session: AsyncSession):
+        """Test detail routes send a content ETag and honour If-None-Match lists and weak tags"""
+        seeded = await make_lancamentos([Decimal("1.00")])
+        headers = await auth_headers("ADMIN_UNI")
+        url = f"/api/v1/recycling/ponto-coleta/{seeded['ponto'].id}/"
+        
+        response = await async_client.get(url, headers=headers)
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == settings.cache_control_detail
+        
+        with collect_queries() as stats:
+            response = await async_client.get(url, headers={**headers, "If-None-Match": f'"outro", W/{etag}'})
+        assert response.status_code == 304
+        assert not any("FROM pontos_coleta" in shape for shape in stats.shapes)
+        
+        await async_client.put(url, json={"nome": "Ponto Renomeado"}, headers=headers)
+        response = await async_client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["nome"] == "Ponto Renomeado"
+        
+        # Com include, uma escrita na tabela relacionada também invalida o snapshot
+        params = {"include": "universidade"}
+        etag = (await async_client.get(url, params=params, headers=headers)).headers["etag"]
+        response = await async_client.get(url, params=params, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        await UniversidadeService(db_session).update_universidade(
+            seeded["universidade"].id, UniversidadeUpdate(nome="Renomeada")
+        )
+        await db_session.commit()
+        response = await async_client.get(url, params=params, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["universidade"]["nome"] == "Renomeada"
+        
+        response = await async_client.get("/api/v1/recycling/ponto-coleta/999999/", headers=headers)
+        assert response.status_code == 404
+    
+    @pytest.mark.asyncio
+    async def test_estatisticas_grouped_by_dimensions(self, async_client: AsyncClient, auth_headers, make_lancamentos, db_session: AsyncSession):
+        """Test statistics sum kg per group in one query without multiplying weights by students"""
+        seeded = await make_lancamentos([Decimal("2.50"), Decimal("1.50")], [datetime(2024, 3, 1), datetime(2024, 3, 2)])
+        await make_lancamentos([Decimal("9.00")], [datetime(2024, 3, 1)])
+        alunos = [
+            UserModel(
+                username=f"aluno_stats_{seeded['turma'].id}_{i}",
+                email=f"aluno_stats_{seeded['turma'].id}_{i}@example.com",
+                hashed_password="x",
+                perfil="ALUNO"
+            )
+            for i in range(2)
+        ]
+        db_session.add_all(alunos)
+        await db_session.flush()
+        pedido_a, pedido_b = [l.pedido_id for l in seeded["lancamentos"]]
+        await db_session.execute(insert(pedido_doacao_alunos), [
+            {"pedido_doacao_id": pedido_a, "user_id": alunos[0].id},
+            {"pedido_doacao_id": pedido_a, "user_id": alunos[1].id},
+            {"pedido_doacao_id": pedido_b, "user_id": alunos[0].id},
+        ])
+        await db_session.commit()
+        headers = await auth_headers("ADMIN_UNI")
+        
+        with query_budget(2):
+            response = await async_client.get(
+                "/api/v1/recycling/estatisticas/",
+                params={"group_by": "universidade,turma,tipo_residuo", "universidade_id": seeded["universidade"].id},
+                headers=headers
+            )
+        
+        assert response.status_code == 200
+        assert response.json() == {
+            "group_by": ["universidade", "turma", "tipo_residuo"],
+            "items": [{
+                "grupo": {
+                    "universidade": {"id": seeded["universidade"].id, "nome": seeded["universidade"].nome},
+                    "turma": {"id": seeded["turma"].id, "nome": seeded["turma"].nome},
+                    "tipo_residuo": {"id": seeded["tipo"].id, "nome": seeded["tipo"].nome},
+                },
+                "total_kg": "4.00",
+                "lancamentos": 2,
+                "alunos": 2,
+            }],
+        }
+        
+        response = await async_client.get(
+            "/api/v1/recycling/estatisticas/",
+            params={"turma_id": seeded["turma"].id, "data_inicio": "2024-03-02T00:00:00"},
+            headers=headers
+        )
+        assert response.json()["items"] == [
+            {"grupo": {}, "total_kg": "1.50", "lancamentos": 1, "alunos": 1}
+        ]
+        
+        response = await async_client.get(
+            "/api/v1/recycling/estatisticas/", params={"group_by": "turma,planeta"}, headers=headers
+        )
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_rollup_tracks_writes_and_matches_rebuild(self, async_client: AsyncClient, auth_headers, make_lancamentos, db_session: AsyncSession):
+        """Test lancamento and pedido writes keep the daily rollup equal to a full rebuild"""
+        from app.repositories.rollup import ResumoDiarioRepository
+        
+        seeded = await make_lancamentos([])
+        outra = await make_lancamentos([])
+        await ResumoDiarioRepository(db_session).rebuild()
+        await db_session.commit()
+        ponto_headers = await auth_headers("PONTO")
+        chefe_headers = await auth_headers("CHEFE")
+        
+        pedidos = []
+        for _ in range(3):
+            response = await async_client.post(
+                "/api/v1/recycling/pedido-doacao/",
+                json={"codigo": f"R{len(pedidos)}{seeded['turma'].id}", "turma_id": seeded["turma"].id},
+                headers=chefe_headers
+            )
+            pedidos.append(response.json()["id"])
+        lancamentos = []
+        for pedido_id, peso in zip(pedidos, ["2.50", "1.25", "4.00"]):
+            response = await async_client.post(
+                "/api/v1/recycling/lancamento-residuo/",
+                json={
+                    "pedido_id": pedido_id,
+                    "ponto_coleta_id": seeded["ponto"].id,
+                    "tipo_residuo_id": seeded["tipo"].id,
+                    "peso_kg": peso,
+                },
+                headers=ponto_headers
+            )
+            assert response.status_code == 200
+            lancamentos.append(response.json()["id"])
+        
+        await async_client.put(
+            f"/api/v1/recycling/lancamento-residuo/{lancamentos[0]}/", json={"peso_kg": "3.00"}, headers=ponto_headers
+        )
+        await async_client.put(
+            f"/api/v1/recycling/lancamento-residuo/{lancamentos[1]}/",
+            json={"tipo_residuo_id": outra["tipo"].id},
+            headers=ponto_headers
+        )
+        await async_client.put(
+            f"/api/v1/recycling/pedido-doacao/{pedidos[2]}/", json={"turma_id": outra["turma"].id}, headers=chefe_headers
+        )
+        await async_client.delete(f"/api/v1/recycling/lancamento-residuo/{lancamentos[1]}/", headers=ponto_headers)
+        
+        headers = await auth_headers("ADMIN_UNI")
+        with query_budget(2):
+            response = await async_client.get(
+                "/api/v1/recycling/estatisticas/resumo/",
+                params={"group_by": "turma,tipo_residuo", "ponto_coleta_id": seeded["ponto"].id},
+                headers=headers
+            )
+        assert response.status_code == 200
+        maintained = response.json()
+        assert [(item["grupo"]["turma"]["id"], item["total_kg"], item["lancamentos"]) for item in maintained["items"]] == [
+            (outra["turma"].id, "4.00", 1),
+            (seeded["turma"].id, "3.00", 1),
+        ]
+        
+        await ResumoDiarioRepository(db_session).rebuild()
+        await db_session.commit()
+        response = await async_client.get(
+            "/api/v1/recycling/estatisticas/resumo/",
+            params={"group_by": "turma,tipo_residuo", "ponto_coleta_id": seeded["ponto"].id},
+            headers=headers
+        )
+        assert response.json() == maintained
+    
+    @pytest.mark.asyncio
+    async def test_leaderboard_follows_committed_writes(self, async_client: AsyncClient, auth_headers, make_lancamentos, db_session: AsyncSession):
+        """Test the turma leaderboard applies committed lancamento writes and serves reads without queries"""
+        from app.core.leaderboard import leaderboard
+        from app.repositories.rollup import ResumoDiarioRepository
+        from app.schemas.recycling import LancamentoResiduoCreate
+        
+        seeded = await make_lancamentos([])
+        outra = await make_lancamentos([])
+        # O rollback abaixo expira os objetos da sessão
+        turma = {"id": seeded["turma"].id, "nome": seeded["turma"].nome}
+        outra_turma = {"id": outra["turma"].id, "nome": outra["turma"].nome}
+        universidade_id, ponto_id, tipo_id = seeded["universidade"].id, seeded["ponto"].id, seeded["tipo"].id
+        outra_universidade_id = outra["universidade"].id
+        ponto_headers = await auth_headers("PONTO")
+        chefe_headers = await auth_headers("CHEFE")
+        
+        async def lancar(turma_id, peso):
+            pedido = await async_client.post(
+                "/api/v1/recycling/pedido-doacao/",
+                json={"codigo": f"L{turma_id}{peso.replace('.', '')}", "turma_id": turma_id},
+                headers=chefe_headers
+            )
+            response = await async_client.post(
+                "/api/v1/recycling/lancamento-residuo/",
+                json={
+                    "pedido_id": pedido.json()["id"],
+                    "ponto_coleta_id": ponto_id,
+                    "tipo_residuo_id": tipo_id,
+                    "peso_kg": peso,
+                },
+                headers=ponto_headers
+            )
+            return response.json()
+        
+        primeiro = await lancar(turma["id"], "5.00")
+        outro = await lancar(outra_turma["id"], "2.00")
+        await lancar(outra_turma["id"], "3.00")
+        periodo = primeiro["data"][:7]
+        
+        response = await async_client.get("/api/v1/recycling/ranking/", headers=ponto_headers)
+        assert [(item["posicao"], item["total_kg"]) for item in response.json()["items"]] == [(1, "5.00"), (1, "5.00")]
+        
+        await async_client.put(
+            f"/api/v1/recycling/lancamento-residuo/{outro['id']}/", json={"peso_kg": "2.50"}, headers=ponto_headers
+        )
+        # Escrita desfeita não chega ao ranking
+        pedido = await PedidoDoacaoService(db_session).create_pedido_doacao(
+            PedidoDoacaoCreate(codigo=f"RB{turma['id']}", turma_id=turma["id"]), None
+        )
+        await LancamentoResiduoService(db_session).create_lancamento_residuo(LancamentoResiduoCreate(
+            pedido_id=pedido.id, ponto_coleta_id=ponto_id, tipo_residuo_id=tipo_id, peso_kg=Decimal("50.00")
+        ))
+        await db_session.rollback()
+        
+        with collect_queries() as stats:
+            response = await async_client.get(
+                "/api/v1/recycling/ranking/", params={"periodo": periodo, "limit": 5}, headers=ponto_headers
+            )
+        assert stats.count == 0
+        assert response.json()["items"] == [
+            {"posicao": 1, "turma": outra_turma, "total_kg": "5.50"},
+            {"posicao": 2, "turma": turma, "total_kg": "5.00"},
+        ]
+        
+        response = await async_client.get(
+            "/api/v1/recycling/ranking/",
+            params={"escopo": "universidade", "escopo_id": universidade_id},
+            headers=ponto_headers
+        )
+        assert [item["turma"] for item in response.json()["items"]] == [turma]
+        response = await async_client.get(
+            "/api/v1/recycling/ranking/", params={"escopo": "unidade"}, headers=ponto_headers
+        )
+        assert response.status_code == 400
+        
+        response = await async_client.get(
+            f"/api/v1/recycling/ranking/turma/{turma['id']}/", headers=ponto_headers
+        )
+        assert (response.json()["posicao"], response.json()["turmas"]) == (2, 2)
+        
+        await async_client.delete(f"/api/v1/recycling/lancamento-residuo/{primeiro['id']}/", headers=ponto_headers)
+        response = await async_client.get(
+            f"/api/v1/recycling/ranking/turma/{turma['id']}/", headers=ponto_headers
+        )
+        assert response.status_code == 404
+        
+        # Recarga a partir do banco chega ao mesmo ranking (escopo isolado de outros testes)
+        params = {"escopo": "universidade", "escopo_id": outra_universidade_id, "periodo": periodo}
+        incremental = (await async_client.get("/api/v1/recycling/ranking/", params=params, headers=ponto_headers)).json()
+        sequencia, rows = await ResumoDiarioRepository(db_session).turma_totals()
+        leaderboard.load(rows, sequencia)
+        rebuilt = (await async_client.get("/api/v1/recycling/ranking/", params=params, headers=ponto_headers)).json()
+        assert rebuilt == incremental
+        assert [item["total_kg"] for item in rebuilt["items"]] == ["5.50"]
+
+    @pytest.mark.asyncio
+    async def test_leaderboard_refresh_keeps_interleaved_commits(self, make_lancamentos, db_session: AsyncSession, monkeypatch):
+        """Test commits made during a refresh are replayed only when the snapshot missed them"""
+        from app.core.leaderboard import leaderboard
+        from app.repositories.rollup import ResumoDiarioRepository
+        from app.schemas.recycling import LancamentoResiduoCreate
+        from app.services import leaderboard as leaderboard_service
+
+        seeded = await make_lancamentos([])
+        turma_id, ponto_id, tipo_id = seeded["turma"].id, seeded["ponto"].id, seeded["tipo"].id
+
+        async def lancar(peso):
+            pedido = await PedidoDoacaoService(db_session).create_pedido_doacao(
+                PedidoDoacaoCreate(codigo=f"RF{turma_id}{peso}", turma_id=turma_id), None
+            )
+            await LancamentoResiduoService(db_session).create_lancamento_residuo(LancamentoResiduoCreate(
+                pedido_id=pedido.id, ponto_coleta_id=ponto_id, tipo_residuo_id=tipo_id, peso_kg=Decimal(peso)
+            ))
+            await db_session.commit()
+
+        await lancar("5.00")
+        turma_totals = ResumoDiarioRepository.turma_totals
+
+        async def interleaved(self):
+            # Commit após o begin_refresh, já contido no snapshot: não é reaplicado
+            await lancar("2.00")
+            totals = await turma_totals(self)
+            # Commits após o snapshot: reaplicados sobre os totais lidos
+            await lancar("3.00")
+            await TurmaService(db_session).update_turma(turma_id, TurmaUpdate(nome="Turma Renomeada"))
+            await db_session.commit()
+            return totals
+
+        monkeypatch.setattr(ResumoDiarioRepository, "turma_totals", interleaved)
+        monkeypatch.setattr(leaderboard_service, "AsyncPrimaryReadSessionLocal", async_sessionmaker(db_session.bind))
+        await leaderboard_service.refresh_leaderboard()
+
+        posicao, kg, turmas = leaderboard.rank(turma_id, "universidade")
+        assert (posicao, kg, turmas) == (1, Decimal("10.00"), 1)
+        assert leaderboard.turma(turma_id).nome == "Turma Renomeada"
+        assert leaderboard._journal == []
+
+    @pytest.mark.asyncio
+    async def test_leaderboard_follows_turma_updates(self, make_lancamentos, db_session: AsyncSession):
+        """Test a turma renamed or moved outside lancamento writes reaches the leaderboard on commit"""
+        from app.core.leaderboard import TurmaInfo, leaderboard
+        from app.schemas.recycling import LancamentoResiduoCreate
+
+        seeded = await make_lancamentos([])
+        outra = await make_lancamentos([])
+        turma_id, nome, universidade_id = seeded["turma"].id, seeded["turma"].nome, seeded["universidade"].id
+        destino = TurmaInfo("Turma Movida", outra["universidade"].id, outra["unidade"].id)
+        pedido = await PedidoDoacaoService(db_session).create_pedido_doacao(
+            PedidoDoacaoCreate(codigo=f"TM{turma_id}", turma_id=turma_id), None
+        )
+        await LancamentoResiduoService(db_session).create_lancamento_residuo(LancamentoResiduoCreate(
+            pedido_id=pedido.id, ponto_coleta_id=seeded["ponto"].id, tipo_residuo_id=seeded["tipo"].id,
+            peso_kg=Decimal("4.00")
+        ))
+        await db_session.commit()
+        assert leaderboard.top("universidade", universidade_id) == [(1, turma_id, Decimal("4.00"))]
+
+        await TurmaService(db_session).update_turma(turma_id, TurmaUpdate(**destino._asdict()))
+        # Só o commit leva a mudança ao ranking
+        assert leaderboard.turma(turma_id).nome == nome
+        await db_session.commit()
+
+        assert leaderboard.turma(turma_id) == destino
+        assert leaderboard.top("universidade", universidade_id) == []
+        assert leaderboard.top("universidade", destino.universidade_id) == [(1, turma_id, Decimal("4.00"))]
+        assert leaderboard.rank(turma_id, "unidade") == (1, Decimal("4.00"), 1)
+
+    @pytest.mark.asyncio
+    async def test_estatisticas_serie_buckets_fills_gaps_and_downsamples(self, async_client: AsyncClient, auth_headers, make_lancamentos, db_session: AsyncSession):
+        """Test the time series buckets in SQL, fills empty periods with zero and caps the points"""
+        from app.repositories.rollup import ResumoDiarioRepository
+        
+        seeded = await make_lancamentos(
+            [Decimal("1.00"), Decimal("2.00"), Decimal("3.00"), Decimal("4.00")],
+            [datetime(2024, 1, 1, 9), datetime(2024, 1, 3, 18), datetime(2024, 1, 15, 12), datetime(2024, 3, 10, 8)]
+        )
+        await ResumoDiarioRepository(db_session).rebuild()
+        await db_session.commit()
+        headers = await auth_headers("ADMIN_UNI")
+        url = "/api/v1/recycling/estatisticas/serie/"
+        ponto = {"ponto_coleta_id": seeded["ponto"].id}
+        
+        def pontos(response):
+            [serie] = response.json()["series"]
+            return [(p["inicio"], p["total_kg"]) for p in serie["pontos"]]
+        
+        with query_budget(2):
+            response = await async_client.get(
+                url, params={**ponto, "data_inicio": "2024-01-01", "data_fim": "2024-01-05"}, headers=headers
+            )
+        assert pontos(response) == [
+            ("2024-01-01", "1.00"), ("2024-01-02", "0.00"), ("2024-01-03", "2.00"), ("2024-01-04", "0.00"),
+        ]
+        
+        response = await async_client.get(
+            url,
+            params={**ponto, "intervalo": "semana", "data_inicio": "2024-01-01", "data_fim": "2024-03-31"},
+            headers=headers
+        )
+        semanas = dict(pontos(response))
+        assert len(semanas) == 13
+        assert (semanas["2024-01-01"], semanas["2024-01-15"], semanas["2024-03-04"]) == ("3.00", "3.00", "4.00")
+        
+        response = await async_client.get(
+            url, params={**ponto, "intervalo": "mes", "group_by": "tipo_residuo"}, headers=headers
+        )
+        assert response.json()["series"][0]["grupo"]["tipo_residuo"]["id"] == seeded["tipo"].id
+        assert pontos(response) == [("2024-01-01", "6.00"), ("2024-02-01", "0.00"), ("2024-03-01", "4.00")]
+        
+        response = await async_client.get(
+            url,
+            params={**ponto, "data_inicio": "2024-01-01", "data_fim": "2024-03-11", "max_pontos": 10},
+            headers=headers
+        )
+        assert response.json()["periodos_por_ponto"] == 7
+        reduzida = pontos(response)
+        assert len(reduzida) == 10
+        assert reduzida[0] == ("2024-01-01", "3.00")
+        assert sum(Decimal(kg) for _, kg in reduzida) == Decimal("10.00")
+
+    @pytest.mark.asyncio
+    async def test_estatisticas_serie_caps_total_points_across_groups(self, async_client: AsyncClient, auth_headers, make_lancamentos, db_session: AsyncSession):
+        """Test many groups keep the heaviest series and fold the rest into "outros" within max_pontos"""
+        from app.repositories.rollup import ResumoDiarioRepository
+        
+        turmas = []
+        for peso in ("5.00", "1.00", "4.00", "2.00", "3.00"):
+            seeded = await make_lancamentos([Decimal(peso)], [datetime(2031, 1, 2, 10)])
+            turmas.append(seeded["turma"].id)
+        await ResumoDiarioRepository(db_session).rebuild()
+        await db_session.commit()
+        headers = await auth_headers("ADMIN_UNI")
+        params = {"group_by": "turma", "data_inicio": "2031-01-01", "data_fim": "2031-01-03"}
+        
+        response = await async_client.get("/api/v1/recycling/estatisticas/serie/", params=params, headers=headers)
+        assert len(response.json()["series"]) == 5
+        assert not any(serie["outros"] for serie in response.json()["series"])
+        
+        response = await async_client.get(
+            "/api/v1/recycling/estatisticas/serie/", params={**params, "max_pontos": 6}, headers=headers
+        )
+        series = response.json()["series"]
+        assert sum(len(serie["pontos"]) for serie in series) <= 6
+        assert [serie["grupo"].get("turma", {}).get("id") for serie in series] == [turmas[0], turmas[2], None]
+        assert series[2]["outros"] is True
+        assert [(p["inicio"], p["total_kg"], p["lancamentos"]) for p in series[2]["pontos"]] == [
+            ("2031-01-01", "0.00", 0), ("2031-01-02", "6.00", 3),
+        ]
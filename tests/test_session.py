@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models.recycling import TipoResiduo
+from app.db.session import _apply_sqlite_pragmas, _engine_options, unit_of_work
+
+
+class TestSession:
+
+    @pytest.mark.asyncio
+    async def test_sqlite_profile_pragmas(self, tmp_path):
+        """Test the SQLite profile applies WAL and pragmas on every connection"""
+        url = f"sqlite+aiosqlite:///{tmp_path}/profile.db"
+        engine = create_async_engine(url)
+        _apply_sqlite_pragmas(engine)
+
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1  # NORMAL
+            assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() > 0
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_sqlite_read_engine_is_query_only(self, tmp_path):
+        """Test the SQLite read engine rejects writes"""
+        url = f"sqlite+aiosqlite:///{tmp_path}/readonly.db"
+        engine = create_async_engine(url)
+        _apply_sqlite_pragmas(engine, query_only=True)
+
+        async with engine.connect() as conn:
+            with pytest.raises(Exception):
+                await conn.execute(text("CREATE TABLE t (id INTEGER)"))
+        await engine.dispose()
+
+    def test_sqlite_writer_uses_single_connection(self):
+        """Test the SQLite profile serializes writers through a pool of one"""
+        options = _engine_options("sqlite+aiosqlite:///./app.db", writer=True)
+
+        assert options["pool_size"] == 1
+        assert options["max_overflow"] == 0
+        assert _engine_options("sqlite+aiosqlite:///./app.db")["pool_size"] > 1
+
+    @pytest.mark.asyncio
+    async def test_unit_of_work_commits_once_or_rolls_back(self, tmp_path):
+        """Test the unit of work commits on success and discards every flush on error"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/uow.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+        async with SessionLocal() as session:
+            async with unit_of_work(session):
+                session.add(TipoResiduo(nome="Confirmado"))
+                await session.flush()
+
+        with pytest.raises(RuntimeError):
+            async with SessionLocal() as session:
+                async with unit_of_work(session):
+                    session.add(TipoResiduo(nome="Descartado"))
+                    await session.flush()
+                    raise RuntimeError("falha no meio da requisição")
+
+        async with SessionLocal() as session:
+            nomes = (await session.scalars(select(TipoResiduo.nome))).all()
+        assert nomes == ["Confirmado"]
+        await engine.dispose()